@@ -10,25 +10,338 @@ from typing import List, Dict, Any
 from sentence_transformers import SentenceTransformer
 import streamlit as st
 from bs4 import BeautifulSoup
+import hashlib
 import io
+import itertools
 import os
+import queue
+import resource
+import threading
+import asyncio
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from collections import OrderedDict, deque
+from vector_store import VectorStore, PersistentVectorStore
+from pdf_text import pdf_cache
+from ticker_registry import ticker_registry
+from src.price_store import PriceStore, PRICE_COLUMNS
+from metrics import registry, stage_seconds, track_fetch, items_embedded, ingested_items
 
-class StockDataIngester:
-  """Ingests real-time stock data, news, and market info"""
+
+# ===============================
+# PHASE 1: SHARED EMBEDDING MODEL
+# ===============================
+
+
+EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
+
+
+class EmbeddingModelRegistry:
+  """Process-wide, lazily loaded embedding models shared by every pipeline"""
   
   def __init__(self):
-      self.embedder = SentenceTransformer('all-MiniLM-L6-v2')
+      self._models = {}
+      self._stats = {}
+      self._lock = threading.Lock()
+  
+  def get(self, model_name: str = EMBEDDING_MODEL_NAME):
+      """Return the shared model, loading it on first use (double-checked locking)"""
+      model = self._models.get(model_name)
+      if model is None:
+          with self._lock:
+              model = self._models.get(model_name)
+              if model is None:
+                  model = self._load(model_name)
+      with self._lock:
+          self._stats[model_name]["requests"] += 1
+      return model
+  
+  def _load(self, model_name: str):
+      print(f"🧠 Loading embedding model {model_name} (pid {os.getpid()})...")
+      rss_before = _max_rss_bytes()
+      start = time.perf_counter()
+      model = SentenceTransformer(model_name)
+      load_time = time.perf_counter() - start
       
-  def get_stock_data(self, ticker: str):
-      """Get real-time stock data using yfinance"""
       try:
-          stock = yf.Ticker(ticker)
+          param_bytes = sum(p.numel() * p.element_size() for p in model.parameters())
+      except Exception:
+          param_bytes = None
+      
+      self._models[model_name] = model
+      self._stats[model_name] = {
+          "model_name": model_name,
+          "pid": os.getpid(),
+          "load_count": self._stats.get(model_name, {}).get("load_count", 0) + 1,
+          "load_time_seconds": round(load_time, 3),
+          "loaded_at": datetime.now().isoformat(),
+          "parameter_bytes": param_bytes,
+          "rss_growth_bytes": max(_max_rss_bytes() - rss_before, 0),
+          "embedding_dim": model.get_sentence_embedding_dimension(),
+          "requests": 0,
+      }
+      print(f"✅ Loaded {model_name} in {load_time:.2f}s")
+      return model
+  
+  def register(self, model, model_name: str = EMBEDDING_MODEL_NAME):
+      """Serve an already constructed model under model_name (benchmarks, offline runs)"""
+      embedding_cache.clear()     # vectors from the previous model no longer apply
+      with self._lock:
+          self._models[model_name] = model
+          self._stats[model_name] = {
+              "model_name": model_name,
+              "pid": os.getpid(),
+              "load_count": 0,
+              "registered": type(model).__name__,
+              "embedding_dim": model.get_sentence_embedding_dimension(),
+              "requests": 0,
+          }
+  
+  def stats(self):
+      """Load-time and memory stats for every model loaded in this process"""
+      with self._lock:
+          return {
+              "pid": os.getpid(),
+              "max_rss_bytes": _max_rss_bytes(),
+              "models": {name: dict(s) for name, s in self._stats.items()},
+              "cache": embedding_cache.info(),
+          }
+
+
+def _max_rss_bytes():
+  # ru_maxrss is reported in kilobytes on Linux
+  return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+embedding_registry = EmbeddingModelRegistry()
+
+
+def get_embedder(model_name: str = EMBEDDING_MODEL_NAME):
+  """Shared embedding model for this worker process"""
+  return embedding_registry.get(model_name)
+
+
+# ===============================
+# PHASE 2: DATA INGESTION
+# ===============================
+
+
+FETCH_TIMEOUT_SECS = float(os.getenv("FETCH_TIMEOUT_SECS", "10"))   # per external call
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "16"))
+
+MARKET_INDICES = {
+    "^GSPC": "S&P 500",
+    "^DJI": "Dow Jones",
+    "^IXIC": "NASDAQ"
+}
+
+# Shared by every ingester; only leaf network calls are submitted here
+# (never a task that waits on another task), so it cannot deadlock.
+_fetch_pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="yf-fetch")
+
+
+# Data that is identical across tickers or barely moves intraday is
+# cached per kind; anything past its TTL is still served (and refreshed
+# in the background) until it is FETCH_CACHE_STALE_FACTOR × TTL old.
+FETCH_CACHE_TTLS = {
+    "market_index": int(os.getenv("MARKET_OVERVIEW_TTL_SECS", "60")),
+    "fundamentals": int(os.getenv("FUNDAMENTALS_TTL_SECS", "3600")),
+}
+FETCH_CACHE_STALE_FACTOR = 10
+FETCH_CACHE_MAX_ENTRIES = 2048
+
+
+class FetchCache:
+  """Per-kind TTL cache for fetches, with stale-while-revalidate and in-flight sharing"""
+  
+  def __init__(self, ttls: Dict[str, float] = FETCH_CACHE_TTLS, stale_factor: float = FETCH_CACHE_STALE_FACTOR,
+               max_entries: int = FETCH_CACHE_MAX_ENTRIES, timeout: float = FETCH_TIMEOUT_SECS):
+      self.ttls = dict(ttls)
+      self.stale_factor = stale_factor
+      self.max_entries = max_entries
+      self.timeout = timeout            # an in-flight fetch older than this is no longer shared
+      self._values = OrderedDict()      # (kind, key) -> (fetched_at, value)
+      self._inflight = {}               # (kind, key) -> (started_at, Future)
+      # re-entrant: a fetch that finishes before add_done_callback runs
+      # _finish synchronously while submit still holds the lock
+      self._lock = threading.RLock()
+      self.stats = {
+          kind: {"hits": 0, "stale_hits": 0, "misses": 0, "shared": 0, "refreshes": 0, "errors": 0, "expired": 0}
+          for kind in self.ttls
+      }
+  
+  def submit(self, kind: str, key: str, fn, *args):
+      """Future for fn(*args), answered from cache when possible"""
+      cache_key = (kind, key)
+      ttl = self.ttls[kind]
+      now = time.monotonic()
+      
+      with self._lock:
+          self._expire_locked(kind, cache_key, now)
+          cached = self._values.get(cache_key)
+          age = now - cached[0] if cached else None
           
-          # Get current info
-          info = stock.info
+          if cached and age <= ttl * self.stale_factor:
+              self._values.move_to_end(cache_key)
+              done = Future()
+              done.set_result(cached[1])
+              if age <= ttl:
+                  self.stats[kind]["hits"] += 1
+                  return done
+              self.stats[kind]["stale_hits"] += 1
+              if cache_key not in self._inflight:
+                  self.stats[kind]["refreshes"] += 1
+                  self._start_locked(kind, cache_key, fn, args)
+              return done
           
-          # Get recent price data
-          hist = stock.history(period="5d")
+          inflight = self._inflight.get(cache_key)
+          if inflight is not None:
+              # someone is already fetching it: share that call
+              self.stats[kind]["shared"] += 1
+              return inflight[1]
+          self.stats[kind]["misses"] += 1
+          return self._start_locked(kind, cache_key, fn, args)
+  
+  def _start_locked(self, kind: str, cache_key, fn, args):
+      future = _fetch_pool.submit(fn, *args)
+      started = time.monotonic()
+      self._inflight[cache_key] = (started, future)
+      future.add_done_callback(lambda f: self._finish(kind, cache_key, f, started))
+      return future
+  
+  def _expire_locked(self, kind: str, cache_key, now: float):
+      # a hung call keeps its pool thread, but later callers stop joining it and start afresh
+      inflight = self._inflight.get(cache_key)
+      if inflight is not None and now - inflight[0] > self.timeout:
+          del self._inflight[cache_key]
+          self.stats[kind]["expired"] += 1
+  
+  def _finish(self, kind: str, cache_key, future, started: float):
+      with self._lock:
+          inflight = self._inflight.get(cache_key)
+          if inflight is not None and inflight[1] is future:
+              del self._inflight[cache_key]
+          if future.exception() is not None:
+              self.stats[kind]["errors"] += 1
+              return
+          cached = self._values.get(cache_key)
+          if cached is not None and cached[0] > started:
+              return      # an expired fetch finishing after its replacement: keep the newer value
+          self._values[cache_key] = (time.monotonic(), future.result())
+          self._values.move_to_end(cache_key)
+          while len(self._values) > self.max_entries:
+              self._values.popitem(last=False)
+  
+  def info(self):
+      with self._lock:
+          return {
+              "ttl_seconds": dict(self.ttls),
+              "entries": len(self._values),
+              "in_flight": len(self._inflight),
+              "stats": {kind: dict(counts) for kind, counts in self.stats.items()},
+          }
+
+
+fetch_cache = FetchCache()
+
+
+class StockDataIngester:
+  """Ingests real-time stock data, news, and market info"""
+  
+  @property
+  def embedder(self):
+      return get_embedder()
+  
+  # ---- leaf fetchers: one network call each, run on _fetch_pool ----
+  
+  def _fetch_info(self, ticker: str):
+      with track_fetch("yfinance", "info"):
+          return yf.Ticker(ticker).info
+  
+  def _fetch_history(self, ticker: str, period: str):
+      with track_fetch("yfinance", "history"):
+          return yf.Ticker(ticker).history(period=period, timeout=FETCH_TIMEOUT_SECS)
+  
+  def _fetch_news(self, ticker: str):
+      with track_fetch("yfinance", "news"):
+          return yf.Ticker(ticker).news
+  
+  def _submit_fetches(self, ticker: str):
+      """Start every network call needed for one ticker load"""
+      futures = {
+          "info": self._submit_info(ticker),
+          "history": _fetch_pool.submit(self._fetch_history, ticker, "5d"),
+          "news": _fetch_pool.submit(self._fetch_news, ticker),
+      }
+      for symbol in MARKET_INDICES:
+          futures[symbol] = self._submit_index(symbol)
+      return futures
+  
+  def _submit_info(self, ticker: str):
+      return fetch_cache.submit("fundamentals", ticker.upper(), self._fetch_info, ticker)
+  
+  def _submit_index(self, symbol: str):
+      return fetch_cache.submit("market_index", symbol, self._fetch_history, symbol, "2d")
+  
+  @staticmethod
+  def _result(future, name: str):
+      """Result of a finished fetch, or None if it failed or timed out"""
+      if not future.done():
+          print(f"⏱️ Timed out fetching {name}")
+          return None
+      try:
+          return future.result()
+      except Exception as e:
+          print(f"Error fetching {name}: {e}")
+          return None
+  
+  def _compose(self, ticker: str, futures: Dict):
+      info = self._result(futures["info"], f"info for {ticker}")
+      hist = self._result(futures["history"], f"history for {ticker}")
+      news = self._result(futures["news"], f"news for {ticker}")
+      
+      stock_data = self._build_stock_data(ticker, info or {}, hist) if hist is not None else None
+      news_data = self._build_news(ticker, news or [])
+      market_data = []
+      for symbol, name in MARKET_INDICES.items():
+          index_hist = self._result(futures[symbol], symbol)
+          if index_hist is not None:
+              row = self._build_index(symbol, name, index_hist)
+              if row:
+                  market_data.append(row)
+      return stock_data, news_data, market_data
+  
+  def fetch_all(self, ticker: str, timeout: float = FETCH_TIMEOUT_SECS):
+      """Stock data, news and market overview, fetched concurrently
+      
+      Returns (stock_data, news_data, market_data); any call that fails or
+      is still running after `timeout` seconds contributes nothing.
+      """
+      futures = self._submit_fetches(ticker)
+      wait(futures.values(), timeout=timeout)
+      return self._compose(ticker, futures)
+  
+  async def fetch_all_async(self, ticker: str, timeout: float = FETCH_TIMEOUT_SECS):
+      """fetch_all for async handlers: waits without holding a thread"""
+      futures = self._submit_fetches(ticker)
+      await asyncio.wait([asyncio.wrap_future(f) for f in futures.values()], timeout=timeout)
+      return self._compose(ticker, futures)
+  
+  # ---- single-kind helpers (kept for direct callers) ----
+      
+  def get_stock_data(self, ticker: str):
+      """Get real-time stock data using yfinance (info and history fetched concurrently)"""
+      info = self._submit_info(ticker)
+      hist = _fetch_pool.submit(self._fetch_history, ticker, "5d")
+      wait([info, hist], timeout=FETCH_TIMEOUT_SECS)
+      
+      hist = self._result(hist, f"stock data for {ticker}")
+      if hist is None:
+          return None
+      return self._build_stock_data(ticker, self._result(info, f"info for {ticker}") or {}, hist)
+  
+  def _build_stock_data(self, ticker: str, info: Dict, hist):
+      try:
           current_price = hist['Close'].iloc[-1] if not hist.empty else 0
           
           # Calculate basic metrics
@@ -59,29 +372,28 @@ class StockDataIngester:
   def get_stock_news(self, ticker: str, limit: int = 5):
       """Get recent news for a stock ticker"""
       try:
-          stock = yf.Ticker(ticker)
-          news = stock.news
-          
-          news_data = []
-          for article in news[:limit]:
-              news_item = {
-                  "ticker": ticker.upper(),
-                  "title": article.get('title', ''),
-                  "summary": article.get('summary', ''),
-                  "link": article.get('link', ''),
-                  "publisher": article.get('publisher', ''),
-                  "publish_time": datetime.fromtimestamp(article.get('providerPublishTime', time.time())).isoformat(),
-                  "timestamp": datetime.now().isoformat(),
-                  "data_type": "news"
-              }
-              news_data.append(news_item)
-          
-          return news_data
-          
+          return self._build_news(ticker, self._fetch_news(ticker), limit)
       except Exception as e:
           print(f"Error fetching news for {ticker}: {e}")
           return []
   
+  def _build_news(self, ticker: str, news: List[Dict], limit: int = 5):
+      news_data = []
+      for article in news[:limit]:
+          news_item = {
+              "ticker": ticker.upper(),
+              "title": article.get('title', ''),
+              "summary": article.get('summary', ''),
+              "link": article.get('link', ''),
+              "publisher": article.get('publisher', ''),
+              "publish_time": datetime.fromtimestamp(article.get('providerPublishTime', time.time())).isoformat(),
+              "timestamp": datetime.now().isoformat(),
+              "data_type": "news"
+          }
+          news_data.append(news_item)
+      
+      return news_data
+  
   def get_industry_context(self, sector: str, industry: str):
       """Get industry and market context"""
       industry_data = {
@@ -95,44 +407,40 @@ class StockDataIngester:
       return industry_data
   
   def get_market_overview(self):
-      """Get overall market indicators"""
+      """Get overall market indicators (all indices fetched concurrently)"""
+      futures = {symbol: self._submit_index(symbol) for symbol in MARKET_INDICES}
+      wait(futures.values(), timeout=FETCH_TIMEOUT_SECS)
+      
+      market_data = []
+      for symbol, name in MARKET_INDICES.items():
+          hist = self._result(futures[symbol], symbol)
+          if hist is not None:
+              row = self._build_index(symbol, name, hist)
+              if row:
+                  market_data.append(row)
+      
+      return market_data
+  
+  def _build_index(self, symbol: str, name: str, hist):
       try:
-          # Get major indices
-          indices = {
-              "^GSPC": "S&P 500",
-              "^DJI": "Dow Jones",
-              "^IXIC": "NASDAQ"
-          }
-          
-          market_data = []
-          for symbol, name in indices.items():
-              try:
-                  ticker = yf.Ticker(symbol)
-                  hist = ticker.history(period="2d")
-                  
-                  if not hist.empty:
-                      current = hist['Close'].iloc[-1]
-                      previous = hist['Close'].iloc[-2] if len(hist) >= 2 else current
-                      change = current - previous
-                      percent_change = (change / previous * 100) if previous != 0 else 0
-                      
-                      market_data.append({
-                          "index_name": name,
-                          "symbol": symbol,
-                          "current_value": round(current, 2),
-                          "change": round(change, 2),
-                          "percent_change": round(percent_change, 2),
-                          "timestamp": datetime.now().isoformat(),
-                          "data_type": "market_overview"
-                      })
-              except:
-                  continue
-          
-          return market_data
+          if hist.empty:
+              return None
+          current = hist['Close'].iloc[-1]
+          previous = hist['Close'].iloc[-2] if len(hist) >= 2 else current
+          change = current - previous
+          percent_change = (change / previous * 100) if previous != 0 else 0
           
-      except Exception as e:
-          print(f"Error fetching market overview: {e}")
-          return []
+          return {
+              "index_name": name,
+              "symbol": symbol,
+              "current_value": round(current, 2),
+              "change": round(change, 2),
+              "percent_change": round(percent_change, 2),
+              "timestamp": datetime.now().isoformat(),
+              "data_type": "market_overview"
+          }
+      except Exception:
+          return None
 
 
 # ===============================
@@ -140,30 +448,491 @@ class StockDataIngester:
 # ===============================
 
 
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+VECTOR_INDEX = os.getenv("VECTOR_INDEX", "exact")     # "exact" or "ivf" (approximate)
+VECTOR_STORE_DIR = os.getenv("VECTOR_STORE_DIR", "data/vector_store")  # "" = in-memory only
+STORE_WARM_START_SECS = int(os.getenv("STORE_WARM_START_SECS", "300"))  # reuse stored rows younger than this
+VECTOR_DTYPE = os.getenv("VECTOR_DTYPE", "float32")   # "float16" halves in-memory stores (persistent stay float32)
+VECTOR_STORE_MAX_BYTES = int(os.getenv("VECTOR_STORE_MAX_BYTES", str(256 * 1024 * 1024)))   # per store; 0 = unbounded
+
+_shared_stores = {}
+_shared_stores_lock = threading.Lock()
+
+
+def _drop_evicted_dashboards(tickers):
+  # a dashboard whose rows were evicted would answer from nothing until its TTL ran out
+  for ticker in tickers:
+      dashboard_cache.invalidate(ticker)
+
+
+def open_vector_store():
+  """Process-wide persistent store (shared by all pipelines), or a private in-memory one"""
+  if not VECTOR_STORE_DIR:
+      store = VectorStore(index=VECTOR_INDEX, dtype=VECTOR_DTYPE, max_bytes=VECTOR_STORE_MAX_BYTES)
+      store.on_evict(_drop_evicted_dashboards)
+      return store
+  with _shared_stores_lock:
+      store = _shared_stores.get(VECTOR_STORE_DIR)
+      if store is None:
+          store = PersistentVectorStore(VECTOR_STORE_DIR, index=VECTOR_INDEX, max_bytes=VECTOR_STORE_MAX_BYTES)
+          store.on_evict(_drop_evicted_dashboards)
+          _shared_stores[VECTOR_STORE_DIR] = store
+          print(f"🗄️ Opened vector store at {VECTOR_STORE_DIR} ({len(store)} items)")
+      return store
+
+
+EMBED_CACHE_MAX_ENTRIES = int(os.getenv("EMBED_CACHE_MAX_ENTRIES", "50000"))   # ~75MB at 384 dims
+
+
+def _digest(text: str):
+  return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class EmbeddingCache:
+  """LRU of embeddings keyed by a hash of the exact text, so unchanged texts are never re-encoded"""
+  
+  def __init__(self, max_entries: int = EMBED_CACHE_MAX_ENTRIES):
+      self.max_entries = max_entries
+      self._vectors = OrderedDict()      # digest -> float32 vector
+      self._lock = threading.Lock()
+      self.stats = {"hits": 0, "misses": 0}
+  
+  def lookup(self, digests: List[bytes]):
+      """Cached vector (or None) per digest"""
+      with self._lock:
+          found = []
+          for digest in digests:
+              vector = self._vectors.get(digest)
+              if vector is not None:
+                  self._vectors.move_to_end(digest)
+              found.append(vector)
+          hits = sum(v is not None for v in found)
+          self.stats["hits"] += hits
+          self.stats["misses"] += len(found) - hits
+          return found
+  
+  def store(self, digests: List[bytes], vectors: np.ndarray):
+      with self._lock:
+          for digest, vector in zip(digests, vectors):
+              # a copy: a row view would keep the whole encoded batch alive
+              self._vectors[digest] = vector.copy()
+              self._vectors.move_to_end(digest)
+          while len(self._vectors) > self.max_entries:
+              self._vectors.popitem(last=False)
+  
+  def clear(self):
+      with self._lock:
+          self._vectors.clear()
+  
+  def info(self):
+      with self._lock:
+          return {"entries": len(self._vectors), "max_entries": self.max_entries, **self.stats}
+
+
+embedding_cache = EmbeddingCache()
+
+
+def embed_texts(texts: List[str], batch_size: int = None):
+  """Encode texts in batches into L2-normalized float32 vectors (cached texts are not re-encoded)"""
+  digests = [_digest(text) for text in texts]
+  cached = embedding_cache.lookup(digests)
+  missing = [i for i, vector in enumerate(cached) if vector is None]
+  
+  if missing:
+      with stage_seconds.time(stage="embed"):
+          encoded = get_embedder().encode(
+              [texts[i] for i in missing],
+              batch_size=batch_size or EMBED_BATCH_SIZE,
+              convert_to_numpy=True,
+              normalize_embeddings=True,
+              show_progress_bar=False,
+          ).astype(np.float32, copy=False)
+      items_embedded.inc(len(missing))
+      embedding_cache.store([digests[i] for i in missing], encoded)
+      if len(missing) == len(texts):
+          return encoded
+      for i, vector in zip(missing, encoded):
+          cached[i] = vector
+  
+  if not cached:
+      return np.empty((0, get_embedder().get_sentence_embedding_dimension()), dtype=np.float32)
+  return np.stack(cached)
+
+
+def content_hash(item: Dict, text: str, ticker: str):
+  """Hash of ticker + data type + normalized text: equal hashes mean an unchanged item"""
+  normalized = " ".join(text.lower().split())
+  key = f"{ticker.upper()}\x1f{item.get('data_type', 'unknown')}\x1f{normalized}"
+  return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def document_id(item: Dict, ticker: str, digest: str = None):
+  """Stable key for an ingested item: a re-ingest of the same thing replaces it
+  
+  Items without a natural identity (news with no link or title) fall
+  back to their content hash, so identical copies still collapse.
+  """
+  kind = item.get('data_type', 'unknown')
+  ticker = ticker.upper()
+  if kind == 'market_overview':
+      return f"{ticker}:{kind}:{item.get('symbol')}"
+  if kind == 'news':
+      title = " ".join(str(item.get('title') or '').lower().split())
+      return f"{ticker}:{kind}:{item.get('link') or title or digest}"
+  if kind == 'document':
+      return f"{ticker}:{kind}:{item.get('source')}:{item.get('page')}"
+  # one current row per ticker: stock_data, price_tick, industry_context
+  return f"{ticker}:{kind}"
+
+
+# ---- live Pathway index ----
+
+LIVE_INDEX = os.getenv("LIVE_INDEX", "1") == "1"       # "0" = embed and add synchronously
+LIVE_INDEX_WAIT_SECS = float(os.getenv("LIVE_INDEX_WAIT_SECS", "30"))
+LIVE_INDEX_MAX_BATCH = 4 * EMBED_BATCH_SIZE
+LIVE_PRICE_POLL_SECS = float(os.getenv("LIVE_PRICE_POLL_SECS", "5"))   # tail of the columnar price store
+LIVE_PRICE_LOOKBACK_DAYS = 4                                           # covers weekends / holidays
+PRICE_DATA_DIR = os.getenv("PRICE_DATA_DIR", "data")                   # written by src/ingestion.py / src/ingestion_prices.py
+
+
+def vector_item(item: Dict, ticker: str, loaded_at: str):
+  """Store record for an ingested item: stable id, searchable text and content hash"""
+  text = PathwayETLPipeline.format_text(item)
+  digest = content_hash(item, text, ticker)
+  return {
+      "id": document_id(item, ticker, digest),
+      "ticker": ticker,
+      "text": text,
+      "metadata": item,
+      "timestamp": loaded_at,
+      "content_hash": digest
+  }
+
+
+class DocumentSchema(pw.Schema):
+  doc_id: str
+  store: str
+  ticket: int          # LiveIndex.upsert call the row belongs to (0 = streamed price tick)
+  ticker: str
+  text: str
+  metadata: str        # JSON of the ingested item
+  timestamp: str
+  content_hash: str
+
+
+class DocumentSubject(pw.io.python.ConnectorSubject):
+  """Streams documents queued by LiveIndex.upsert into the graph, one commit per upsert"""
+  
+  deletions_enabled = False
+  
+  def __init__(self):
+      super().__init__()
+      self.inbox = queue.Queue()       # one list of rows per upsert
+  
+  def run(self):
+      while True:
+          for row in self.inbox.get():
+              self.next_json(row)
+          self.commit()
+
+
+class PriceTickSubject(pw.io.python.ConnectorSubject):
+  """Tails the columnar price store written by src/ingestion.py and src/ingestion_prices.py
+  
+  Every LIVE_PRICE_POLL_SECS the newest tick of each ticker held by a
+  live store is emitted (once per new tick) as a price_tick document,
+  so the latest traded price is searchable without re-running the ETL.
+  """
+  
+  deletions_enabled = False
+  
+  def __init__(self, index):
+      super().__init__()
+      self.index = index
+      self.prices = PriceStore(PRICE_DATA_DIR, "prices", PRICE_COLUMNS)
+      self._emitted = {}      # (store key, ticker) -> timestamp of the last emitted tick
+  
+  def latest_tick(self, ticker: str):
+      cols = self.prices.read_last(ticker, LIVE_PRICE_LOOKBACK_DAYS)
+      if cols["ts"].size == 0:
+          return None
+      # naive local time, like every other row's timestamp
+      stamp = datetime.fromtimestamp(int(cols["ts"][-1]) / 1e9).isoformat()
+      return {
+          "ticker": ticker,
+          "price": float(cols["price"][-1]),
+          "volume": int(cols["volume"][-1]),
+          "timestamp": stamp,
+          "data_type": "price_tick"
+      }
+  
+  def poll(self):
+      """Rows for every subscribed ticker whose newest tick has not been emitted yet"""
+      rows, emitted = [], {}
+      ticks = {}
+      for key, ticker in self.index.subscriptions():
+          if ticker not in ticks:
+              try:
+                  ticks[ticker] = self.latest_tick(ticker)
+              except Exception as e:
+                  print(f"⚠️ Could not read price ticks for {ticker}: {e}")
+                  ticks[ticker] = None
+          tick = ticks[ticker]
+          if tick is None:
+              continue
+          emitted[(key, ticker)] = tick["timestamp"]
+          if self._emitted.get((key, ticker)) != tick["timestamp"]:
+              rows.append(LiveIndex.document_row(key, 0, vector_item(tick, ticker, tick["timestamp"])))
+      self._emitted = emitted         # forget stores that have been dropped
+      return rows
+  
+  def run(self):
+      while True:
+          rows = self.poll()
+          for row in rows:
+              self.next_json(row)
+          if rows:
+              self.commit()
+          time.sleep(LIVE_PRICE_POLL_SECS)
+
+
+class LiveIndex:
+  """Long-running Pathway graph that embeds documents and upserts them into vector stores
+  
+  Two sources feed one table: DocumentSubject (everything passed to
+  upsert(), i.e. each ETL run and the ticker's PDFs) and PriceTickSubject
+  (new ticks from the columnar price store, for every ticker a store
+  holds). A pw.io.subscribe sink hands every row leaving the graph to an
+  indexer thread, which embeds whatever has accumulated as one batch and
+  adds it to the target store. Rows carry a stable doc_id, so a newer
+  price or re-ingested article replaces its previous version. Stores are
+  only weakly referenced: rows for a store that has been dropped are
+  discarded. pw.run() starts once per process, in a daemon thread, the
+  first time anything is upserted.
+  """
+  
+  def __init__(self):
+      self.table = None
+      self._subject = None
+      self._stores = weakref.WeakValueDictionary()     # key -> store
+      self._keys = weakref.WeakKeyDictionary()         # store -> key
+      self._tickers = weakref.WeakKeyDictionary()      # store -> tickers upserted into it
+      self._next_key = itertools.count(1)
+      self._next_ticket = itertools.count(1)
+      self._tickets = {}              # ticket -> {"pending": rows not yet processed, "failed": bool}
+      self._outbox = queue.Queue()
+      self._lock = threading.Lock()
+      self._progress = threading.Condition()
+      self._pushed = 0
+      self._processed = 0
+      self._graph_thread = None
+      self.stats = {"batches": 0, "errors": 0, "indexed": 0, "failed_rows": 0, "dropped_rows": 0}
+  
+  @property
+  def running(self):
+      return self._graph_thread is not None and self._graph_thread.is_alive()
+  
+  def start(self):
+      with self._lock:
+          if self._graph_thread is not None:
+              return
+          self._subject = DocumentSubject()
+          documents = pw.io.python.read(self._subject, schema=DocumentSchema)
+          ticks = pw.io.python.read(PriceTickSubject(self), schema=DocumentSchema)
+          self.table = documents.concat_reindex(ticks)
+          pw.io.subscribe(self.table, on_change=self._on_change)
+          threading.Thread(target=self._index_loop, name="live-index", daemon=True).start()
+          self._graph_thread = threading.Thread(target=self._run_graph, name="pathway-graph", daemon=True)
+          self._graph_thread.start()
+  
+  def _run_graph(self):
+      try:
+          pw.run()
+      except Exception as e:
+          print(f"⚠️ Live Pathway graph stopped: {e}")
+      with self._progress:
+          self._progress.notify_all()
+  
+  def subscriptions(self):
+      """(store key, ticker) for every ticker held by a live store"""
+      with self._lock:
+          return [(self._keys[store], ticker) for store, tickers in list(self._tickers.items()) for ticker in tickers]
+  
+  @staticmethod
+  def document_row(key: str, ticket: int, item: Dict):
+      return {
+          "doc_id": item["id"],
+          "store": key,
+          "ticket": ticket,
+          "ticker": item["ticker"],
+          "text": item["text"],
+          "metadata": json.dumps(item["metadata"], default=str),
+          "timestamp": item["timestamp"],
+          "content_hash": item.get("content_hash", ""),
+      }
+  
+  def upsert(self, store, items: List[Dict]):
+      """Queue store items (id, ticker, text, metadata, timestamp, content_hash); returns a ticket for wait()"""
+      self.start()
+      with self._lock:
+          key = self._keys.get(store)
+          if key is None:
+              key = str(next(self._next_key))
+              self._keys[store] = key
+              self._stores[key] = store
+          self._tickers.setdefault(store, set()).update(item["ticker"].upper() for item in items)
+      
+      ticket = next(self._next_ticket)
+      rows = [self.document_row(key, ticket, item) for item in items]
+      with self._progress:
+          self._tickets[ticket] = {"pending": len(rows), "failed": False}
+          self._pushed += len(rows)
+      self._subject.inbox.put(rows)
+      return ticket
+  
+  def wait(self, ticket: int, timeout: float = LIVE_INDEX_WAIT_SECS):
+      """True once every row of ticket is searchable; False if any of them failed, or on timeout"""
+      with self._progress:
+          state = self._tickets[ticket]
+          self._progress.wait_for(lambda: state["pending"] == 0 or not self.running, timeout)
+          self._tickets.pop(ticket, None)
+          return state["pending"] == 0 and not state["failed"]
+  
+  def _on_change(self, key, row, time, is_addition):
+      if is_addition:
+          self._outbox.put(row)
+  
+  def _index_loop(self):
+      while True:
+          rows = [self._outbox.get()]
+          while len(rows) < LIVE_INDEX_MAX_BATCH:
+              try:
+                  rows.append(self._outbox.get_nowait())
+              except queue.Empty:
+                  break
+          try:
+              indexed = self._index(rows)
+              failed = False
+              self.stats["batches"] += 1
+          except Exception as e:
+              indexed = 0
+              failed = True
+              self.stats["errors"] += 1
+              self.stats["failed_rows"] += len(rows)
+              print(f"⚠️ Live index failed to embed {len(rows)} rows: {e}")
+          with self._progress:
+              self.stats["indexed"] += indexed
+              self._processed += len(rows)
+              for row in rows:
+                  state = self._tickets.get(row["ticket"])
+                  if state is not None:
+                      state["pending"] -= 1
+                      # a failed row is never reported as indexed: wait() returns False
+                      state["failed"] = state["failed"] or failed
+              self._progress.notify_all()
+  
+  def _index(self, rows: List[Dict]):
+      """Embed and add rows to their stores; returns how many were added"""
+      by_store = {}
+      for row in rows:
+          by_store.setdefault(row["store"], []).append(row)
+      indexed = 0
+      for key, store_rows in by_store.items():
+          store = self._stores.get(key)
+          if store is None:
+              # the store was dropped (dashboard evicted) after these rows were queued
+              self.stats["dropped_rows"] += len(store_rows)
+              continue
+          items = [
+              {
+                  "id": row["doc_id"],
+                  "ticker": row["ticker"],
+                  "text": row["text"],
+                  "metadata": json.loads(row["metadata"]),
+                  "timestamp": row["timestamp"],
+                  "content_hash": row["content_hash"],
+              }
+              for row in store_rows
+          ]
+          store.add(items, embed_texts([item["text"] for item in items]))
+          indexed += len(items)
+      return indexed
+  
+  def info(self):
+      with self._progress:
+          return {
+              "running": self.running,
+              "queued": self._pushed - self._processed,
+              "pushed": self._pushed,
+              "processed": self._processed,
+              "stores": len(self._stores),
+              **self.stats,
+          }
+
+
+live_index = LiveIndex()
+
+
 class PathwayETLPipeline:
   """Pathway-based ETL pipeline for financial data"""
   
   def __init__(self):
       self.ingester = StockDataIngester()
-      self.embedder = SentenceTransformer('all-MiniLM-L6-v2')
-      self.data_store = []
-      self.embeddings_store = []
+      self.embeddings_store = open_vector_store()
+      self.last_ingest = {}     # ticker -> new/updated/skipped counts of its latest ingest
+  
+  @property
+  def embedder(self):
+      return get_embedder()
+  
+  @property
+  def shares_store(self):
+      """True when the store is the process-wide persistent one rather than this pipeline's own"""
+      return isinstance(self.embeddings_store, PersistentVectorStore)
+  
+  def memory_bytes(self, ticker: str = None):
+      """Rough size of the vector store (embeddings + text + metadata)"""
+      return self.embeddings_store.nbytes(ticker)
+  
+  def has_fresh_data(self, ticker: str, max_age: float = STORE_WARM_START_SECS):
+      """True if the store already holds ETL rows for ticker newer than max_age seconds
+      
+      Live price ticks do not count: a tick stream must not hold back ETL re-runs.
+      """
+      self.embeddings_store.refresh()
+      stamp = self.embeddings_store.last_updated(ticker, exclude=("price_tick",))
+      if not stamp:
+          return False
+      try:
+          return time.time() - datetime.fromisoformat(stamp).timestamp() <= max_age
+      except ValueError:
+          return False
       
   def ingest_ticker_data(self, ticker: str):
       """Complete ETL pipeline for a ticker"""
       print(f"🔄 Starting ETL pipeline for {ticker}...")
       
-      all_data = []
+      # 1-2, 4. Extract stock data, news and market overview (concurrently)
+      print("📡 Extracting stock data, news and market overview...")
+      with stage_seconds.time(stage="etl.fetch"):
+          stock_data, news_data, market_data = self.ingester.fetch_all(ticker)
+      
+      return self._transform_and_load(ticker, stock_data, news_data, market_data)
+  
+  async def ingest_ticker_data_async(self, ticker: str):
+      """ingest_ticker_data for async callers: fetches are awaited, CPU work runs in a thread"""
+      print(f"🔄 Starting ETL pipeline for {ticker}...")
+      
+      print("📡 Extracting stock data, news and market overview...")
+      with stage_seconds.time(stage="etl.fetch"):
+          stock_data, news_data, market_data = await self.ingester.fetch_all_async(ticker)
       
-      # 1. Extract Stock Data
-      print("📊 Extracting stock data...")
-      stock_data = self.ingester.get_stock_data(ticker)
+      return await asyncio.to_thread(self._transform_and_load, ticker, stock_data, news_data, market_data)
+  
+  def _transform_and_load(self, ticker: str, stock_data, news_data, market_data):
+      all_data = []
       if stock_data:
           all_data.append(stock_data)
-      
-      # 2. Extract News Data
-      print("📰 Extracting news data...")
-      news_data = self.ingester.get_stock_news(ticker)
       all_data.extend(news_data)
       
       # 3. Extract Industry Context
@@ -175,138 +944,123 @@ class PathwayETLPipeline:
           )
           all_data.append(industry_data)
       
-      # 4. Extract Market Overview
-      print("🌍 Extracting market overview...")
-      market_data = self.ingester.get_market_overview()
       all_data.extend(market_data)
       
-      # 5. Transform to Pathway Tables
-      print("⚙️ Transforming data with Pathway...")
-      pathway_tables = self.transform_to_pathway(all_data, ticker)
-      
-      # 6. Load to Vector Store
+      # 5. Stream into the live Pathway index (embedded + upserted there)
       print("🗂️ Loading to vector store...")
-      self.load_to_vector_store(all_data, ticker)
+      with stage_seconds.time(stage="etl.load"):
+          counts = self.load_to_vector_store(all_data, ticker)
+      self.last_ingest[ticker.upper()] = counts
+      print(f"🧮 {counts['new']} new, {counts['updated']} updated, {counts['skipped']} unchanged")
+      
+      # 6. The ticker's PDFs from tickers.json (unchanged pages are skipped)
+      config = ticker_registry.get(ticker)
+      if config is not None and config.documents:
+          print("📄 Loading registered documents...")
+          self.ingest_pdfs(config.documents, ticker)
       
       print(f"✅ ETL pipeline complete for {ticker}!")
-      return pathway_tables, all_data
+      return self.tables(), all_data
   
-  def transform_to_pathway(self, data: List[Dict], ticker: str):
-      """Transform data into Pathway tables"""
-      
-      # Separate data by type
-      stock_data = [d for d in data if d.get('data_type') == 'stock_data']
-      news_data = [d for d in data if d.get('data_type') == 'news']
-      market_data = [d for d in data if d.get('data_type') == 'market_overview']
-      
-      tables = {}
-      
-      # Stock Data Table
-      if stock_data:
-          stock_rows = []
-          for item in stock_data:
-              stock_rows.append((
-                  item['ticker'],
-                  item['company_name'],
-                  float(item['current_price']),
-                  float(item['price_change']),
-                  float(item['percent_change']),
-                  str(item['volume']),
-                  str(item['market_cap']),
-                  str(item['pe_ratio']),
-                  item['sector'],
-                  item['industry'],
-                  item['timestamp']
-              ))
+  @staticmethod
+  def tables():
+      """Pathway tables behind the live index"""
+      return {"documents": live_index.table} if live_index.table is not None else {}
+  
+  def ingest_pdfs(self, paths: List[str], ticker: str):
+      """Load PDF pages into the vector store (text from pdf_cache; misses use the PDF process pool)"""
+      loaded_at = datetime.now().isoformat()
+      with stage_seconds.time(stage="etl.pdf_text"):
+          pages = [
+              {
+                  "ticker": ticker.upper(),
+                  "source": os.path.basename(path),
+                  "page": page_no + 1,
+                  "text": text.strip(),
+                  "timestamp": loaded_at,
+                  "data_type": "document"
+              }
+              for path, (_, document_pages) in zip(paths, pdf_cache.get_pages(paths))
+              for page_no, text in enumerate(document_pages)
+              if text.strip()
+          ]
+      with stage_seconds.time(stage="etl.load"):
+          self.load_to_vector_store(pages, ticker)
+      return pages
+  
+  @staticmethod
+  def format_text(item: Dict):
+      """Create searchable text based on data type"""
+      if item.get('data_type') == 'stock_data':
+          return f"{item['company_name']} ({item['ticker']}) - Current Price: ${item['current_price']}, Change: {item['percent_change']:.2f}%, Sector: {item['sector']}, Industry: {item['industry']}"
           
-          tables['stock'] = pw.debug.table_from_rows(
-              schema=pw.schema_from_types(
-                  ticker=str, company_name=str, current_price=float,
-                  price_change=float, percent_change=float, volume=str,
-                  market_cap=str, pe_ratio=str, sector=str, industry=str, timestamp=str
-              ),
-              rows=stock_rows
-          )
-      
-      # News Data Table
-      if news_data:
-          news_rows = []
-          for item in news_data:
-              news_rows.append((
-                  item['ticker'],
-                  item['title'],
-                  item['summary'],
-                  item['publisher'],
-                  item['publish_time'],
-                  item['timestamp']
-              ))
+      elif item.get('data_type') == 'news':
+          return f"{item['title']} - {item['summary']} (Publisher: {item['publisher']})"
           
-          tables['news'] = pw.debug.table_from_rows(
-              schema=pw.schema_from_types(
-                  ticker=str, title=str, summary=str,
-                  publisher=str, publish_time=str, timestamp=str
-              ),
-              rows=news_rows
-          )
-      
-      # Market Data Table
-      if market_data:
-          market_rows = []
-          for item in market_data:
-              market_rows.append((
-                  item['index_name'],
-                  item['symbol'],
-                  float(item['current_value']),
-                  float(item['change']),
-                  float(item['percent_change']),
-                  item['timestamp']
-              ))
+      elif item.get('data_type') == 'market_overview':
+          return f"{item['index_name']} Index - Current: {item['current_value']}, Change: {item['percent_change']:.2f}%"
           
-          tables['market'] = pw.debug.table_from_rows(
-              schema=pw.schema_from_types(
-                  index_name=str, symbol=str, current_value=float,
-                  change=float, percent_change=float, timestamp=str
-              ),
-              rows=market_rows
-          )
-      
-      return tables
+      elif item.get('data_type') == 'industry_context':
+          return f"Industry Analysis: {item['industry']} sector within {item['sector']} industry"
+          
+      elif item.get('data_type') == 'document':
+          return f"{item['text']} (Source: {item['source']}, page {item['page']})"
+          
+      elif item.get('data_type') == 'price_tick':
+          return f"{item['ticker']} last traded at ${item['price']:.2f}, volume {item['volume']:,} ({item['timestamp']})"
+          
+      return str(item)
+  
+  def embed_texts(self, texts: List[str], batch_size: int = None):
+      """Encode texts in batches into L2-normalized float32 vectors"""
+      return embed_texts(texts, batch_size)
   
-  def load_to_vector_store(self, data: List[Dict], ticker: str):
-      """Load data to vector store for RAG"""
+  def load_to_vector_store(self, data: List[Dict], ticker: str, batch_size: int = None):
+      """Load data to vector store for RAG; returns how many items were new, updated or unchanged"""
+      counts = {"new": 0, "updated": 0, "skipped": 0}
+      if not data:
+          return counts
       
+      loaded_at = datetime.now().isoformat()
+      latest = {}
       for item in data:
-          # Create searchable text based on data type
-          if item.get('data_type') == 'stock_data':
-              text_content = f"{item['company_name']} ({item['ticker']}) - Current Price: ${item['current_price']}, Change: {item['percent_change']:.2f}%, Sector: {item['sector']}, Industry: {item['industry']}"
-              
-          elif item.get('data_type') == 'news':
-              text_content = f"{item['title']} - {item['summary']} (Publisher: {item['publisher']})"
-              
-          elif item.get('data_type') == 'market_overview':
-              text_content = f"{item['index_name']} Index - Current: {item['current_value']}, Change: {item['percent_change']:.2f}%"
-              
-          elif item.get('data_type') == 'industry_context':
-              text_content = f"Industry Analysis: {item['industry']} sector within {item['sector']} industry"
-              
+          record = vector_item(item, ticker, loaded_at)
+          # a later duplicate in the same batch wins
+          latest[record["id"]] = record
+      
+      # Upsert only what changed: same id + same content hash is skipped outright
+      store = self.embeddings_store
+      store.refresh()
+      vector_items = []
+      for doc_id, item in latest.items():
+          stored = store.content_hash(doc_id)
+          if stored is None:
+              counts["new"] += 1
+          elif stored == item["content_hash"]:
+              counts["skipped"] += 1
+              continue
           else:
-              text_content = str(item)
-          
-          # Generate embedding
-          embedding = self.embedder.encode(text_content)
-          
-          # Store in vector database
-          vector_item = {
-              "id": f"{ticker}_{item.get('data_type', 'unknown')}_{len(self.embeddings_store)}",
-              "ticker": ticker,
-              "text": text_content,
-              "embedding": embedding,
-              "metadata": item,
-              "timestamp": datetime.now().isoformat()
-          }
-          
-          self.embeddings_store.append(vector_item)
-          self.data_store.append(item)
+              counts["updated"] += 1
+          vector_items.append(item)
+      counts["skipped"] += len(data) - len(latest)
+      for outcome, value in counts.items():
+          ingested_items.inc(value, outcome=outcome)
+      
+      if not vector_items:
+          return counts
+      
+      # Through the live graph; returns once the rows are searchable
+      if LIVE_INDEX:
+          with stage_seconds.time(stage="etl.live_index_wait"):
+              indexed = live_index.wait(live_index.upsert(store, vector_items))
+          if indexed:
+              return counts
+      
+      # Graph disabled or not keeping up: embed here (whole batches) and
+      # upsert directly -- ids make a late duplicate from the graph harmless
+      embeddings = self.embed_texts([item["text"] for item in vector_items], batch_size)
+      store.add(vector_items, embeddings)
+      return counts
 
 
 # ===============================
@@ -319,46 +1073,48 @@ class FinancialRAGSystem:
   
   def __init__(self, etl_pipeline: PathwayETLPipeline):
       self.pipeline = etl_pipeline
-      self.embedder = etl_pipeline.embedder
+  
+  @property
+  def embedder(self):
+      return self.pipeline.embedder
   
   def query(self, question: str, ticker: str = None, top_k: int = 5):
       """Query the financial knowledge base"""
       print(f"🔍 Searching for: '{question}'")
+      return self.query_batch([question], ticker, top_k)[0]
+  
+  def query_batch(self, questions: List[str], ticker: str = None, top_k: int = 5):
+      """Answer several questions with one embedding call and one similarity pass"""
+      if not questions:
+          return []
       
+      self.pipeline.embeddings_store.refresh()
       if not self.pipeline.embeddings_store:
-          return {"answer": "No data available. Please load ticker data first.", "sources": []}
+          return [{"answer": "No data available. Please load ticker data first.", "sources": []} for _ in questions]
       
-      # Filter by ticker if specified
-      search_space = self.pipeline.embeddings_store
-      if ticker:
-          search_space = [item for item in search_space if item['ticker'].upper() == ticker.upper()]
+      store = self.pipeline.embeddings_store
+      if ticker and not store.has_ticker(ticker):
+          return [{"answer": f"No data available for ticker {ticker}.", "sources": []} for _ in questions]
       
-      if not search_space:
-          return {"answer": f"No data available for ticker {ticker}.", "sources": []}
+      # Get query embeddings (one encode call for the whole batch)
+      with stage_seconds.time(stage="rag.embed"):
+          query_embeddings = self.pipeline.embed_texts(list(questions))
       
-      # Get query embedding
-      query_embedding = self.embedder.encode(question)
-      
-      # Calculate similarities
-      similarities = []
-      for item in search_space:
-          similarity = np.dot(query_embedding, item["embedding"]) / (
-              np.linalg.norm(query_embedding) * np.linalg.norm(item["embedding"])
-          )
-          similarities.append((similarity, item))
+      # One matrix-matrix product over the ticker's rows + argpartition top-k per question
+      with stage_seconds.time(stage="rag.search"):
+          hits = store.search_batch(query_embeddings, ticker, top_k)
       
-      # Sort and get top results
-      similarities.sort(key=lambda x: x[0], reverse=True)
-      top_results = [item[1] for item in similarities[:top_k] if item[0] > 0.3]
-      
-      # Generate answer
-      answer = self.generate_answer(question, top_results)
-      
-      return {
-          "answer": answer,
-          "sources": top_results,
-          "num_sources": len(top_results)
-      }
+      # Generate answers
+      results = []
+      with stage_seconds.time(stage="rag.generate"):
+          for question, question_hits in zip(questions, hits):
+              top_results = [item for score, item in question_hits if score > 0.3]
+              results.append({
+                  "answer": self.generate_answer(question, top_results),
+                  "sources": top_results,
+                  "num_sources": len(top_results)
+              })
+      return results
   
   def generate_answer(self, question: str, sources: List[Dict]):
       """Generate answer from sources"""
@@ -413,35 +1169,73 @@ class FinancialDashboard:
   
   def load_ticker(self, ticker: str):
       """Load ticker data into the system"""
-      if ticker.upper() in self.loaded_tickers:
-          print(f"📊 {ticker.upper()} already loaded!")
+      if not self._needs_load(ticker):
           return
       
       print(f"🚀 Loading data for {ticker.upper()}...")
       
       try:
           tables, data = self.etl.ingest_ticker_data(ticker)
-          self.loaded_tickers.add(ticker.upper())
-          
-          print(f"✅ Successfully loaded {ticker.upper()}!")
-          print(f"📈 Stock data: {len([d for d in data if d.get('data_type') == 'stock_data'])} items")
-          print(f"📰 News items: {len([d for d in data if d.get('data_type') == 'news'])} items")
-          print(f"🌍 Market data: {len([d for d in data if d.get('data_type') == 'market_overview'])} items")
+          return self._loaded(ticker, tables, data)
           
-          return tables, data
+      except Exception as e:
+          print(f"❌ Error loading {ticker}: {e}")
+          return None, None
+  
+  async def load_ticker_async(self, ticker: str):
+      """load_ticker for async handlers"""
+      if not self._needs_load(ticker):
+          return
+      
+      print(f"🚀 Loading data for {ticker.upper()}...")
+      
+      try:
+          tables, data = await self.etl.ingest_ticker_data_async(ticker)
+          return self._loaded(ticker, tables, data)
           
       except Exception as e:
           print(f"❌ Error loading {ticker}: {e}")
           return None, None
   
+  def _needs_load(self, ticker: str):
+      if ticker.upper() in self.loaded_tickers:
+          print(f"📊 {ticker.upper()} already loaded!")
+          return False
+      
+      if self.etl.has_fresh_data(ticker):
+          print(f"♻️ Warm start: using stored data for {ticker.upper()}")
+          self.loaded_tickers.add(ticker.upper())
+          return False
+      
+      return True
+  
+  def _loaded(self, ticker: str, tables, data):
+      self.loaded_tickers.add(ticker.upper())
+      
+      print(f"✅ Successfully loaded {ticker.upper()}!")
+      print(f"📈 Stock data: {len([d for d in data if d.get('data_type') == 'stock_data'])} items")
+      print(f"📰 News items: {len([d for d in data if d.get('data_type') == 'news'])} items")
+      print(f"🌍 Market data: {len([d for d in data if d.get('data_type') == 'market_overview'])} items")
+      
+      return tables, data
+  
   def query_ticker(self, question: str, ticker: str = None):
       """Query the loaded ticker data"""
       result = self.rag.query(question, self.ticker)
+      return self._format_result(result)
+  
+  def query_ticker_batch(self, questions: List[str], ticker: str = None):
+      """Answer several questions about the loaded ticker in one embedding/search pass"""
+      return [self._format_result(result) for result in self.rag.query_batch(questions, self.ticker)]
+  
+  @staticmethod
+  def _format_result(result: Dict):
+      num_sources = result.get('num_sources', 0)
       
       print(f"\n🤖 Answer: {result['answer']}")
-      print(f"📚 Based on {result['num_sources']} sources")
+      print(f"📚 Based on {num_sources} sources")
       
-      return (f"{result['answer']}\n📚 Based on {result['num_sources']} sources")
+      return (f"{result['answer']}\n📚 Based on {num_sources} sources")
   
   def run_demo(self):
       """Run interactive demo"""
@@ -461,14 +1255,9 @@ class FinancialDashboard:
           "What industry does this company operate in?",
       ]
       
-      result = []
-      for query in queries:
-          print(f"\n" + "="*50)
-          print(f"🔍 Query: {query}")
-          print("="*50)
-          print_res = self.query_ticker(query, self.ticker)
-          result.append(print_res)
-          time.sleep(1)  # Pause for readability
+      # all four answered from one encode call and one similarity pass
+      print(f"\n🔍 Queries: {queries}")
+      result = self.query_ticker_batch(queries, self.ticker)
       
       print("\n🎉 Demo complete!")
       return result
@@ -496,6 +1285,370 @@ def makeDashboard(ticker):
     return FinancialDashboard(ticker)
 
 
+# ===============================
+# PHASE 7: SERVER-LEVEL DASHBOARD CACHE
+# ===============================
+
+
+DASHBOARD_TTL_SECS = int(os.getenv("DASHBOARD_TTL_SECS", "300"))              # data considered fresh
+DASHBOARD_MAX_STALE_SECS = int(os.getenv("DASHBOARD_MAX_STALE_SECS", "1800"))  # beyond this, reload before answering
+DASHBOARD_CACHE_MAX_BYTES = int(os.getenv("DASHBOARD_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))  # private (in-memory) stores
+DASHBOARD_CACHE_MAX_ENTRIES = int(os.getenv("DASHBOARD_CACHE_MAX_ENTRIES", "64"))
+INGEST_MAX_CONCURRENCY = int(os.getenv("INGEST_MAX_CONCURRENCY", "4"))   # ticker loads running at once
+
+
+class IngestionLimiter:
+  """Process-wide cap on concurrent ticker ingestions; waiters (sync or async) are served FIFO"""
+  
+  def __init__(self, limit: int = INGEST_MAX_CONCURRENCY):
+      self.limit = max(1, limit)
+      self.running = 0
+      self._waiters = deque()        # Futures resolved when a slot is handed over
+      self._lock = threading.Lock()
+  
+  @property
+  def queued(self):
+      return len(self._waiters)
+  
+  def _enqueue(self):
+      """None if a slot was free, else a Future that resolves once one is handed over"""
+      with self._lock:
+          if self.running < self.limit and not self._waiters:
+              self.running += 1
+              return None
+          waiter = Future()
+          self._waiters.append(waiter)
+          return waiter
+  
+  def acquire(self):
+      waiter = self._enqueue()
+      if waiter is not None:
+          waiter.result()
+  
+  async def acquire_async(self):
+      waiter = self._enqueue()
+      if waiter is None:
+          return
+      try:
+          await asyncio.wrap_future(waiter)
+      except asyncio.CancelledError:
+          with self._lock:
+              got_slot = waiter.done() and not waiter.cancelled()
+              if not got_slot and waiter in self._waiters:
+                  self._waiters.remove(waiter)
+          if got_slot:
+              self.release()
+          raise
+  
+  def release(self):
+      with self._lock:
+          while self._waiters:
+              waiter = self._waiters.popleft()
+              try:
+                  # the slot passes straight to the next waiter
+                  waiter.set_result(True)
+                  return
+              except Exception:
+                  continue        # cancelled while queued
+          self.running -= 1
+  
+  def info(self):
+      with self._lock:
+          return {"limit": self.limit, "running": self.running, "queued": len(self._waiters)}
+
+
+ingestion_limiter = IngestionLimiter()
+
+
+class _CachedDashboard:
+  __slots__ = ("dashboard", "loaded_at", "last_access", "size_bytes")
+  
+  def __init__(self, dashboard, size_bytes):
+      self.dashboard = dashboard
+      self.loaded_at = time.monotonic()
+      self.last_access = self.loaded_at
+      self.size_bytes = size_bytes
+
+
+class DashboardCache:
+  """Loaded dashboards keyed by ticker, with TTL, LRU eviction and background refresh"""
+  
+  def __init__(self, ttl: float = DASHBOARD_TTL_SECS, max_stale: float = DASHBOARD_MAX_STALE_SECS,
+               max_bytes: int = DASHBOARD_CACHE_MAX_BYTES, max_entries: int = DASHBOARD_CACHE_MAX_ENTRIES,
+               factory=makeDashboard):
+      self.ttl = ttl
+      self.max_stale = max(max_stale, ttl)
+      self.max_bytes = max_bytes
+      self.max_entries = max_entries
+      self.factory = factory
+      self._entries = OrderedDict()
+      self._inflight = {}            # key -> Future of the load every concurrent caller shares
+      self._refreshing = set()
+      self._lock = threading.Lock()
+      self._refresher = None
+      self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "refreshes": 0, "evictions": 0}
+  
+  def get(self, ticker: str):
+      """Return a loaded dashboard for ticker, loading it if absent or too old"""
+      key = ticker.upper()
+      entry = self._lookup(key)
+      if entry is None:
+          return self._load(key).dashboard
+      return entry.dashboard
+  
+  async def get_async(self, ticker: str):
+      """get() for async handlers: a miss awaits the async ETL"""
+      key = ticker.upper()
+      entry = self._lookup(key)
+      if entry is None:
+          return (await self._load_async(key)).dashboard
+      return entry.dashboard
+  
+  def _lookup(self, key: str):
+      """Usable cached entry (possibly stale, refresh scheduled) or None on a miss"""
+      self._ensure_refresher()
+      
+      with self._lock:
+          entry = self._entries.get(key)
+          if entry is not None:
+              self._entries.move_to_end(key)
+              entry.last_access = time.monotonic()
+              age = entry.last_access - entry.loaded_at
+      
+          if entry is None or age > self.max_stale:
+              self.stats["misses"] += 1
+              return None
+          
+          if age > self.ttl:
+              self.stats["stale_hits"] += 1
+          else:
+              self.stats["hits"] += 1
+      
+      if age > self.ttl:
+          # serve the stale copy now, refresh for the next caller
+          self._refresh_in_background(key)
+      return entry
+  
+  def invalidate(self, ticker: str = None):
+      with self._lock:
+          if ticker is None:
+              self._entries.clear()
+          else:
+              self._entries.pop(ticker.upper(), None)
+  
+  def info(self):
+      with self._lock:
+          now = time.monotonic()
+          return {
+              "ttl_seconds": self.ttl,
+              "max_bytes": self.max_bytes,
+              "max_entries": self.max_entries,
+              "size_bytes": sum(e.size_bytes for e in self._entries.values()),
+              "loading": sorted(self._inflight),
+              "ingestions": ingestion_limiter.info(),
+              "tickers": {
+                  key: {"age_seconds": round(now - e.loaded_at, 1), "size_bytes": e.size_bytes}
+                  for key, e in self._entries.items()
+              },
+              **self.stats,
+          }
+  
+  def _join(self, key: str):
+      """(future, leader): the load already in flight for key, or a new one this caller must run"""
+      with self._lock:
+          future = self._inflight.get(key)
+          if future is not None:
+              self.stats["coalesced"] += 1
+              return future, False
+          future = self._inflight[key] = Future()
+          return future, True
+  
+  def _settle(self, key: str, future, entry=None, error=None):
+      # unregister first: whatever happens to the future, the next miss starts a new load
+      with self._lock:
+          if self._inflight.get(key) is future:
+              del self._inflight[key]
+      if future.done():
+          return
+      if error is None:
+          future.set_result(entry)
+      else:
+          # waiters see a plain error, not the leader's own cancellation
+          future.set_exception(error if isinstance(error, Exception) else RuntimeError(f"load of {key} was interrupted"))
+  
+  def _load(self, key: str):
+      # single flight: concurrent misses/refreshes of one ticker share one ingestion
+      future, leader = self._join(key)
+      if not leader:
+          return future.result()
+      try:
+          ingestion_limiter.acquire()
+          try:
+              dashboard = self.factory(key)
+              dashboard.load_ticker(key)
+          finally:
+              ingestion_limiter.release()
+          entry = self._store(key, dashboard)
+      except BaseException as e:
+          self._settle(key, future, error=e)
+          raise
+      self._settle(key, future, entry)
+      return entry
+  
+  async def _load_async(self, key: str):
+      future, leader = self._join(key)
+      if not leader:
+          # shielded: a waiter's cancellation (client gone) must not cancel the shared load
+          return await asyncio.shield(asyncio.wrap_future(future))
+      try:
+          await ingestion_limiter.acquire_async()
+          try:
+              dashboard = self.factory(key)
+              await dashboard.load_ticker_async(key)
+          finally:
+              ingestion_limiter.release()
+          entry = self._store(key, dashboard)
+      except BaseException as e:
+          self._settle(key, future, error=e)
+          raise
+      self._settle(key, future, entry)
+      return entry
+  
+  def _store(self, key: str, dashboard):
+      # rows in the shared persistent store are bounded by its own max_bytes, and
+      # evicting one dashboard would not free them: only private stores count here
+      size = 0 if dashboard.etl.shares_store else dashboard.etl.memory_bytes()
+      entry = _CachedDashboard(dashboard, size)
+      
+      if key not in dashboard.loaded_tickers:
+          # failed ingestion: hand the empty dashboard back but don't cache it
+          return entry
+      
+      with self._lock:
+          self._entries[key] = entry
+          self._entries.move_to_end(key)
+          self._evict_locked()
+      return entry
+  
+  def _evict_locked(self):
+      total = sum(e.size_bytes for e in self._entries.values())
+      while (total > self.max_bytes or len(self._entries) > self.max_entries) and len(self._entries) > 1:
+          key, evicted = self._entries.popitem(last=False)
+          total -= evicted.size_bytes
+          self.stats["evictions"] += 1
+          print(f"🧹 Evicted {key} from dashboard cache")
+  
+  def _refresh_in_background(self, key: str):
+      with self._lock:
+          if key in self._refreshing:
+              return
+          self._refreshing.add(key)
+      threading.Thread(target=self._refresh, args=(key,), daemon=True).start()
+  
+  def _refresh(self, key: str):
+      try:
+          self._load(key)
+          with self._lock:
+              self.stats["refreshes"] += 1
+      except Exception as e:
+          print(f"❌ Background refresh failed for {key}: {e}")
+      finally:
+          with self._lock:
+              self._refreshing.discard(key)
+  
+  def _ensure_refresher(self):
+      if self._refresher is not None:
+          return
+      with self._lock:
+          if self._refresher is None:
+              self._refresher = threading.Thread(target=self._refresher_loop, daemon=True)
+              self._refresher.start()
+  
+  def _refresher_loop(self):
+      """Proactively refresh recently used tickers as they go stale"""
+      while True:
+          time.sleep(max(self.ttl / 2, 1))
+          now = time.monotonic()
+          with self._lock:
+              due = [
+                  key for key, e in self._entries.items()
+                  if now - e.loaded_at > self.ttl and now - e.last_access < self.max_stale
+              ]
+          for key in due:
+              self._refresh_in_background(key)
+
+
+dashboard_cache = DashboardCache()
+
+
+# ===============================
+# METRICS (read at scrape time only)
+# ===============================
+
+
+def _fetch_cache_samples():
+  for kind, counts in fetch_cache.info()["stats"].items():
+      for event, value in counts.items():
+          yield {"kind": kind, "event": event}, value
+
+
+def _dashboard_cache_samples():
+  info = dashboard_cache.info()
+  for event in ("hits", "stale_hits", "misses", "coalesced", "refreshes", "evictions"):
+      yield {"event": event}, info[event]
+
+
+def open_stores():
+  """(name, store) for every open vector store: the shared persistent one(s) or each cached dashboard's"""
+  stores = list(_shared_stores.items())
+  with dashboard_cache._lock:
+      stores.extend((key, e.dashboard.etl.embeddings_store) for key, e in dashboard_cache._entries.items())
+  seen = set()
+  for name, store in stores:
+      if id(store) not in seen:
+          seen.add(id(store))
+          yield name, store
+
+
+def memory_report():
+  """Per-store, per-ticker rows and bytes of the vector stores"""
+  return {name: store.memory_report() for name, store in open_stores()}
+
+
+def _vector_store_samples():
+  for name, store in open_stores():
+      yield {"store": name, "field": "rows"}, len(store)
+      yield {"store": name, "field": "live_rows"}, store.live_count()
+      yield {"store": name, "field": "bytes"}, store.nbytes()
+
+
+registry.callback("backend_fetch_cache_events", "Fetch cache lookups by kind and outcome", "counter",
+                  _fetch_cache_samples)
+registry.callback("backend_dashboard_cache_events", "Dashboard cache lookups by outcome", "counter",
+                  _dashboard_cache_samples)
+registry.callback("backend_dashboard_cache_bytes", "Estimated size of cached dashboards", "gauge",
+                  lambda: [({}, dashboard_cache.info()["size_bytes"])])
+registry.callback("backend_embedding_cache_events", "Embedding cache lookups by outcome", "counter",
+                  lambda: [({"event": k}, v) for k, v in embedding_cache.info().items() if k in ("hits", "misses")])
+registry.callback("backend_ingest_queue_depth", "Ticker ingestions waiting for a concurrency slot", "gauge",
+                  lambda: [({}, ingestion_limiter.queued)])
+registry.callback("backend_ingest_running", "Ticker ingestions currently running", "gauge",
+                  lambda: [({}, ingestion_limiter.running)])
+registry.callback("backend_live_index_queued", "Documents waiting to be embedded by the live index", "gauge",
+                  lambda: [({}, live_index.info()["queued"])])
+registry.callback("backend_live_index_batches", "Live index embedding batches by outcome", "counter",
+                  lambda: [({"outcome": "ok"}, live_index.stats["batches"]),
+                           ({"outcome": "error"}, live_index.stats["errors"])])
+registry.callback("backend_live_index_rows", "Rows leaving the live graph by outcome", "counter",
+                  lambda: [({"outcome": "indexed"}, live_index.stats["indexed"]),
+                           ({"outcome": "failed"}, live_index.stats["failed_rows"]),
+                           ({"outcome": "dropped"}, live_index.stats["dropped_rows"])])
+registry.callback("backend_vector_store", "Vector store rows, live rows and approximate bytes", "gauge",
+                  _vector_store_samples)
+registry.callback("backend_vector_store_evicted_rows", "Rows dropped by vector store budget eviction", "counter",
+                  lambda: [({"store": name}, store.stats["evicted_rows"]) for name, store in open_stores()])
+
+
 # # Execute the main function
 # dashboard_instance = main()
 
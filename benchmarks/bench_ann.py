@@ -0,0 +1,71 @@
+# bench_ann.py – recall / latency of the IVF index vs exact search
+# ------------------------------------------------------------------
+# HOW TO RUN (from the backend root):
+#     python benchmarks/bench_ann.py --sizes 20000 100000 --nprobe 4 8 16
+# Uses clustered synthetic 384-d vectors (MiniLM width) spread over a
+# handful of tickers, so no model or network access is needed.
+# ------------------------------------------------------------------
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from vector_store import VectorStore  # noqa: E402
+
+DIM = 384
+TICKERS = ["AAPL", "RTX", "TSLA", "NVDA", "MSFT"]
+
+
+def build_store(n: int, rng, index: str, block: int = 500) -> tuple:
+    centers = rng.normal(size=(max(n // 200, 16), DIM))
+    store = VectorStore(index=index)
+    for start in range(0, n, block):
+        rows = min(block, n - start)
+        ticker = TICKERS[(start // block) % len(TICKERS)]
+        vectors = centers[rng.integers(0, len(centers), rows)] + rng.normal(scale=0.9, size=(rows, DIM))
+        store.add([{"id": f"{ticker}:{start + i}", "ticker": ticker, "text": "", "metadata": {}} for i in range(rows)],
+                  vectors)
+    return store, centers
+
+
+def timed_queries(store, queries, ticker, top_k, exact):
+    results, latencies = [], []
+    for q in queries:
+        start = time.perf_counter()
+        # search() builds fresh dicts per call, so results are matched by item id
+        results.append({item["id"] for _, item in store.search(q, ticker, top_k, exact=exact)})
+        latencies.append(time.perf_counter() - start)
+    return results, np.array(latencies) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IVF vs exact search benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20000, 100000])
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16])
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    print(f"{'rows':>8} {'ticker':>6} {'nprobe':>6} {'recall':>7} {'exact p50':>10} {'ivf p50':>8} {'ivf p95':>8}")
+    for n in args.sizes:
+        store, centers = build_store(n, rng, "ivf")
+        queries = centers[rng.integers(0, len(centers), args.queries)] + rng.normal(scale=0.9, size=(args.queries, DIM))
+        for ticker in (None, "AAPL"):
+            truth, exact_ms = timed_queries(store, queries, ticker, args.top_k, exact=True)
+            for nprobe in args.nprobe:
+                store.ann.nprobe = nprobe
+                approx, ann_ms = timed_queries(store, queries, ticker, args.top_k, exact=False)
+                recall = np.mean([len(a & t) / max(len(t), 1) for a, t in zip(approx, truth)])
+                print(f"{n:>8} {ticker or 'all':>6} {nprobe:>6} {recall:>7.3f} "
+                      f"{np.percentile(exact_ms, 50):>9.2f}ms {np.percentile(ann_ms, 50):>6.2f}ms "
+                      f"{np.percentile(ann_ms, 95):>6.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
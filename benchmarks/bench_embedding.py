@@ -0,0 +1,80 @@
+# bench_embedding.py – per-item vs batched embedding in load_to_vector_store
+# ------------------------------------------------------------------
+# HOW TO RUN (from the backend root):
+#     python benchmarks/bench_embedding.py --items 300 --batch-size 64
+# ------------------------------------------------------------------
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# in-memory vector store (never data/vector_store); must be set before andy is imported
+os.environ.setdefault("VECTOR_STORE_DIR", "")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from andy import PathwayETLPipeline, embedding_cache, get_embedder  # noqa: E402
+
+
+def synthetic_news(n: int, ticker: str = "AAPL"):
+    verbs = ["beats", "misses", "raises", "cuts", "reaffirms", "delays"]
+    topics = ["earnings guidance", "iPhone demand", "services revenue", "buyback plan",
+              "supply chain outlook", "AI roadmap", "dividend", "China sales"]
+    return [
+        {
+            "ticker": ticker,
+            "title": f"{ticker} {verbs[i % len(verbs)]} {topics[i % len(topics)]} ({i})",
+            "summary": f"Analysts react as {ticker} {verbs[(i * 7) % len(verbs)]} expectations on "
+                       f"{topics[(i * 3) % len(topics)]}; shares move in late trading.",
+            "publisher": ["Reuters", "Bloomberg", "Yahoo Finance"][i % 3],
+            "publish_time": datetime.now().isoformat(),
+            "timestamp": datetime.now().isoformat(),
+            "data_type": "news",
+        }
+        for i in range(n)
+    ]
+
+
+def per_item_path(pipeline, data):
+    """The pre-batching loop: one encode() call per item"""
+    for item in data:
+        pipeline.embedder.encode(pipeline.format_text(item))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-item vs batched embedding benchmark")
+    parser.add_argument("--items", type=int, default=300)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    get_embedder()  # keep model load out of the timings
+    data = synthetic_news(args.items)
+
+    def best_of(fn):
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    def batched_path():
+        # cold every repeat: a fresh store (no content-hash skips) and no cached vectors
+        embedding_cache.clear()
+        PathwayETLPipeline().load_to_vector_store(data, "AAPL", args.batch_size)
+
+    old = best_of(lambda: per_item_path(PathwayETLPipeline(), data))
+    new = best_of(batched_path)
+
+    print(f"\n{args.items} synthetic news items, batch size {args.batch_size} (best of {args.repeat})")
+    print(f"  per-item encode : {old * 1000:8.1f} ms  ({args.items / old:7.1f} items/s)")
+    print(f"  batched encode  : {new * 1000:8.1f} ms  ({args.items / new:7.1f} items/s)")
+    print(f"  speed-up        : {old / new:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# bench_indicators.py – batch indicator engine vs the per-ticker pandas path
+# ------------------------------------------------------------------
+# HOW TO RUN (from the backend root):
+#     python benchmarks/bench_indicators.py --tickers 500 --days 1260
+# Random-walk closes, no network. First checks the engine against
+# pandas (and rsi()), then times a full backfill, a latest-only pass,
+# and the old per-ticker loop (rsi() + tail(50).mean()).
+# ------------------------------------------------------------------
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from indicators import compute_indicators, rsi, TRADING_DAYS  # noqa: E402
+
+
+def random_closes(tickers: int, days: int, rng) -> np.ndarray:
+    steps = rng.normal(0.0005, 0.02, size=(tickers, days))
+    return 100 * np.exp(np.cumsum(steps, axis=1))
+
+
+def validate(close: np.ndarray, sample: int = 5) -> float:
+    full = compute_indicators(close)
+    latest = compute_indicators(close, latest=True)
+    worst = 0.0
+    for name in full:
+        worst = max(worst, np.nanmax(np.abs(full[name][:, -1] - latest[name])))
+
+    for i in range(sample):
+        s = pd.Series(close[i])
+        checks = {
+            "sma50": s.rolling(50).mean(),
+            "ema20": s.ewm(span=20, adjust=False).mean(),
+            "return_1d": s.pct_change(),
+            "volatility20": s.pct_change().rolling(20).std() * np.sqrt(TRADING_DAYS),
+        }
+        for name, expected in checks.items():
+            worst = max(worst, np.nanmax(np.abs(full[name][i] - expected.to_numpy())))
+        for t in range(15, len(s), 97):
+            worst = max(worst, abs(full["rsi14_sma"][i, t] - rsi(s.iloc[:t + 1])))
+    return worst
+
+
+def per_ticker_pandas(close: np.ndarray) -> None:
+    for row in close:
+        s = pd.Series(row)
+        float(s.tail(50).mean())
+        rsi(s, length=14)
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="batch indicator engine benchmark")
+    parser.add_argument("--tickers", type=int, default=500)
+    parser.add_argument("--days", type=int, default=1260)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    close = random_closes(args.tickers, args.days, np.random.default_rng(7))
+    print(f"max abs error vs pandas / rsi(): {validate(close):.2e}")
+
+    print(f"{args.tickers} tickers × {args.days} days")
+    print(f"  engine, full backfill : {timed(lambda: compute_indicators(close), args.repeat):8.1f} ms")
+    print(f"  engine, latest only   : {timed(lambda: compute_indicators(close, latest=True), args.repeat):8.1f} ms")
+    print(f"  pandas per ticker     : {timed(lambda: per_ticker_pandas(close), 1):8.1f} ms  (sma50 + rsi14 latest)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# bench_pdf_extract.py – PDF text extraction wall time vs worker count
+# ------------------------------------------------------------------
+# HOW TO RUN (from the backend root):
+#     python benchmarks/bench_pdf_extract.py --workers 1 2 4 8
+# Extracts every bundled PDF (no cache) through pdf_text.iter_page_texts.
+# ------------------------------------------------------------------
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from pdf_text import extract_text, extract_texts, get_pool  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF extraction benchmark")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pdfs = sorted(ROOT.glob("*.pdf"))
+    size_mb = sum(p.stat().st_size for p in pdfs) / 1e6
+    print(f"{len(pdfs)} PDFs, {size_mb:.1f} MB")
+
+    def best_of(fn):
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    baseline_text = [extract_text(p) for p in pdfs]
+    baseline = best_of(lambda: [extract_text(p) for p in pdfs])
+    print(f"  serial (request thread) : {baseline * 1000:8.1f} ms")
+
+    for workers in args.workers:
+        pool = get_pool(workers)
+        if pool is not None:
+            # start the workers outside the timed region
+            list(pool.map(abs, range(workers)))
+        assert extract_texts(pdfs, workers) == baseline_text
+        elapsed = best_of(lambda: extract_texts(pdfs, workers))
+        print(f"  {workers:>2} worker(s)            : {elapsed * 1000:8.1f} ms  ({baseline / elapsed:4.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+# bench_suite.py – offline latency / throughput / memory suite for the hot paths
+# ------------------------------------------------------------------
+# HOW TO RUN (from the backend root):
+#     python benchmarks/bench_suite.py --sizes 100 1000 10000
+#     python benchmarks/bench_suite.py --embedder hashing --latency-ms 50
+#     python benchmarks/bench_suite.py --compare benchmarks/results/<old>.json
+# Stages: analyze_stock (bundled CSVs + PDFs), ingest_ticker_data
+# (yfinance served from benchmarks/fixtures, see offline.py),
+# load_to_vector_store (cold, and re-ingesting unchanged items) and
+# FinancialRAGSystem.query / query_batch over synthetic corpora of each
+# --sizes. Every stage reports latency percentiles,
+# throughput and the tracemalloc peak of one extra traced run; results
+# are written as JSON so two releases can be diffed with --compare.
+# ------------------------------------------------------------------
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+# in-memory vector store and no model downloads; must be set before andy is imported
+os.environ.setdefault("VECTOR_STORE_DIR", "")
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)   # tickers.json and the bundled CSV/PDF paths are relative
+
+import offline  # noqa: E402
+from bench_embedding import synthetic_news  # noqa: E402
+
+QUESTIONS = [
+    "What is the current stock price?",
+    "What are the latest news about this company?",
+    "How is the overall market performing?",
+    "What industry does this company operate in?",
+    "Is demand for the company's products growing?",
+]
+
+
+def measure(fn, iterations: int, items: int = 1, warmup: int = 1) -> dict:
+    """Time `fn` (stdout silenced), then trace one more call for peak memory"""
+    sink = io.StringIO()
+    with contextlib.redirect_stdout(sink):
+        first = time.perf_counter()
+        for _ in range(warmup):
+            fn()
+        first_ms = (time.perf_counter() - first) * 1000 / max(warmup, 1)
+
+        latencies = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            fn()
+            latencies.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    ms = np.array(latencies) * 1000
+    return {
+        "iterations": iterations,
+        "items_per_call": items,
+        "first_ms": round(first_ms, 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "mean_ms": round(float(ms.mean()), 3),
+        "max_ms": round(float(ms.max()), 3),
+        "throughput_per_s": round(items * 1000 / float(ms.mean()), 2),
+        "peak_traced_bytes": peak,
+    }
+
+
+def build_corpus(size: int) -> list:
+    tickers = ["AAPL", "RTX"]
+    corpus = []
+    for i, ticker in enumerate(tickers):
+        corpus.extend(synthetic_news(size // len(tickers) + (i < size % len(tickers)), ticker))
+    return corpus
+
+
+def run_suite(args) -> dict:
+    import andy
+    if args.embedder == "hashing":
+        andy.embedding_registry.register(offline.HashingEmbedder())
+    else:
+        try:
+            andy.get_embedder()
+        except Exception as e:
+            print(f"⚠️ embedding model unavailable offline ({e}); using the hashing embedder")
+            args.embedder = "hashing"
+            andy.embedding_registry.register(offline.HashingEmbedder())
+    offline.install(latency=args.latency_ms / 1000)
+
+    stages = {}
+
+    def report(name, result):
+        stages[name] = result
+        print(f"{name:<32} p50 {result['p50_ms']:>9.2f}ms  p95 {result['p95_ms']:>9.2f}ms  "
+              f"{result['throughput_per_s']:>10.1f}/s  peak {result['peak_traced_bytes'] / 1e6:>7.1f}MB")
+
+    import main
+    for ticker in args.tickers:
+        report(f"analyze_stock[{ticker}]", measure(lambda: main.analyze_stock(ticker), args.iterations))
+
+    for ticker in args.tickers:
+        def ingest():
+            andy.fetch_cache = andy.FetchCache()        # cold fundamentals/index cache every call
+            andy.PathwayETLPipeline().ingest_ticker_data(ticker)
+        report(f"ingest_ticker_data[{ticker}]", measure(ingest, args.iterations))
+
+    for size in args.sizes:
+        corpus = build_corpus(size)
+        def load_cold():
+            andy.embedding_cache.clear()                # every text encoded again
+            andy.PathwayETLPipeline().load_to_vector_store(corpus, "AAPL")
+        report(f"load_to_vector_store[{size}]", measure(load_cold, max(1, args.iterations // 5), items=size))
+
+        pipeline = andy.PathwayETLPipeline()
+        pipeline.load_to_vector_store(corpus, "AAPL")
+        # re-ingesting identical items: content hashes match, nothing is embedded
+        report(f"reingest_unchanged[{size}]",
+               measure(lambda: pipeline.load_to_vector_store(corpus, "AAPL"), max(1, args.iterations // 5), items=size))
+        rag = andy.FinancialRAGSystem(pipeline)
+        questions = iter(QUESTIONS * (args.iterations + 2))
+        report(f"query[{size}]", measure(lambda: rag.query(next(questions), "AAPL"), args.iterations))
+        report(f"query_batch[{size}]", measure(lambda: rag.query_batch(QUESTIONS, "AAPL"), args.iterations,
+                                               items=len(QUESTIONS)))
+
+    return stages
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def compare(stages: dict, baseline_path: Path) -> None:
+    baseline = json.loads(Path(baseline_path).read_text())["stages"]
+    print(f"\n{'stage':<32} {'base p50':>10} {'now p50':>10} {'ratio':>7}")
+    for name, result in stages.items():
+        old = baseline.get(name)
+        if old:
+            print(f"{name:<32} {old['p50_ms']:>8.2f}ms {result['p50_ms']:>8.2f}ms "
+                  f"{result['p50_ms'] / max(old['p50_ms'], 1e-9):>6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="offline benchmark suite")
+    parser.add_argument("--tickers", nargs="+", default=["AAPL", "RTX"])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--embedder", choices=["model", "hashing"], default="model")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated latency per yfinance call")
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--compare", type=Path, default=None, help="earlier results JSON to diff against")
+    args = parser.parse_args()
+
+    stages = run_suite(args)
+
+    stamp = datetime.now(timezone.utc)
+    results = {
+        "meta": {
+            "timestamp": stamp.isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "embedder": args.embedder,
+            "latency_ms": args.latency_ms,
+            "iterations": args.iterations,
+            "sizes": args.sizes,
+        },
+        "stages": stages,
+    }
+    output = args.output or BENCH_DIR / "results" / f"bench_{stamp:%Y%m%dT%H%M%SZ}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"\nresults → {output}")
+
+    if args.compare:
+        compare(stages, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+# offline.py – local stand-ins for yfinance and the embedding model
+# ------------------------------------------------------------------
+# install() swaps andy.yf for a fake module whose Ticker(...) serves
+# recorded fixtures (benchmarks/fixtures/yfinance.json) and, for
+# registered tickers, history from the bundled <TICKER>.csv. An
+# optional per-call latency stands in for the network round trip.
+#
+# Re-record the fixtures (needs network and the real yfinance):
+#     python benchmarks/offline.py --record AAPL RTX
+# ------------------------------------------------------------------
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "yfinance.json"
+INDEX_SYMBOLS = ["^GSPC", "^DJI", "^IXIC"]
+INFO_KEYS = ["marketCap", "trailingPE", "trailingEps", "longName", "sector", "industry"]
+NEWS_KEYS = ["title", "summary", "link", "publisher", "providerPublishTime"]
+
+sys.path.insert(0, str(ROOT))
+
+
+def _period_rows(period: str) -> int:
+    """Approximate trading days in a yfinance period string ("5d", "6mo", "1y")"""
+    match = re.fullmatch(r"(\d+)(d|mo|y)", period)
+    if not match:
+        return 5
+    n, unit = int(match.group(1)), match.group(2)
+    return {"d": n, "mo": n * 21, "y": n * 252}[unit]
+
+
+class FakeTicker:
+    """yf.Ticker replacement backed by fixtures and the bundled price CSVs"""
+
+    def __init__(self, fixtures: dict, symbol: str, latency: float = 0.0):
+        self.symbol = symbol.upper()
+        self._fixtures = fixtures
+        self._latency = latency
+
+    def _wait(self):
+        if self._latency:
+            time.sleep(self._latency)
+
+    @property
+    def info(self) -> dict:
+        self._wait()
+        return dict(self._fixtures["info"].get(self.symbol, {}))
+
+    @property
+    def news(self) -> list:
+        self._wait()
+        return [dict(a) for a in self._fixtures["news"].get(self.symbol, [])]
+
+    def history(self, period: str = "1mo", interval: str = "1d", timeout: float = 10) -> pd.DataFrame:
+        self._wait()
+        rows = _period_rows(period)
+        from ticker_registry import ticker_registry, price_cache
+        config = ticker_registry.get(self.symbol)
+        if config is not None:
+            prices = price_cache.get(config.prices)
+            frame = pd.DataFrame(
+                {"Close": prices.close[-rows:], "Volume": prices.volume[-rows:]},
+                index=pd.DatetimeIndex(prices.date[-rows:], name="Date"),
+            )
+        else:
+            recorded = self._fixtures["history"].get(self.symbol, [])[-rows:]
+            frame = pd.DataFrame(
+                {"Close": [r[1] for r in recorded], "Volume": [r[2] for r in recorded]},
+                index=pd.DatetimeIndex([r[0] for r in recorded], name="Date"),
+            )
+        return frame
+
+
+class HashingEmbedder:
+    """Deterministic bag-of-words embedder with the SentenceTransformer.encode interface
+
+    For machines without the model in the local cache; its timings are
+    not comparable with runs that used the real model.
+    """
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+    def encode(self, texts, batch_size: int = 32, convert_to_numpy: bool = True,
+               normalize_embeddings: bool = False, show_progress_bar: bool = False):
+        single = isinstance(texts, str)
+        texts = [texts] if single else texts
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in re.findall(r"\w+", text.lower()):
+                h = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=4).digest(), "little")
+                out[row, h % self.dim] += 1.0 if h & 1 << 31 else -1.0
+        if normalize_embeddings:
+            out /= np.maximum(np.linalg.norm(out, axis=1, keepdims=True), 1e-12)
+        return out[0] if single else out
+
+
+def load_fixtures(path: Path = FIXTURES) -> dict:
+    return json.loads(Path(path).read_text())
+
+
+def install(latency: float = 0.0, fixtures: dict = None):
+    """Route andy's yfinance calls to the fixtures; returns the fake module"""
+    import andy
+    fixtures = fixtures or load_fixtures()
+    fake = SimpleNamespace(Ticker=lambda symbol: FakeTicker(fixtures, symbol, latency))
+    andy.yf = fake
+    return fake
+
+
+def record(symbols, path: Path = FIXTURES, history_days: int = 30) -> None:
+    """Capture live yfinance responses into the fixture file"""
+    import yfinance as yf
+    fixtures = {"recorded_at": pd.Timestamp.utcnow().isoformat(), "info": {}, "news": {}, "history": {}}
+    for symbol in symbols:
+        tkr = yf.Ticker(symbol)
+        info = tkr.info or {}
+        fixtures["info"][symbol] = {k: info.get(k) for k in INFO_KEYS}
+        fixtures["news"][symbol] = [{k: a.get(k) for k in NEWS_KEYS} for a in (tkr.news or [])[:10]]
+    for symbol in INDEX_SYMBOLS:
+        hist = yf.Ticker(symbol).history(period=f"{history_days}d")
+        fixtures["history"][symbol] = [
+            [ts.strftime("%Y-%m-%d"), round(float(c), 4), int(v)]
+            for ts, c, v in zip(hist.index, hist["Close"], hist["Volume"])
+        ]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(fixtures, indent=1))
+    print(f"recorded {len(symbols)} tickers + {len(INDEX_SYMBOLS)} indices → {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="record yfinance fixtures for the offline benchmarks")
+    parser.add_argument("--record", nargs="+", metavar="TICKER", required=True)
+    parser.add_argument("--history-days", type=int, default=30)
+    args = parser.parse_args()
+    record(args.record, history_days=args.history_days)
@@ -1,9 +1,14 @@
+import asyncio
 from typing import Dict
-from fastapi import FastAPI, Body, Request
+from fastapi import FastAPI, Body, Request, HTTPException, Query, Response
 import pandas as pd
-import fitz  # PyMuPDF
+from pdf_text import pdf_cache
+from sentiment import sentiment_engine
+from ticker_registry import ticker_registry, price_cache
+from src.price_store import PriceStore, PRICE_COLUMNS, INDICATOR_COLUMNS
+from metrics import registry, stage_seconds, CONTENT_TYPE
 # andy
-from andy import run, FinancialDashboard, makeDashboard
+from andy import embedding_registry, dashboard_cache, fetch_cache, live_index, memory_report
 import pathway as pw
 import pandas as pd
 import numpy as np
@@ -31,70 +36,144 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
+http_seconds = registry.histogram(
+  "backend_http_request_seconds", "Request latency by route template", ["method", "route", "status"])
+
+
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+  start = time.perf_counter()
+  status = 500
+  try:
+    response = await call_next(request)
+    status = response.status_code
+    return response
+  finally:
+    # route template (/andy/{ticker}), not the raw path, keeps label cardinality bounded
+    route = request.scope.get("route")
+    http_seconds.observe(time.perf_counter() - start, method=request.method,
+                         route=route.path if route else "unmatched", status=status)
+
+
+registry.callback("backend_pdf_cache_events", "PDF text cache lookups by outcome", "counter",
+                  lambda: [({"event": k}, v) for k, v in pdf_cache.stats.items()])
+
+@app.on_event("startup")
+def warm_price_cache():
+  # compile (or validate) every registered ticker's price columns up front
+  for ticker in ticker_registry.tickers():
+    price_cache.get(ticker_registry.get(ticker).prices)
+
+
 @app.post("/followup/{ticker}")
-def followup(ticker: str, body: Dict):
+async def followup(ticker: str, body: Dict):
   query = body.get('query')
-  dash = makeDashboard(ticker)
-  dash.load_ticker(ticker)
-  result = dash.query_ticker(query, ticker)
+  # network fetches are awaited; embedding/search run off the event loop
+  dash = await dashboard_cache.get_async(ticker)
+  result = await asyncio.to_thread(dash.query_ticker, query, ticker)
   return result
 
 
+@app.post("/ask/{ticker}")
+async def ask(ticker: str, body: Dict):
+  questions = body.get('questions')
+  if not isinstance(questions, list) or not all(isinstance(q, str) for q in questions):
+    raise HTTPException(status_code=400, detail="body must be {\"questions\": [\"...\", ...]}")
+  dash = await dashboard_cache.get_async(ticker)
+  # every question embedded in one call and scored with one matrix product
+  answers = await asyncio.to_thread(dash.query_ticker_batch, questions, ticker)
+  return [{"question": q, "answer": a} for q, a in zip(questions, answers)]
+
+
 @app.get("/andy/{ticker}")
-def andy(ticker: str):
-  results = run(ticker)
+async def andy(ticker: str):
+  dash = await dashboard_cache.get_async(ticker)
+  results = await asyncio.to_thread(dash.run_demo)
   return results
 
 
+@app.get("/cache/dashboards")
+def dashboard_cache_info():
+  return dashboard_cache.info()
+
+
+@app.get("/cache/fetch")
+def fetch_cache_info():
+  return fetch_cache.info()
+
+
+@app.get("/index/live")
+def live_index_info():
+  return live_index.info()
+
+
+@app.get("/store/memory")
+def store_memory():
+  return memory_report()
+
+
+@app.get("/embedder/stats")
+def embedder_stats():
+  return embedding_registry.stats()
+
+
+@app.get("/metrics")
+def metrics():
+  # Prometheus text format; cache/store gauges are only computed here
+  return Response(registry.render(), media_type=CONTENT_TYPE)
+
+
+# columnar history written by the ingestion scripts (src/price_store.py)
+DATA_DIR = "data"
+column_stores = {
+  "prices": PriceStore(DATA_DIR, "prices", PRICE_COLUMNS),
+  "indicators": PriceStore(DATA_DIR, "indicators", INDICATOR_COLUMNS),
+}
+
+
+def read_columns(stream: str, ticker: str, from_: str | None, to: str | None):
+  try:
+    end = datetime.fromisoformat(to) if to else datetime.utcnow()
+    start = datetime.fromisoformat(from_) if from_ else end - timedelta(days=30)
+  except ValueError as e:
+    raise HTTPException(status_code=400, detail=f"from/to must be ISO-8601: {e}")
+
+  # only the day partitions overlapping [start, end] are opened (memory-mapped)
+  cols = column_stores[stream].read_range(ticker, start, end)
+  ts = cols.pop("ts")
+  out = {"ticker": ticker.upper(), "from": start.isoformat(), "to": end.isoformat(), "rows": int(ts.size),
+         "timestamp": [datetime.utcfromtimestamp(t / 1e9).isoformat() + "Z" for t in ts.tolist()]}
+  for name, values in cols.items():
+    # NaN (missing indicator) -> null
+    out[name] = [None if v != v else v for v in values.tolist()]
+  return out
+
+
+@app.get("/prices/{ticker}")
+def prices(ticker: str, from_: str | None = Query(None, alias="from"), to: str | None = None):
+  return read_columns("prices", ticker, from_, to)
+
+
+@app.get("/indicators/{ticker}")
+def indicators(ticker: str, from_: str | None = Query(None, alias="from"), to: str | None = None):
+  return read_columns("indicators", ticker, from_, to)
+
+
 @app.get("/analyze/{ticker}")
 def analyze_stock(ticker: str):
-  stock_df, pdf_paths = None, None
-  # conditionally load stock data and news for them
-  match ticker:
-    case "RTX":
-      stock_df = pd.read_csv('./RTX.csv')
-      pdf_paths = [
-        "./rtx_cbs.pdf",
-        "./rtx_market.pdf",
-        "./rtx_yahoo.pdf",
-        "general_news.pdf",
-        "general_news_2.pdf"
-      ]
-    case "AAPL":
-      stock_df = pd.read_csv('./AAPL.csv')
-      pdf_paths = [
-        "./apple_1.pdf",
-        "./apple_2.pdf",
-        "./apple_3.pdf",
-        "general_news.pdf",
-        "general_news_2.pdf"
-      ]
-    case "TSLA":
-      stock_df = pd.read_csv('./TSLA.csv')
-      pdf_paths = [
-        "./rtx_cbs.pdf",
-        "./rtx_market.pdf",
-        "./rtx_yahoo.pdf",
-        "general_news.pdf",
-        "general_news_2.pdf"
-      ]
-
-  # Clean and parse stock data
-  stock_df.columns = stock_df.columns.str.strip().str.lower()
-  stock_df['date'] = pd.to_datetime(stock_df['date'])
-  stock_df = stock_df.sort_values('date')
-  stock_df['close_shift_7'] = stock_df['close'].shift(7)
-  stock_df['7d_return'] = (stock_df['close'] - stock_df['close_shift_7']) / stock_df['close_shift_7']
-
-  # Get the most recent 7-day return
-  latest_price = stock_df.iloc[-1][['date', 'close', '7d_return']]
-
-  all_text = ""
-  for path in pdf_paths:
-    doc = fitz.open(path)
-    for page in doc:
-        all_text += page.get_text()
-    doc.close()
+  # ticker -> price CSV + news PDFs comes from tickers.json
+  config = ticker_registry.get(ticker)
+  if config is None:
+    raise HTTPException(status_code=404, detail=f"Unknown ticker {ticker}. Available: {ticker_registry.tickers()}")
+
+  # precompiled columns (sorted, 7d returns derived); rebuilt only when the CSV changes
+  with stage_seconds.time(stage="analyze.prices"):
+    latest_price = price_cache.get(config.prices).latest()
+  pdf_paths = config.documents
+
+  # cached per file (path + mtime/size), so unchanged PDFs are never re-parsed
+  with stage_seconds.time(stage="analyze.pdf_text"):
+    documents = pdf_cache.get_documents(pdf_paths)
 
 
   # Rule-based sentiment scoring
@@ -102,11 +181,10 @@ def analyze_stock(ticker: str):
   negative_words = ["war", "conflict", "decline", "risk", "tension", "fear", "drop", "uncertain", "loss"]
 
 
-  positive_score = sum(all_text.lower().count(word) for word in positive_words)
-  negative_score = sum(all_text.lower().count(word) for word in negative_words)
-
-
-  sentiment_score = positive_score - negative_score
+  # one tokenization per document, cached term counts and per-document scores
+  with stage_seconds.time(stage="analyze.sentiment"):
+    sentiment = sentiment_engine.score(documents, positive_words, negative_words)
+  sentiment_score = sentiment["score"]
 
 
   # Combine signal
@@ -120,7 +198,7 @@ def analyze_stock(ticker: str):
 
   # Final summary
   result = {
-    "latest_price_date": str(latest_price['date'].date()),
+    "latest_price_date": str(latest_price['date']),
     "latest_close_price": latest_price['close'],
     "7_day_return": round(trend, 4),
     "sentiment_score": sentiment_score,
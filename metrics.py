@@ -0,0 +1,261 @@
+# metrics.py – minimal in-process metrics with Prometheus text exposition
+# ------------------------------------------------------------------
+# Counters, gauges and histograms keyed by label values, plus callback
+# metrics that read existing stats dicts (cache hit counts, store size)
+# only when /metrics is scraped. Recording is a dict lookup and an add
+# under a per-metric lock, so instrumenting hot paths costs ~1µs and
+# nothing else happens until somebody renders the registry.
+# ------------------------------------------------------------------
+
+import bisect
+import inspect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# seconds; covers sub-millisecond searches up to slow yfinance calls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Sample = Tuple[Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    type_name = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: tuple) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type_name}"]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonic count per label set"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [("_total", self._labels(k), v) for k, v in self._values.items()]
+
+
+class Gauge(_Metric):
+    """Last set value per label set"""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[tuple, float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def samples(self):
+        with self._lock:
+            return [("", self._labels(k), v) for k, v in self._values.items()]
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram per label set (Prometheus semantics)"""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._counts: Dict[tuple, List[int]] = {}
+        self._sums: Dict[tuple, float] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[slot] += 1
+            self._sums[key] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of a with-block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def timed(self, **labels):
+        """Decorator form of time() (sync and async functions)"""
+        def decorate(fn):
+            if inspect.iscoroutinefunction(fn):
+                @wraps(fn)
+                async def async_wrapper(*args, **kwargs):
+                    with self.time(**labels):
+                        return await fn(*args, **kwargs)
+                return async_wrapper
+
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.time(**labels):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def samples(self):
+        with self._lock:
+            snapshot = [(k, list(c), self._sums[k]) for k, c in self._counts.items()]
+        out = []
+        for key, counts, total in snapshot:
+            labels = self._labels(key)
+            running = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                running += count
+                out.append(("_bucket", {**labels, "le": _format_value(bound)}, running))
+            out.append(("_sum", labels, total))
+            out.append(("_count", labels, running))
+        return out
+
+
+class CallbackMetric(_Metric):
+    """Samples produced by a function at scrape time (reads existing stats, zero cost otherwise)"""
+
+    def __init__(self, name: str, help_text: str, type_name: str, fn: Callable[[], Iterable[Sample]]):
+        super().__init__(name, help_text)
+        self.type_name = type_name
+        self.fn = fn
+
+    def samples(self):
+        suffix = "_total" if self.type_name == "counter" else ""
+        try:
+            return [(suffix, labels, value) for labels, value in self.fn() if value is not None]
+        except Exception:
+            return []
+
+
+class Registry:
+    """Named metrics, rendered together in Prometheus text format 0.0.4"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                # module reloads / repeated setup return the original metric
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Iterable[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def callback(self, name: str, help_text: str, type_name: str,
+                 fn: Callable[[], Iterable[Sample]]) -> CallbackMetric:
+        return self._register(CallbackMetric(name, help_text, type_name, fn))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Shared across modules: one histogram for every pipeline stage, one for
+# every external call, so dashboards can break a request down by label.
+stage_seconds = registry.histogram(
+    "backend_stage_seconds", "Duration of ETL / RAG / analyze stages", ["stage"])
+fetch_seconds = registry.histogram(
+    "backend_fetch_seconds", "Duration of external data fetches", ["source", "kind"])
+fetch_errors = registry.counter(
+    "backend_fetch_errors", "External fetches that raised", ["source", "kind"])
+items_embedded = registry.counter(
+    "backend_items_embedded", "Texts encoded by the embedding model")
+ingested_items = registry.counter(
+    "backend_ingested_items", "Items offered to the vector store by upsert outcome", ["outcome"])
+
+
+@contextmanager
+def track_fetch(source: str, kind: str):
+    """Time an external call and count it as an error if it raises"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        fetch_errors.inc(source=source, kind=kind)
+        raise
+    finally:
+        fetch_seconds.observe(time.perf_counter() - start, source=source, kind=kind)
@@ -0,0 +1,216 @@
+# pdf_text.py – cached PDF text extraction for /analyze and RAG ingestion
+# ------------------------------------------------------------------
+# Text is cached page by page in memory and on disk, keyed by the
+# file's absolute path and validated against its (mtime, size). A repeated request for
+# an unchanged PDF never opens the file; an edited PDF is re-extracted
+# automatically. With verify_hash=True a stat mismatch falls back to a
+# SHA-256 of the bytes, so touched/copied-but-identical files are not
+# re-parsed.
+# Cache misses are extracted page-range by page-range across a shared
+# process pool (PDF_WORKERS) and streamed back in page order.
+# ------------------------------------------------------------------
+
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+PDF_CACHE_DIR = Path(os.getenv("PDF_CACHE_DIR", ".cache/pdf_text"))
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "4"))   # minimum pages per task
+
+_pools: Dict[int, ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def extract_text(path) -> str:
+    """Full text of a PDF, pages concatenated in order"""
+    with fitz.open(path) as doc:
+        return "".join(page.get_text() for page in doc)
+
+
+def _extract_page_range(task: Tuple[str, int, int]) -> List[str]:
+    path, start, stop = task
+    with fitz.open(path) as doc:
+        return [doc[i].get_text() for i in range(start, stop)]
+
+
+def get_pool(workers: int = PDF_WORKERS) -> Optional[ProcessPoolExecutor]:
+    """Shared extraction pool (None means extract inline)"""
+    if workers <= 1:
+        return None
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            # spawn: the server process is threaded, forking it is unsafe
+            pool = ProcessPoolExecutor(max_workers=workers,
+                                       mp_context=multiprocessing.get_context("spawn"))
+            _pools[workers] = pool
+        return pool
+
+
+def iter_page_texts(paths, workers: int = PDF_WORKERS,
+                    pages_per_task: int = PAGES_PER_TASK) -> Iterator[Tuple[str, int, str]]:
+    """Yield (path, page number, text) for every page of every PDF, in order
+
+    Each document is split into at most `workers` contiguous page ranges
+    (every open re-loads fonts and resources, so ranges are kept large)
+    and the ranges are fanned out across the process pool; results are
+    yielded as soon as the next range in order is ready.
+    """
+    workers = max(workers, 1)
+    tasks = []
+    for path in paths:
+        path = str(path)
+        with fitz.open(path) as doc:
+            n_pages = doc.page_count
+        step = max(pages_per_task, -(-n_pages // workers))
+        tasks.extend((path, start, min(start + step, n_pages))
+                     for start in range(0, n_pages, step))
+
+    pool = get_pool(workers) if len(tasks) > 1 else None
+    results = pool.map(_extract_page_range, tasks) if pool else map(_extract_page_range, tasks)
+    for (path, start, _), texts in zip(tasks, results):
+        for offset, text in enumerate(texts):
+            yield path, start + offset, text
+
+
+def extract_pages(paths, workers: int = PDF_WORKERS) -> List[List[str]]:
+    """Page texts of each PDF, extracted in parallel"""
+    pages: Dict[str, List[str]] = {str(path): [] for path in paths}
+    for path, _, text in iter_page_texts(paths, workers):
+        pages[path].append(text)
+    return [pages[str(path)] for path in paths]
+
+
+def extract_texts(paths, workers: int = PDF_WORKERS) -> List[str]:
+    """Full text of each PDF, extracted in parallel"""
+    return ["".join(pages) for pages in extract_pages(paths, workers)]
+
+
+def file_sha256(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fp:
+        for block in iter(lambda: fp.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PdfTextCache:
+    """In-memory + on-disk cache of extracted PDF text, kept per page"""
+
+    def __init__(self, cache_dir: Optional[Path] = PDF_CACHE_DIR, verify_hash: bool = False,
+                 workers: int = PDF_WORKERS):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.verify_hash = verify_hash
+        self.workers = workers
+        self._memory: Dict[str, Tuple[Tuple[int, int], List[str]]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "hash_hits": 0, "extractions": 0}
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def get_text(self, path) -> str:
+        return self.get_document(path)[1]
+
+    def get_texts(self, paths) -> List[str]:
+        return [text for _, text in self.get_documents(paths)]
+
+    def get_document(self, path) -> Tuple[str, str]:
+        return self.get_documents([path])[0]
+
+    def get_documents(self, paths) -> List[Tuple[str, str]]:
+        """(document key, text) pairs; the key changes whenever the file does"""
+        return [(key, "".join(pages)) for key, pages in self.get_pages(paths)]
+
+    def get_pages(self, paths) -> List[Tuple[str, List[str]]]:
+        """(document key, page texts) pairs, in the order of paths"""
+        keys, stamps, pages, hashes = [], [], [], []
+        for path in paths:
+            key = str(Path(path).resolve())
+            st = os.stat(key)
+            stamp = (st.st_mtime_ns, st.st_size)
+            cached, sha = self._lookup(key, stamp)
+            keys.append(key)
+            stamps.append(stamp)
+            pages.append(cached)
+            hashes.append(sha)
+
+        missing = [i for i, cached in enumerate(pages) if cached is None]
+        if missing:
+            # all misses of this call go through the pool together
+            extracted = extract_pages([keys[i] for i in missing], self.workers)
+            for i, document_pages in zip(missing, extracted):
+                self._count("extractions")
+                self._write_disk(keys[i], stamps[i], hashes[i], document_pages)
+                pages[i] = self._remember(keys[i], stamps[i], document_pages)
+
+        return [(f"{key}:{stamp[0]}:{stamp[1]}", document_pages)
+                for key, stamp, document_pages in zip(keys, stamps, pages)]
+
+    def _lookup(self, key: str, stamp: Tuple[int, int]) -> Tuple[Optional[List[str]], Optional[str]]:
+        """(cached pages or None, sha256 if it was computed)"""
+        with self._lock:
+            cached = self._memory.get(key)
+        if cached and cached[0] == stamp:
+            self._count("memory_hits")
+            return cached[1], None
+
+        entry = self._read_disk(key)
+        if entry and tuple(entry["stamp"]) == stamp:
+            self._count("disk_hits")
+            return self._remember(key, stamp, entry["pages"]), None
+
+        sha = file_sha256(key) if self.verify_hash else None
+        if entry and sha and entry.get("sha256") == sha:
+            # same bytes, new mtime: keep the pages, refresh the stamp
+            self._count("hash_hits")
+            self._write_disk(key, stamp, sha, entry["pages"])
+            return self._remember(key, stamp, entry["pages"]), sha
+
+        return None, sha
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+
+    # ── internals ───────────────────────────────────────────
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def _remember(self, key: str, stamp: Tuple[int, int], pages: List[str]) -> List[str]:
+        with self._lock:
+            self._memory[key] = (stamp, pages)
+        return pages
+
+    def _disk_path(self, key: str) -> Path:
+        return self.cache_dir / (hashlib.sha1(key.encode()).hexdigest() + ".json")
+
+    def _read_disk(self, key: str) -> Optional[dict]:
+        if not self.cache_dir:
+            return None
+        try:
+            entry = json.loads(self._disk_path(key).read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+        # entries written before pages were kept hold only "text": treat them as misses
+        return entry if entry.get("path") == key and "pages" in entry else None
+
+    def _write_disk(self, key: str, stamp: Tuple[int, int], sha: Optional[str], pages: List[str]) -> None:
+        if not self.cache_dir:
+            return
+        target = self._disk_path(key)
+        tmp = target.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"path": key, "stamp": list(stamp), "sha256": sha, "pages": pages}),
+                       encoding="utf-8")
+        os.replace(tmp, target)
+
+
+pdf_cache = PdfTextCache()
@@ -0,0 +1,153 @@
+# sentiment.py – single-pass lexicon sentiment over a per-document term index
+# ------------------------------------------------------------------
+# Each document is lower-cased and tokenized once into a term-count
+# index. A lexicon is scored against that index with one dict lookup
+# per lexicon stem, so scoring is O(|lexicon|) per document instead
+# of O(|lexicon| × |corpus|). Words match whole tokens only ("gain"
+# no longer matches inside "against"), and both documents and lexicons
+# go through a light suffix stemmer, so inflections match their base
+# word ("gains", "gained", "dropped", "rising", "declines").
+# Term indexes are cached per document key and scores per
+# (document key, lexicon), both as LRUs, so a new PDF or a changed
+# lexicon only costs the delta.
+# ------------------------------------------------------------------
+
+import re
+import threading
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+
+TOKEN_RE = re.compile(r"[a-z]+")
+VOWELS = frozenset("aeiou")
+
+POSITIVE_WORDS = ["growth", "demand", "outperform", "strong", "boost", "rising", "interest", "positive", "gain"]
+NEGATIVE_WORDS = ["war", "conflict", "decline", "risk", "tension", "fear", "drop", "uncertain", "loss"]
+
+
+def _measure(stem: str) -> int:
+    """Number of vowel→consonant transitions (Porter's m)"""
+    m, prev_vowel = 0, False
+    for ch in stem:
+        vowel = ch in VOWELS
+        if prev_vowel and not vowel:
+            m += 1
+        prev_vowel = vowel
+    return m
+
+
+def _ends_cvc(stem: str) -> bool:
+    """consonant-vowel-consonant ending, last consonant not w/x/y ("hop", "ris")"""
+    return (len(stem) >= 3 and stem[-1] not in VOWELS and stem[-1] not in "wxy"
+            and stem[-2] in VOWELS and stem[-3] not in VOWELS)
+
+
+@lru_cache(maxsize=65536)
+def stem(word: str) -> str:
+    """Light suffix stemmer (plural, -ed, -ing and final -e; after Porter's step 1)
+
+    "dropped", "drops" -> "drop"; "rising", "rises" -> "rise";
+    "declined", "decline" -> "declin"; "losses" -> "loss".
+    """
+    if len(word) <= 3:
+        return word
+    if word.endswith("sses"):
+        word = word[:-2]
+    elif word.endswith("ies"):
+        word = word[:-3] + "y"
+    elif word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        word = word[:-1]
+
+    for suffix in ("ing", "ed"):
+        base = word[: -len(suffix)]
+        if word.endswith(suffix) and any(ch in VOWELS for ch in base):
+            word = base
+            if word.endswith(("at", "bl", "iz")):
+                word += "e"
+            elif len(word) >= 2 and word[-1] == word[-2] and word[-1] not in "lsz":
+                word = word[:-1]
+            elif _measure(word) == 1 and _ends_cvc(word):
+                word += "e"
+            break
+
+    if word.endswith("e"):
+        m = _measure(word[:-1])
+        if m > 1 or (m == 1 and not _ends_cvc(word[:-1])):
+            word = word[:-1]
+    return word
+
+
+def term_counts(text: str) -> Counter:
+    """Whole-word stem counts for a document (one lower-case pass)"""
+    counts = Counter()
+    for token, n in Counter(TOKEN_RE.findall(text.lower())).items():
+        counts[stem(token)] += n
+    return counts
+
+
+def expand_lexicon(words: Iterable[str]) -> Tuple[str, ...]:
+    """Stems of the lexicon words, deduplicated"""
+    return tuple(sorted({stem(word.lower()) for word in words}))
+
+
+class SentimentEngine:
+    """Lexicon sentiment scoring over cached per-document term counts"""
+
+    def __init__(self, max_documents: int = 256, max_scores: int = 4096):
+        self.max_documents = max_documents
+        self.max_scores = max_scores
+        self._index: "OrderedDict[str, Counter]" = OrderedDict()
+        self._scores: "OrderedDict[Tuple[str, Tuple[str, ...]], int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def index_document(self, doc_key: str, text: str) -> Counter:
+        with self._lock:
+            counts = self._index.get(doc_key)
+            if counts is not None:
+                self._index.move_to_end(doc_key)
+        if counts is None:
+            counts = term_counts(text)
+            with self._lock:
+                self._index[doc_key] = counts
+                while len(self._index) > self.max_documents:
+                    self._forget(next(iter(self._index)))
+        return counts
+
+    def lexicon_count(self, doc_key: str, text: str, lexicon: Tuple[str, ...]) -> int:
+        """Occurrences of any lexicon stem in one document"""
+        cache_key = (doc_key, lexicon)
+        with self._lock:
+            cached = self._scores.get(cache_key)
+            if cached is not None:
+                self._scores.move_to_end(cache_key)
+        if cached is not None:
+            return cached
+        counts = self.index_document(doc_key, text)
+        total = sum(counts.get(term, 0) for term in lexicon)
+        with self._lock:
+            self._scores[cache_key] = total
+            while len(self._scores) > self.max_scores:
+                self._scores.popitem(last=False)
+        return total
+
+    def score(self, documents: List[Tuple[str, str]],
+              positive_words: Iterable[str] = POSITIVE_WORDS,
+              negative_words: Iterable[str] = NEGATIVE_WORDS) -> Dict[str, int]:
+        """Positive/negative hit counts and net score over (doc_key, text) pairs"""
+        positive = expand_lexicon(positive_words)
+        negative = expand_lexicon(negative_words)
+        positive_score = sum(self.lexicon_count(key, text, positive) for key, text in documents)
+        negative_score = sum(self.lexicon_count(key, text, negative) for key, text in documents)
+        return {
+            "positive": positive_score,
+            "negative": negative_score,
+            "score": positive_score - negative_score,
+        }
+
+    def _forget(self, doc_key: str) -> None:
+        self._index.pop(doc_key, None)
+        for cache_key in [k for k in self._scores if k[0] == doc_key]:
+            del self._scores[cache_key]
+
+
+sentiment_engine = SentimentEngine()
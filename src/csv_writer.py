@@ -0,0 +1,139 @@
+# csv_writer.py – buffered, batched CSV persistence for the ingestion streams
+# ------------------------------------------------------------------
+# Rows are handed to a background thread through a queue, so a slow
+# disk can never stall a polling loop. The writer keeps one open handle
+# per (ticker, stream, day), buffers rows and writes them out when
+# FLUSH_ROWS rows are pending or FLUSH_SECS have passed, and again on
+# shutdown. Files rotate daily:
+#     data/<TICKER>/<stream>_<YYYY-MM-DD>.csv
+# ------------------------------------------------------------------
+
+import atexit
+import csv
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+FLUSH_ROWS     = 500       # pending rows that trigger a flush
+FLUSH_SECS     = 5.0       # max age of a buffered row
+MAX_OPEN_FILES = 256       # least-recently-used handles beyond this are closed
+
+_STOP = object()
+
+
+class BufferedCSVWriter:
+    """Append rows to per-ticker daily CSVs from a background thread"""
+
+    def __init__(self, data_dir: Path, flush_rows: int = FLUSH_ROWS, flush_secs: float = FLUSH_SECS,
+                 max_open_files: int = MAX_OPEN_FILES, fsync: bool = False):
+        self.data_dir = Path(data_dir)
+        self.flush_rows = flush_rows
+        self.flush_secs = flush_secs
+        self.max_open_files = max_open_files
+        self.fsync = fsync
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._pending: Dict[Tuple[str, str, str], Tuple[List[str], List[list]]] = {}
+        self._pending_rows = 0
+        self._handles: "OrderedDict[Tuple[str, str, str], object]" = OrderedDict()
+        self._flushed = threading.Event()
+        self.stats = {"rows": 0, "failed_rows": 0, "flushes": 0, "files_opened": 0}
+        self._thread = threading.Thread(target=self._run, name="csv-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # ── producer side (never blocks) ────────────────────────
+    def write(self, ticker: str, stream: str, header: List[str], row: list) -> None:
+        day = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        self._queue.put((ticker, stream, day, header, row))
+
+    def flush(self, timeout: float = 10.0) -> None:
+        """Block until everything queued so far is on disk"""
+        self._flushed.clear()
+        self._queue.put(None)
+        self._flushed.wait(timeout)
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout=10.0)
+
+    # ── writer thread ───────────────────────────────────────
+    def _run(self) -> None:
+        last_flush = time.monotonic()
+        while True:
+            timeout = max(0.0, last_flush + self.flush_secs - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = ()
+
+            if item is _STOP:
+                self._flush_pending()
+                for fp in self._handles.values():
+                    fp.close()
+                self._handles.clear()
+                return
+            if item is None:
+                self._flush_pending()
+                last_flush = time.monotonic()
+                self._flushed.set()
+                continue
+            if item:
+                ticker, stream, day, header, row = item
+                key = (ticker, stream, day)
+                self._pending.setdefault(key, (header, []))[1].append(row)
+                self._pending_rows += 1
+
+            if self._pending_rows >= self.flush_rows or time.monotonic() - last_flush >= self.flush_secs:
+                self._flush_pending()
+                last_flush = time.monotonic()
+
+    def _flush_pending(self) -> None:
+        if not self._pending:
+            return
+        for key, (header, rows) in self._pending.items():
+            try:
+                self._write_batch(key, header, rows)
+                self.stats["rows"] += len(rows)
+            except Exception as e:
+                # one bad batch (disk error, unserializable row) must not kill the writer thread
+                self.stats["failed_rows"] += len(rows)
+                print(f"⚠️ failed to persist {len(rows)} rows for {key[0]}/{key[1]}: {e!r}")
+        self.stats["flushes"] += 1
+        self._pending.clear()
+        self._pending_rows = 0
+
+    def _write_batch(self, key: Tuple[str, str, str], header: List[str], rows: List[list]) -> None:
+        """Write one (ticker, stream, day) batch; subclasses can store rows differently"""
+        fp = self._handle(key, header)
+        csv.writer(fp).writerows(rows)
+        fp.flush()
+        if self.fsync:
+            os.fsync(fp.fileno())
+
+    def _handle(self, key: Tuple[str, str, str], header: List[str]):
+        fp = self._handles.get(key)
+        if fp is not None:
+            self._handles.move_to_end(key)
+            return fp
+
+        ticker, stream, day = key
+        # a new day for this stream: the previous day's file is done
+        for old in [k for k in self._handles if k[:2] == key[:2]]:
+            self._handles.pop(old).close()
+        while len(self._handles) >= self.max_open_files:
+            self._handles.popitem(last=False)[1].close()
+
+        ticker_dir = self.data_dir / ticker
+        ticker_dir.mkdir(parents=True, exist_ok=True)
+        fp = (ticker_dir / f"{stream}_{day}.csv").open("a", newline="")
+        if fp.tell() == 0:
+            csv.writer(fp).writerow(header)
+        self._handles[key] = fp
+        self.stats["files_opened"] += 1
+        return fp
@@ -0,0 +1,352 @@
+# indicators.py – incremental technical indicators over a price tick stream
+# ------------------------------------------------------------------
+# Indicators are defined on daily closes, the same as the old
+# 6-month-history recompute: sma50 is the mean of the last 50 closes,
+# ema20 is pandas ewm(span=20, adjust=False), and rsi14 is the
+# rolling-mean RSI of rsi() below. Daily history is loaded
+# once per ticker at bootstrap. After that every tick is the provisional
+# close of the current day: a tick costs O(1) (running sums / the last
+# EMA value), and the day's last tick is committed as a close once a
+# tick for a later day arrives.
+#
+# The batch engine at the bottom (compute_indicators) takes a whole
+# (tickers × days) close matrix and computes every indicator for every
+# ticker with array operations: latest=False backfills each day,
+# latest=True returns only the last value using closed-form weights.
+# Tickers with a shorter history are left-padded with NaN; each row is
+# computed from its first valid close, so both modes agree.
+# ------------------------------------------------------------------
+
+import functools
+import inspect
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+SMA_WINDOW = 50
+EMA_SPAN   = 20
+RSI_WINDOW = 14
+VOL_WINDOW = 20
+TRADING_DAYS = 252         # volatility is annualized
+
+
+class RollingMean:
+    """Mean of the last `window` committed values, O(1) per update"""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values: deque = deque(maxlen=window)
+        self.total = 0.0
+
+    def push(self, x: float) -> None:
+        if len(self.values) == self.window:
+            self.total -= self.values[0]
+        self.values.append(x)
+        self.total += x
+
+    def peek(self, x: float) -> Optional[float]:
+        """Mean over the window if `x` were pushed next (None until the window fills)"""
+        if len(self.values) == self.window:
+            return (self.total - self.values[0] + x) / self.window
+        if len(self.values) == self.window - 1:
+            return (self.total + x) / self.window
+        return None
+
+
+class EMA:
+    """pandas ewm(span, adjust=False) over committed values"""
+
+    def __init__(self, span: int):
+        self.alpha = 2.0 / (span + 1)
+        self.value: Optional[float] = None
+
+    def push(self, x: float) -> None:
+        self.value = self.peek(x)
+
+    def peek(self, x: float) -> float:
+        return x if self.value is None else self.alpha * x + (1 - self.alpha) * self.value
+
+
+class RollingRSI:
+    """RSI from rolling-mean gains/losses of the last `window` close-to-close moves"""
+
+    def __init__(self, window: int):
+        self.gains = RollingMean(window)
+        self.losses = RollingMean(window)
+        self.last: Optional[float] = None
+
+    def push(self, x: float) -> None:
+        if self.last is not None:
+            delta = x - self.last
+            self.gains.push(max(delta, 0.0))
+            self.losses.push(max(-delta, 0.0))
+        self.last = x
+
+    def peek(self, x: float) -> Optional[float]:
+        if self.last is None:
+            return None
+        delta = x - self.last
+        avg_gain = self.gains.peek(max(delta, 0.0))
+        avg_loss = self.losses.peek(max(-delta, 0.0))
+        if avg_gain is None:
+            return None
+        if avg_loss == 0:
+            return 100.0
+        return 100 - 100 / (1 + avg_gain / avg_loss)
+
+
+class TickerIndicators:
+    """Running indicator state for one ticker"""
+
+    def __init__(self, sma_window: int = SMA_WINDOW, ema_span: int = EMA_SPAN, rsi_window: int = RSI_WINDOW):
+        self.sma = RollingMean(sma_window)
+        self.ema = EMA(ema_span)
+        self.rsi = RollingRSI(rsi_window)
+        self.day: Optional[str] = None        # day of the provisional close
+        self.close: Optional[float] = None    # latest tick of that day
+
+    def _commit(self, close: float) -> None:
+        self.sma.push(close)
+        self.ema.push(close)
+        self.rsi.push(close)
+
+    def seed(self, closes: Iterable[Tuple[str, float]]) -> None:
+        """Commit historical (day, close) bars, oldest first"""
+        for day, close in closes:
+            self._commit(float(close))
+            self.day = day
+        self.close = None
+
+    def update(self, day: str, price: float) -> Dict[str, Optional[float]]:
+        """Apply one tick and return the indicators with it as today's close"""
+        if self.close is not None and day > self.day:
+            self._commit(self.close)          # previous day is final
+            self.close = None
+        if self.close is None:
+            if self.day is None or day > self.day:
+                self.day, self.close = day, float(price)
+        elif day == self.day:
+            self.close = float(price)
+        # a late tick for an already-committed day is ignored
+        return self.values()
+
+    def values(self) -> Dict[str, Optional[float]]:
+        if self.close is None:
+            return {"sma50": None, "ema20": self.ema.value, "rsi14": None}
+        return {
+            "sma50": self.sma.peek(self.close),
+            "ema20": self.ema.peek(self.close),
+            "rsi14": self.rsi.peek(self.close),
+        }
+
+
+class IndicatorState:
+    """TickerIndicators per symbol, fed by (ticker, ISO timestamp, price) ticks"""
+
+    def __init__(self):
+        self.tickers: Dict[str, TickerIndicators] = {}
+
+    def get(self, ticker: str) -> TickerIndicators:
+        state = self.tickers.get(ticker)
+        if state is None:
+            state = self.tickers[ticker] = TickerIndicators()
+        return state
+
+    def seed(self, ticker: str, closes: Iterable[Tuple[str, float]]) -> None:
+        self.get(ticker).seed(closes)
+
+    def update(self, ticker: str, timestamp: str, price: float) -> Dict[str, Optional[float]]:
+        stamp = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+        if stamp.tzinfo is not None:
+            stamp = stamp.astimezone(timezone.utc)
+        return self.get(ticker).update(stamp.strftime("%Y-%m-%d"), price)
+
+
+# ──────────────────────────────
+# Batch engine: (tickers × days) close matrix
+# Leading NaNs mark days before a ticker's history starts; rows are
+# grouped by their first valid day and computed on that suffix. Closes
+# after it must be gap-free (forward-filled), a later NaN is rejected.
+# Columns with too little history are NaN.
+# ──────────────────────────────
+
+def rsi(series: pd.Series, length: int = 14) -> float | None:
+    """Reference per-series RSI (rolling-mean gains/losses), formerly in realtime_ingestion.py"""
+    if len(series) < length + 1:
+        return None
+    delta = series.diff().dropna()
+    gain = delta.where(delta > 0, 0.0)
+    loss = -delta.where(delta < 0, 0.0)
+    avg_gain = gain.rolling(window=length).mean().iloc[-1]
+    avg_loss = loss.rolling(window=length).mean().iloc[-1]
+    if avg_loss == 0:
+        return 100.0
+    rs = avg_gain / avg_loss
+    return 100 - (100 / (1 + rs))
+
+
+def _ragged(fn):
+    """Run a batch indicator per group of rows sharing a first valid close"""
+    signature = inspect.signature(fn)
+
+    @functools.wraps(fn)
+    def wrapper(close, *args, **kwargs):
+        close = np.atleast_2d(np.asarray(close, dtype=np.float64))
+        bound = signature.bind(close, *args, **kwargs)
+        bound.apply_defaults()
+        latest = bound.arguments["latest"]
+        tickers, days = close.shape
+        valid = ~np.isnan(close)
+        starts = np.where(valid.any(axis=1), valid.argmax(axis=1), days)
+        if (valid.sum(axis=1) != days - starts).any():
+            raise ValueError("closes have a NaN after the first valid close (forward-fill gaps first)")
+        if not starts.any():
+            return fn(close, *args, **kwargs)
+
+        out = np.full(tickers if latest else close.shape, np.nan)
+        for start in np.unique(starts[starts < days]):
+            rows = starts == start
+            bound.arguments["close"] = close[rows, start:]
+            if latest:
+                out[rows] = fn(*bound.args, **bound.kwargs)
+            else:
+                out[rows, start:] = fn(*bound.args, **bound.kwargs)
+        return out
+
+    return wrapper
+
+
+def _rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    if x.shape[1] < window:
+        return out
+    c = np.cumsum(x, axis=1)
+    out[:, window - 1] = c[:, window - 1]
+    out[:, window:] = c[:, window:] - c[:, :-window]
+    out[:, window - 1:] /= window
+    return out
+
+
+def _rsi_from_means(avg_gain: np.ndarray, avg_loss: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = 100 - 100 / (1 + avg_gain / avg_loss)
+    return np.where(avg_loss == 0, np.where(np.isnan(avg_gain), np.nan, 100.0), out)
+
+
+def _decay_weights(alpha: float, n: int) -> np.ndarray:
+    """alpha * (1 - alpha)^k for k = n-1 … 0, i.e. oldest first"""
+    return alpha * (1 - alpha) ** np.arange(n - 1, -1, -1)
+
+
+@_ragged
+def sma(close: np.ndarray, window: int = SMA_WINDOW, latest: bool = False) -> np.ndarray:
+    if latest:
+        return close[:, -window:].mean(axis=1) if close.shape[1] >= window else np.full(len(close), np.nan)
+    return _rolling_mean(close, window)
+
+
+@_ragged
+def ema(close: np.ndarray, span: int = EMA_SPAN, latest: bool = False) -> np.ndarray:
+    """pandas ewm(span, adjust=False), seeded with the first close"""
+    alpha = 2.0 / (span + 1)
+    n = close.shape[1]
+    if latest:
+        return (1 - alpha) ** (n - 1) * close[:, 0] + close[:, 1:] @ _decay_weights(alpha, n - 1)
+    out = np.empty(close.shape)
+    out[:, 0] = close[:, 0]
+    for t in range(1, n):
+        out[:, t] = alpha * close[:, t] + (1 - alpha) * out[:, t - 1]
+    return out
+
+
+def _gains_losses(close: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    delta = np.diff(close, axis=1)
+    return np.maximum(delta, 0.0), np.maximum(-delta, 0.0)
+
+
+@_ragged
+def rsi_wilder(close: np.ndarray, window: int = RSI_WINDOW, latest: bool = False) -> np.ndarray:
+    """Wilder RSI: SMA of the first `window` moves, then smoothing with alpha = 1/window"""
+    gain, loss = _gains_losses(close)
+    moves = gain.shape[1]
+    alpha = 1.0 / window
+    if moves < window:
+        return np.full(len(close) if latest else close.shape, np.nan)
+
+    avg_gain, avg_loss = gain[:, :window].mean(axis=1), loss[:, :window].mean(axis=1)
+    if latest:
+        rest = moves - window
+        w = _decay_weights(alpha, rest)
+        decay = (1 - alpha) ** rest
+        return _rsi_from_means(decay * avg_gain + gain[:, window:] @ w, decay * avg_loss + loss[:, window:] @ w)
+
+    avg_gains = np.full(close.shape, np.nan)
+    avg_losses = np.full(close.shape, np.nan)
+    avg_gains[:, window], avg_losses[:, window] = avg_gain, avg_loss
+    for t in range(window + 1, close.shape[1]):
+        avg_gains[:, t] = (1 - alpha) * avg_gains[:, t - 1] + alpha * gain[:, t - 1]
+        avg_losses[:, t] = (1 - alpha) * avg_losses[:, t - 1] + alpha * loss[:, t - 1]
+    return _rsi_from_means(avg_gains, avg_losses)
+
+
+@_ragged
+def rsi_sma(close: np.ndarray, window: int = RSI_WINDOW, latest: bool = False) -> np.ndarray:
+    """Rolling-mean RSI, identical to rsi() above"""
+    gain, loss = _gains_losses(close)
+    if latest:
+        if gain.shape[1] < window:
+            return np.full(len(close), np.nan)
+        return _rsi_from_means(gain[:, -window:].mean(axis=1), loss[:, -window:].mean(axis=1))
+    out = np.full(close.shape, np.nan)
+    out[:, 1:] = _rsi_from_means(_rolling_mean(gain, window), _rolling_mean(loss, window))
+    return out
+
+
+@_ragged
+def returns(close: np.ndarray, latest: bool = False) -> np.ndarray:
+    if latest:
+        if close.shape[1] < 2:
+            return np.full(len(close), np.nan)
+        return close[:, -1] / close[:, -2] - 1
+    out = np.full(close.shape, np.nan)
+    out[:, 1:] = close[:, 1:] / close[:, :-1] - 1
+    return out
+
+
+@_ragged
+def volatility(close: np.ndarray, window: int = VOL_WINDOW, latest: bool = False) -> np.ndarray:
+    """Annualized rolling std (ddof=1) of daily returns"""
+    r = close[:, 1:] / close[:, :-1] - 1
+    scale = np.sqrt(TRADING_DAYS)
+    if latest:
+        if r.shape[1] < window:
+            return np.full(len(close), np.nan)
+        return r[:, -window:].std(axis=1, ddof=1) * scale
+    mean = _rolling_mean(r, window)
+    mean_sq = _rolling_mean(r * r, window)
+    var = np.maximum(mean_sq - mean * mean, 0.0) * window / (window - 1)
+    out = np.full(close.shape, np.nan)
+    out[:, 1:] = np.sqrt(var) * scale
+    return out
+
+
+def compute_indicators(close: np.ndarray, latest: bool = False, sma_window: int = SMA_WINDOW,
+                       ema_span: int = EMA_SPAN, rsi_window: int = RSI_WINDOW,
+                       vol_window: int = VOL_WINDOW) -> Dict[str, np.ndarray]:
+    """Every indicator for every ticker of a (tickers × days) close matrix
+
+    latest=False backfills all days (arrays shaped like `close`);
+    latest=True returns one value per ticker for the last day.
+    """
+    close = np.atleast_2d(np.asarray(close, dtype=np.float64))
+    return {
+        f"sma{sma_window}": sma(close, sma_window, latest),
+        f"ema{ema_span}": ema(close, ema_span, latest),
+        f"rsi{rsi_window}": rsi_wilder(close, rsi_window, latest),
+        f"rsi{rsi_window}_sma": rsi_sma(close, rsi_window, latest),
+        "return_1d": returns(close, latest),
+        f"volatility{vol_window}": volatility(close, vol_window, latest),
+    }
@@ -4,15 +4,14 @@
 #     python backend/src/ingestion_prices_only.py
 # ------------------------------------------------------------------
 
-import csv
-import os
-import time
-from datetime import datetime, timezone
 from pathlib import Path
 
-import yfinance as yf
 import pathway as pw
 
+from csv_writer import BufferedCSVWriter
+from price_store import ColumnarWriter
+from price_polling import BatchedPricePoller
+
 # ──────────────────────────────
 # 1) BASIC CONFIG
 # ──────────────────────────────
@@ -33,20 +32,18 @@ class PriceSchema(pw.Schema):
     volume: int
 
 # ──────────────────────────────
-# 3) helper: append a row to <data>/<TICKER>/prices.csv
+# 3) helper: append a row to <data>/<TICKER>/prices_<YYYY-MM-DD>.csv
+#    and to the day-partitioned columns in <data>/<TICKER>/prices/ (price_store.py)
+#    rows are buffered and written by background threads (csv_writer.py)
 # ──────────────────────────────
+PRICE_HEADER = ["timestamp", "price", "volume"]
+csv_sink = BufferedCSVWriter(DATA_DIR)
+column_sink = ColumnarWriter(DATA_DIR)
 
 def persist_row(row: dict) -> None:
-    ticker_dir = DATA_DIR / row["ticker"]
-    ticker_dir.mkdir(exist_ok=True)
-    csv_path = ticker_dir / "prices.csv"
-
-    write_header = not csv_path.exists()
-    with csv_path.open("a", newline="") as fp:
-        writer = csv.writer(fp)
-        if write_header:
-            writer.writerow(["timestamp", "price", "volume"])
-        writer.writerow([row["timestamp"], row["price"], row["volume"]])
+    values = [row["timestamp"], row["price"], row["volume"]]
+    csv_sink.write(row["ticker"], "prices", PRICE_HEADER, values)
+    column_sink.write(row["ticker"], "prices", PRICE_HEADER, values)
 
 # ──────────────────────────────
 # 4) CONNECTOR SUBJECT – pulls data & streams rows (plus persists)
@@ -57,13 +54,10 @@ class PriceSubject(pw.io.python.ConnectorSubject):
     deletions_enabled = False  # we only append new rows
 
     def run(self):
-        while True:
-            utc = datetime.now(timezone.utc).isoformat()
-            for symbol in TICKERS:
-                info = yf.Ticker(symbol).fast_info
-                price = info.get("last_price") or 0.0
-                vol = info.get("last_volume") or 0
-
+        # chunked bulk requests on a fixed cadence (see price_polling.py)
+        poller = BatchedPricePoller(TICKERS, POLL_PRICE_SECS)
+        for utc, quotes in poller.cycles():
+            for symbol, (price, vol) in quotes.items():
                 row = {
                     "ticker": symbol,
                     "timestamp": utc,
@@ -79,7 +73,6 @@ class PriceSubject(pw.io.python.ConnectorSubject):
 
                 # immediate feedback
                 print(f"{utc} | {symbol} | ${price:.2f} | vol {vol:,}")
-            time.sleep(POLL_PRICE_SECS)
 
 # ──────────────────────────────
 # 5) BUILD THE PATHWAY TABLE & RUN
@@ -0,0 +1,136 @@
+# price_polling.py – batched multi-ticker price polling for the PriceSubjects
+# ------------------------------------------------------------------
+# Instead of one yf.Ticker(...).fast_info round trip per symbol, each
+# cycle downloads the day's 1-minute bars for CHUNK_SIZE symbols per
+# request, with the chunks spread over a bounded worker pool. Symbols a
+# bulk request did not return fall back to the old per-symbol path.
+# Cycles run on a fixed cadence: the fetch (and the caller's handling
+# of the rows) is subtracted from the sleep, and ticks that were fully
+# overrun are skipped rather than queued.
+# ------------------------------------------------------------------
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Tuple
+
+import pandas as pd
+import yfinance as yf
+
+POLL_CHUNK_SIZE = 100      # symbols per bulk download
+POLL_WORKERS    = 4        # concurrent bulk downloads
+
+Quote = Tuple[float, int]  # (last price, day volume)
+
+
+def _last_quote(bars: pd.DataFrame) -> Tuple[float, int] | None:
+    closes = bars["Close"].dropna()
+    if closes.empty:
+        return None
+    return float(closes.iloc[-1]), int(bars["Volume"].fillna(0).sum())
+
+
+def fetch_chunk(symbols: List[str]) -> Dict[str, Quote]:
+    """Latest price and day volume for many symbols in one request"""
+    bars = yf.download(
+        tickers=symbols, period="1d", interval="1m", group_by="ticker",
+        progress=False, threads=False, auto_adjust=False,
+    )
+    quotes: Dict[str, Quote] = {}
+    if bars is None or bars.empty:
+        return quotes
+    multi = isinstance(bars.columns, pd.MultiIndex)
+    present = set(bars.columns.get_level_values(0)) if multi else set()
+    for symbol in symbols:
+        if multi and symbol not in present:
+            continue
+        quote = _last_quote(bars[symbol] if multi else bars)
+        if quote is not None:
+            quotes[symbol] = quote
+    return quotes
+
+
+def fetch_single(symbol: str) -> Quote:
+    """Per-symbol fallback: fast_info, then the last 1-minute bar"""
+    tkr = yf.Ticker(symbol)
+    info = tkr.fast_info or {}
+    price = float(info.get("last_price") or 0)
+    vol = int(info.get("last_volume") or 0)
+    if price == 0:
+        try:
+            h = tkr.history(period="1d", interval="1m")
+            if not h.empty:
+                price = float(h["Close"].iloc[-1])
+                vol = int(h["Volume"].iloc[-1])
+        except Exception:
+            pass
+    return price, vol
+
+
+class BatchedPricePoller:
+    """Fixed-cadence, chunked price polling across a bounded worker pool"""
+
+    def __init__(self, symbols: List[str], interval: float,
+                 chunk_size: int = POLL_CHUNK_SIZE, workers: int = POLL_WORKERS):
+        self.symbols = list(symbols)
+        self.interval = interval
+        self.chunk_size = chunk_size
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="price-poll")
+        self.last_cycle: Dict = {}
+
+    def _safe_chunk(self, chunk: List[str]) -> Dict[str, Quote]:
+        try:
+            return fetch_chunk(chunk)
+        except Exception as e:
+            print(f"⚠️ bulk fetch failed for {len(chunk)} symbols: {e}")
+            return {}
+
+    def _safe_single(self, symbol: str) -> Quote:
+        try:
+            return fetch_single(symbol)
+        except Exception as e:
+            print(f"⚠️ fetch failed for {symbol}: {e}")
+            return 0.0, 0
+
+    def poll_once(self) -> Dict[str, Quote]:
+        """One round of bulk requests (plus fallbacks), symbols in watchlist order"""
+        chunks = [self.symbols[i:i + self.chunk_size] for i in range(0, len(self.symbols), self.chunk_size)]
+        quotes: Dict[str, Quote] = {}
+        for result in self.pool.map(self._safe_chunk, chunks):
+            quotes.update(result)
+
+        missing = [s for s in self.symbols if s not in quotes]
+        for symbol, quote in zip(missing, self.pool.map(self._safe_single, missing)):
+            quotes[symbol] = quote
+
+        self.last_cycle.update(chunks=len(chunks), fallbacks=len(missing))
+        return {symbol: quotes[symbol] for symbol in self.symbols}
+
+    def cycles(self) -> Iterator[Tuple[str, Dict[str, Quote]]]:
+        """Yield (utc timestamp, quotes) every `interval` seconds, drift-free"""
+        next_tick = time.monotonic()
+        while True:
+            started = time.monotonic()
+            lag = started - next_tick
+            utc = datetime.now(timezone.utc).isoformat()
+            quotes = self.poll_once()
+            fetch_secs = time.monotonic() - started
+
+            yield utc, quotes
+
+            next_tick += self.interval
+            now = time.monotonic()
+            skipped = 0
+            if now > next_tick:
+                # overran whole periods: realign instead of firing back-to-back
+                skipped = int((now - next_tick) // self.interval) + 1
+                next_tick += skipped * self.interval
+
+            self.last_cycle.update(
+                symbols=len(quotes), fetch_secs=round(fetch_secs, 3),
+                lag_secs=round(lag, 3), skipped_ticks=skipped,
+            )
+            print(f"⏱ polled {len(quotes)} symbols in {fetch_secs:.2f}s "
+                  f"({self.last_cycle['chunks']} bulk req, {self.last_cycle['fallbacks']} fallback) "
+                  f"| lag {lag:.2f}s | skipped {skipped}")
+            time.sleep(max(0.0, next_tick - time.monotonic()))
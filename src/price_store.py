@@ -0,0 +1,214 @@
+# price_store.py – day-partitioned columnar price/indicator store with a time index
+# ------------------------------------------------------------------
+# Layout (one directory per ticker, stream and UTC day):
+#     data/<TICKER>/<stream>/<YYYY-MM-DD>/ts.i8       int64 epoch nanoseconds
+#                                        /price.f8    float64
+#                                        /volume.i8   int64  ...
+#     data/<TICKER>/<stream>/index.json  {day: {"rows", "first", "last", "sorted"}}
+# Appends add raw little-endian values to the day's column files; the
+# index lets a range read skip straight to the partitions it needs and
+# only binary-search the two boundary days. Reads memory-map columns.
+# ------------------------------------------------------------------
+
+import json
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+try:
+    from csv_writer import BufferedCSVWriter        # run as a script from src/
+except ImportError:
+    from .csv_writer import BufferedCSVWriter       # imported as src.price_store
+
+PRICE_COLUMNS = {"ts": np.dtype("<i8"), "price": np.dtype("<f8"), "volume": np.dtype("<i8")}
+INDICATOR_COLUMNS = {
+    "ts": np.dtype("<i8"), "pe": np.dtype("<f8"), "eps": np.dtype("<f8"),
+    "sma50": np.dtype("<f8"), "ema20": np.dtype("<f8"), "rsi14": np.dtype("<f8"),   # NaN = n/a
+}
+
+
+def to_ns(stamp) -> int:
+    """ISO-8601 string or datetime (naive = UTC) → epoch nanoseconds"""
+    if isinstance(stamp, str):
+        stamp = datetime.fromisoformat(stamp.replace("Z", "+00:00"))
+    if stamp.tzinfo is None:
+        stamp = stamp.replace(tzinfo=timezone.utc)
+    return int(stamp.timestamp() * 1_000_000) * 1000
+
+
+def day_of(ns: int) -> str:
+    return datetime.fromtimestamp(ns / 1e9, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+class PriceStore:
+    """Append and range-read typed columns of one stream, partitioned by UTC day"""
+
+    def __init__(self, data_dir: Path, stream: str = "prices", columns: Dict[str, np.dtype] = PRICE_COLUMNS):
+        self.data_dir = Path(data_dir)
+        self.stream = stream
+        self.columns = columns
+        self._indexes: Dict[str, Tuple[int, dict]] = {}
+        self._lock = threading.Lock()
+
+    def _root(self, ticker: str) -> Path:
+        return self.data_dir / ticker.upper() / self.stream
+
+    def _file(self, part: Path, name: str) -> Path:
+        dtype = self.columns[name]
+        return part / f"{name}.{dtype.kind}{dtype.itemsize}"
+
+    def _empty(self) -> Dict[str, np.ndarray]:
+        return {name: np.empty(0, dtype=dtype) for name, dtype in self.columns.items()}
+
+    # ── index ───────────────────────────────────────────────
+    def index(self, ticker: str) -> dict:
+        """Partition index for ticker (cached until index.json changes)"""
+        path = self._root(ticker) / "index.json"
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return {}
+        with self._lock:
+            cached = self._indexes.get(ticker.upper())
+            if cached and cached[0] == mtime:
+                return cached[1]
+        index = json.loads(path.read_text())
+        with self._lock:
+            self._indexes[ticker.upper()] = (mtime, index)
+        return index
+
+    def _save_index(self, ticker: str, index: dict) -> None:
+        path = self._root(ticker) / "index.json"
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(index, sort_keys=True))
+        os.replace(tmp, path)
+
+    # ── writes ──────────────────────────────────────────────
+    def append(self, ticker: str, values: Dict[str, np.ndarray]) -> None:
+        """Append rows (any order, any days) for one ticker; `values` maps column → array"""
+        columns = {name: np.asarray(values[name], dtype=dtype) for name, dtype in self.columns.items()}
+        ts_ns = columns["ts"]
+        if ts_ns.size == 0:
+            return
+        days = np.array([day_of(int(ns)) for ns in ts_ns])
+        index = dict(self.index(ticker))
+
+        for day in np.unique(days):
+            mask = days == day
+            part = self._root(ticker) / str(day)
+            part.mkdir(parents=True, exist_ok=True)
+            self._pad_new_columns(part)
+            for name, column in columns.items():
+                with self._file(part, name).open("ab") as fp:
+                    fp.write(column[mask].tobytes())
+
+            day_ts = ts_ns[mask]
+            entry = index.get(str(day), {"rows": 0, "first": int(day_ts[0]), "last": int(day_ts[0]), "sorted": True})
+            in_order = bool(entry["sorted"] and day_ts[0] >= entry["last"] and np.all(np.diff(day_ts) >= 0))
+            index[str(day)] = {
+                "rows": entry["rows"] + int(mask.sum()),
+                "first": min(entry["first"], int(day_ts.min())),
+                "last": max(entry["last"], int(day_ts.max())),
+                "sorted": in_order,
+            }
+        self._save_index(ticker, index)
+
+    def _pad_new_columns(self, part: Path) -> None:
+        """Back-fill a column added mid-day so it stays row-aligned with ts"""
+        ts_file = self._file(part, "ts")
+        if not ts_file.exists():
+            return
+        rows = ts_file.stat().st_size // self.columns["ts"].itemsize
+        for name, dtype in self.columns.items():
+            path = self._file(part, name)
+            if not path.exists():
+                path.write_bytes(np.full(rows, np.nan if dtype.kind == "f" else 0, dtype=dtype).tobytes())
+
+    # ── reads ───────────────────────────────────────────────
+    def partitions(self, ticker: str, start_ns: int, end_ns: int) -> List[str]:
+        """Days whose [first, last] overlaps [start, end]"""
+        return sorted(
+            day for day, entry in self.index(ticker).items()
+            if entry["last"] >= start_ns and entry["first"] <= end_ns
+        )
+
+    def _load_partition(self, ticker: str, day: str, mmap: bool) -> Dict[str, np.ndarray]:
+        part = self._root(ticker) / day
+        paths = {name: self._file(part, name) for name in self.columns}
+        # a column added after the day was started has no file yet: NaN-filled
+        missing = [name for name, p in paths.items() if name != "ts" and not p.exists()]
+        for name in missing:
+            paths.pop(name)
+        # rows fully on disk in every column (a crash can leave a short tail)
+        rows = min(p.stat().st_size // self.columns[name].itemsize for name, p in paths.items())
+        if rows == 0:
+            return self._empty()
+        if mmap:
+            cols = {name: np.memmap(p, dtype=self.columns[name], mode="r", shape=(rows,)) for name, p in paths.items()}
+        else:
+            cols = {name: np.fromfile(p, dtype=self.columns[name], count=rows) for name, p in paths.items()}
+        for name in missing:
+            cols[name] = np.full(rows, np.nan, dtype=self.columns[name])
+        return {name: cols[name] for name in self.columns}
+
+    def read_range(self, ticker: str, start, end, mmap: bool = True) -> Dict[str, np.ndarray]:
+        """Columns for start <= ts <= end, touching only the partitions in range"""
+        start_ns, end_ns = to_ns(start), to_ns(end)
+        index = self.index(ticker)
+        pieces = []
+        for day in self.partitions(ticker, start_ns, end_ns):
+            cols = self._load_partition(ticker, day, mmap)
+            entry = index[day]
+            if entry["first"] >= start_ns and entry["last"] <= end_ns:
+                pieces.append(cols)                     # whole day in range
+            elif entry["sorted"]:
+                lo = np.searchsorted(cols["ts"], start_ns, side="left")
+                hi = np.searchsorted(cols["ts"], end_ns, side="right")
+                pieces.append({name: values[lo:hi] for name, values in cols.items()})
+            else:
+                keep = (cols["ts"] >= start_ns) & (cols["ts"] <= end_ns)
+                pieces.append({name: values[keep] for name, values in cols.items()})
+
+        if not pieces:
+            return self._empty()
+        if len(pieces) == 1:
+            return pieces[0]
+        return {name: np.concatenate([p[name] for p in pieces]) for name in self.columns}
+
+    def read_last(self, ticker: str, days: float, mmap: bool = True) -> Dict[str, np.ndarray]:
+        end = datetime.now(timezone.utc)
+        return self.read_range(ticker, end - timedelta(days=days), end, mmap)
+
+
+class ColumnarWriter(BufferedCSVWriter):
+    """BufferedCSVWriter whose batches land in PriceStores instead of CSV files
+
+    Rows are written with the same write(ticker, stream, header, row)
+    call; the header names the store's columns, with "timestamp" as an
+    ISO-8601 string that becomes the "ts" column.
+    """
+
+    def __init__(self, data_dir: Path, **kwargs):
+        self.stores = {
+            "prices": PriceStore(data_dir, "prices", PRICE_COLUMNS),
+            "indicators": PriceStore(data_dir, "indicators", INDICATOR_COLUMNS),
+        }
+        super().__init__(data_dir, **kwargs)
+
+    def _write_batch(self, key: Tuple[str, str, str], header: List[str], rows: List[list]) -> None:
+        ticker, stream, _ = key
+        store = self.stores.get(stream)
+        if store is None:
+            raise ValueError(f"no columnar store for stream {stream!r}")
+        values = {}
+        for i, name in enumerate(header):
+            column = [r[i] for r in rows]
+            if name == "timestamp":
+                values["ts"] = [to_ns(stamp) for stamp in column]
+            elif name in store.columns:
+                values[name] = [np.nan if v is None else v for v in column]
+        store.append(ticker, values)
@@ -1,20 +1,23 @@
 
-import csv
+import queue
 import time
 from datetime import datetime, timezone
 from pathlib import Path
 
-import numpy as np
-import pandas as pd
 import yfinance as yf
 import pathway as pw
 
+from csv_writer import BufferedCSVWriter
+from price_store import ColumnarWriter
+from indicators import IndicatorState
+from price_polling import BatchedPricePoller
+
 # ──────────────────────────────
 # 1) BASIC CONFIG
 # ──────────────────────────────
 TICKERS = ["AAPL", "TSLA", "NVDA"]
 POLL_PRICE_SECS = 60          # price cadence (seconds)
-POLL_TECH_SECS  = 300          # indicators cadence (5 min for dev); set back to 43200 for prod  # indicators cadence (~12 h)
+POLL_TECH_SECS  = 300          # pe/eps refresh cadence (5 min for dev); set back to 43200 for prod (~12 h)
 DATA_DIR = Path("data")
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -33,40 +36,27 @@ class IndicatorSchema(pw.Schema):
     pe: float | None
     eps: float | None
     sma50: float | None
+    ema20: float | None
     rsi14: float | None
 
 # ──────────────────────────────
 # 3) CSV HELPERS
+#    buffered + rotated daily by a background thread (csv_writer.py):
+#    data/<TICKER>/indicators_<YYYY-MM-DD>.csv
+#    plus day-partitioned columns in data/<TICKER>/indicators/ (price_store.py)
 # ──────────────────────────────
+csv_sink = BufferedCSVWriter(DATA_DIR)
+column_sink = ColumnarWriter(DATA_DIR)
 
 def append_csv(ticker: str, filename: str, header: list[str], row: list):
-    tdir = DATA_DIR / ticker
-    tdir.mkdir(exist_ok=True)
-    path = tdir / filename
-    write_header = not path.exists()
-    with path.open("a", newline="") as fp:
-        w = csv.writer(fp)
-        if write_header:
-            w.writerow(header)
-        w.writerow(row)
+    csv_sink.write(ticker, Path(filename).stem, header, row)
+    column_sink.write(ticker, Path(filename).stem, header, row)
 
 # ──────────────────────────────
-# 4) SIMPLE RSI IMPLEMENTATION (14‑period)
+# 4) INDICATORS
+#    incremental per-tick state and the batch engine live in indicators.py
 # ──────────────────────────────
 
-def rsi(series: pd.Series, length: int = 14) -> float | None:
-    if len(series) < length + 1:
-        return None
-    delta = series.diff().dropna()
-    gain = delta.where(delta > 0, 0.0)
-    loss = -delta.where(delta < 0, 0.0)
-    avg_gain = gain.rolling(window=length).mean().iloc[-1]
-    avg_loss = loss.rolling(window=length).mean().iloc[-1]
-    if avg_loss == 0:
-        return 100.0
-    rs = avg_gain / avg_loss
-    return 100 - (100 / (1 + rs))
-
 # ──────────────────────────────
 # 5) PRICE SUBJECT (minute‑level)
 # ──────────────────────────────
@@ -74,72 +64,77 @@ class PriceSubject(pw.io.python.ConnectorSubject):
     deletions_enabled = False
 
     def run(self):
-        while True:
-            utc = datetime.now(timezone.utc).isoformat()
-            for symbol in TICKERS:
-                info = yf.Ticker(symbol).fast_info or {}
-                price = float(info.get("last_price") or 0)
-                vol   = int(info.get("last_volume") or 0)
-
-                # fallback if zero
-                if price == 0:
-                    try:
-                        h = yf.Ticker(symbol).history(period="1d", interval="1m")
-                        if not h.empty:
-                            price = float(h["Close"].iloc[-1])
-                            vol   = int(h["Volume"].iloc[-1])
-                    except Exception:
-                        pass
-
+        # chunked bulk requests on a fixed cadence; symbols missing from a
+        # bulk response fall back to fast_info / 1‑minute history
+        poller = BatchedPricePoller(TICKERS, POLL_PRICE_SECS)
+        for utc, quotes in poller.cycles():
+            for symbol, (price, vol) in quotes.items():
                 row = {"ticker": symbol, "timestamp": utc, "price": price, "volume": vol}
                 self.next_json(row)
                 # price persistence disabled per user request
                 print(f"{utc} | {symbol:<5} | $ {price:,.2f} | vol {vol:,}")
-            time.sleep(POLL_PRICE_SECS)
 
 # ──────────────────────────────
-# 6) INDICATOR SUBJECT (~12‑hour cadence)
+# 6) INDICATOR SUBJECT (incremental, fed by prices_tbl)
+#    daily history is pulled once per ticker at bootstrap; afterwards every
+#    price tick updates O(1) running state (indicators.py). pe/eps still
+#    come from `info`, refreshed every POLL_TECH_SECS.
 # ──────────────────────────────
+INDICATOR_HEADER = ["timestamp", "pe", "eps", "sma50", "ema20", "rsi14"]
+price_ticks: "queue.Queue[tuple]" = queue.Queue()
+
+def bootstrap_closes(symbol: str) -> list[tuple[str, float]]:
+    """(day, close) for completed daily bars, oldest first"""
+    try:
+        hist = yf.Ticker(symbol).history(period="6mo", interval="1d")
+    except Exception as e:
+        print(f"⚠️ history bootstrap failed for {symbol}: {e}")
+        return []
+    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    closes = [(ts.strftime("%Y-%m-%d"), float(c)) for ts, c in hist["Close"].dropna().items()]
+    # today's partial bar is replaced by live ticks
+    return [(day, c) for day, c in closes if day < today]
+
+def fetch_fundamentals(symbol: str) -> tuple[float | None, float | None]:
+    try:
+        info = yf.Ticker(symbol).info or {}
+    except Exception:
+        return None, None
+    return info.get("trailingPE"), info.get("trailingEps")
+
 class IndicatorSubject(pw.io.python.ConnectorSubject):
     deletions_enabled = False
 
     def run(self):
+        state = IndicatorState()
+        for symbol in TICKERS:
+            state.seed(symbol, bootstrap_closes(symbol))
+
+        fundamentals: dict[str, tuple] = {}
+        next_fundamentals = 0.0
         while True:
-            utc = datetime.now(timezone.utc).isoformat()
-            for symbol in TICKERS:
-                tkr = yf.Ticker(symbol)
-                info = tkr.info or {}
-                pe   = info.get("trailingPE")
-                eps  = info.get("trailingEps")
-
-                sma50 = rsi14 = None
-                try:
-                    hist = tkr.history(period="6mo", interval="1d")
-                    if not hist.empty:
-                        closes = hist["Close"]
-                        sma50 = float(closes.tail(50).mean()) if len(closes) >= 50 else None
-                        rsi14 = rsi(closes, length=14)
-                except Exception:
-                    pass
-
-                row = {
-                    "ticker": symbol,
-                    "timestamp": utc,
-                    "pe": pe,
-                    "eps": eps,
-                    "sma50": sma50,
-                    "rsi14": rsi14,
-                }
-                self.next_json(row)
-                append_csv(
-                    symbol,
-                    "indicators.csv",
-                    ["timestamp", "pe", "eps", "sma50", "rsi14"],
-                    [utc, pe, eps, sma50, rsi14],
-                )
-                print(f"✔ indicators.csv updated for {symbol}")
-                print(f"{utc} | {symbol:<5} | PE {pe} | SMA50 {sma50} | RSI14 {rsi14}")
-            time.sleep(POLL_TECH_SECS)
+            if time.monotonic() >= next_fundamentals:
+                fundamentals = {symbol: fetch_fundamentals(symbol) for symbol in TICKERS}
+                next_fundamentals = time.monotonic() + POLL_TECH_SECS
+
+            try:
+                symbol, utc, price = price_ticks.get(timeout=POLL_PRICE_SECS)
+            except queue.Empty:
+                continue
+            if not price:
+                continue
+            ind = state.update(symbol, utc, price)
+            pe, eps = fundamentals.get(symbol, (None, None))
+
+            row = {"ticker": symbol, "timestamp": utc, "pe": pe, "eps": eps, **ind}
+            self.next_json(row)
+            append_csv(
+                symbol,
+                "indicators.csv",
+                INDICATOR_HEADER,
+                [utc, pe, eps, ind["sma50"], ind["ema20"], ind["rsi14"]],
+            )
+            print(f"{utc} | {symbol:<5} | PE {pe} | SMA50 {ind['sma50']} | EMA20 {ind['ema20']} | RSI14 {ind['rsi14']}")
 
 # ──────────────────────────────
 # 7) PATHWAY READERS & RUN GRAPH
@@ -147,6 +142,13 @@ class IndicatorSubject(pw.io.python.ConnectorSubject):
 prices_tbl = pw.io.python.read(PriceSubject(), schema=PriceSchema)
 ind_tbl    = pw.io.python.read(IndicatorSubject(), schema=IndicatorSchema)
 
+# every price row reaching the graph drives the indicator state
+def on_price(key, row, time, is_addition):
+    if is_addition:
+        price_ticks.put((row["ticker"], row["timestamp"], row["price"]))
+
+pw.io.subscribe(prices_tbl, on_change=on_price)
+
 # attach sinks so the graph stays alive
 _ = pw.debug.compute_and_print(prices_tbl, include_id=False)
 _ = pw.debug.compute_and_print(ind_tbl, include_id=False)
@@ -0,0 +1,276 @@
+# replay.py – replay recorded ticks through the Pathway graph for load tests
+# ------------------------------------------------------------------
+# HOW TO RUN (from the backend root):
+#     python src/replay.py --source data --speed 60          # persisted CSVs, 60× real time
+#     python src/replay.py --source bundled --synthetic 500  # AAPL.csv/RTX.csv × 500 clones, max speed
+# Sources:
+#     data     data/<TICKER>/prices_*.csv and indicators_*.csv (csv_writer.py)
+#     bundled  the Yahoo OHLCV exports in the backend root (daily closes)
+# --synthetic N clones every source ticker N times (<TICKER>_<n>, prices
+# scaled by a fixed random factor) to multiply the row rate. --speed 0
+# (default) emits as fast as possible; otherwise recorded time gaps are
+# replayed divided by the factor. Rows sharing a recorded timestamp are
+# one batch, committed as soon as it is emitted, so measured latency
+# does not include Pathway's autocommit interval. The subject stamps
+# each row's emit time, a pw.io.subscribe sink on the output table measures end-to-end
+# latency, and rows/sec plus latency percentiles are printed every
+# REPORT_SECS and at the end.
+# ------------------------------------------------------------------
+
+import argparse
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import pathway as pw
+
+DATA_DIR = Path("data")
+BUNDLED_DIR = Path(".")
+REPORT_SECS = 5.0
+LATENCY_SAMPLES = 100_000      # most recent latencies kept for percentiles
+
+PRICE_COLUMNS = ["timestamp", "price", "volume"]
+INDICATOR_COLUMNS = ["timestamp", "pe", "eps", "sma50", "ema20", "rsi14"]
+
+
+# ──────────────────────────────
+# SCHEMAS (same as the live ingestion scripts)
+# ──────────────────────────────
+class PriceSchema(pw.Schema):
+    ticker: str
+    timestamp: str
+    price: float
+    volume: int
+
+class IndicatorSchema(pw.Schema):
+    ticker: str
+    timestamp: str
+    pe: float | None
+    eps: float | None
+    sma50: float | None
+    ema20: float | None
+    rsi14: float | None
+
+
+# ──────────────────────────────
+# LOADING RECORDED ROWS
+# ──────────────────────────────
+def _read_stream(ticker_dir: Path, stream: str, columns: List[str]) -> pd.DataFrame:
+    # daily files written by csv_writer.py, plus the older single <stream>.csv
+    files = sorted(ticker_dir.glob(f"{stream}_*.csv")) + sorted(ticker_dir.glob(f"{stream}.csv"))
+    frames = []
+    for path in files:
+        frame = pd.read_csv(path)
+        frames.append(frame.reindex(columns=columns))   # older files lack newer columns
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(frames, ignore_index=True)
+
+
+def load_persisted(data_dir: Path, tickers: Optional[List[str]], stream: str) -> pd.DataFrame:
+    columns = PRICE_COLUMNS if stream == "prices" else INDICATOR_COLUMNS
+    dirs = [data_dir / t for t in tickers] if tickers else sorted(p for p in data_dir.iterdir() if p.is_dir())
+    frames = []
+    for ticker_dir in dirs:
+        frame = _read_stream(ticker_dir, stream, columns)
+        if not frame.empty:
+            frame.insert(0, "ticker", ticker_dir.name)
+            frames.append(frame)
+    if not frames:
+        return pd.DataFrame(columns=["ticker"] + columns)
+    return pd.concat(frames, ignore_index=True)
+
+
+def load_bundled(root: Path, tickers: Optional[List[str]]) -> pd.DataFrame:
+    """Daily closes from the Yahoo exports, stamped at the 20:00 UTC close"""
+    paths = [root / f"{t}.csv" for t in tickers] if tickers else sorted(root.glob("*.csv"))
+    frames = []
+    for path in paths:
+        df = pd.read_csv(path, thousands=",")
+        df.columns = df.columns.str.strip().str.lower()
+        if "close" not in df.columns:
+            continue
+        df = df.dropna(subset=["close"])                # dividend/split event rows
+        stamp = pd.to_datetime(df["date"], format="%b %d, %Y") + pd.Timedelta(hours=20)
+        frames.append(pd.DataFrame({
+            "ticker": path.stem.upper(),
+            "timestamp": stamp.dt.tz_localize("UTC").map(lambda t: t.isoformat()),
+            "price": df["close"].astype(float),
+            "volume": df["volume"].fillna(0).astype(np.int64),
+        }))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["ticker"] + PRICE_COLUMNS)
+
+
+def add_synthetic(frame: pd.DataFrame, copies: int, seed: int = 19) -> pd.DataFrame:
+    """`copies` clones of every ticker, each scaled by a fixed factor in [0.5, 2)"""
+    if copies <= 0 or frame.empty:
+        return frame
+    rng = np.random.default_rng(seed)
+    clones = [frame]
+    for n in range(copies):
+        clone = frame.copy()
+        clone["ticker"] = clone["ticker"] + f"_{n:04d}"
+        if "price" in clone:
+            clone["price"] = clone["price"] * rng.uniform(0.5, 2.0)
+        clones.append(clone)
+    return pd.concat(clones, ignore_index=True)
+
+
+def to_replay_order(frame: pd.DataFrame) -> pd.DataFrame:
+    """Sort by recorded time and add `t` (seconds since the first row)"""
+    stamps = pd.to_datetime(frame["timestamp"], utc=True, format="ISO8601")
+    frame = frame.assign(_ts=stamps).sort_values("_ts", kind="stable")
+    frame["t"] = (frame["_ts"] - frame["_ts"].iloc[0]).dt.total_seconds() if len(frame) else []
+    return frame.drop(columns="_ts").reset_index(drop=True)
+
+
+# ──────────────────────────────
+# MEASUREMENT
+# ──────────────────────────────
+class ReplayStats:
+    """Emit/receive counters and end-to-end latency of replayed rows"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.emitted = 0
+        self.received = 0
+        self.started: Optional[float] = None
+        self.finished_emitting: Optional[float] = None
+        self._emit_times: Dict[tuple, float] = {}
+        self._latencies = np.zeros(LATENCY_SAMPLES)
+        self._lock = threading.Lock()
+        self._last_report = time.monotonic()
+
+    def on_emit(self, key: tuple) -> None:
+        now = time.perf_counter()
+        with self._lock:
+            if self.started is None:
+                self.started = now
+            self._emit_times[key] = now
+            self.emitted += 1
+
+    def on_receive(self, key: tuple) -> None:
+        now = time.perf_counter()
+        with self._lock:
+            sent = self._emit_times.pop(key, None)
+            if sent is not None:
+                self._latencies[self.received % LATENCY_SAMPLES] = now - sent
+            self.received += 1
+        if time.monotonic() - self._last_report >= REPORT_SECS:
+            self._last_report = time.monotonic()
+            self.report()
+
+    def report(self) -> None:
+        with self._lock:
+            if self.started is None:
+                return
+            elapsed = time.perf_counter() - self.started
+            emit_secs = (self.finished_emitting or time.perf_counter()) - self.started
+            lat = self._latencies[:min(self.received, LATENCY_SAMPLES)] * 1000
+            emitted, received = self.emitted, self.received
+        pct = np.percentile(lat, [50, 95, 99]) if lat.size else [float("nan")] * 3
+        print(f"▶ {self.name}: emitted {emitted:,} ({emitted / max(emit_secs, 1e-9):,.0f} rows/s) | "
+              f"received {received:,} ({received / max(elapsed, 1e-9):,.0f} rows/s) | "
+              f"latency p50 {pct[0]:.1f}ms p95 {pct[1]:.1f}ms p99 {pct[2]:.1f}ms")
+
+
+# ──────────────────────────────
+# CONNECTOR SUBJECT
+# ──────────────────────────────
+class ReplaySubject(pw.io.python.ConnectorSubject):
+    """Streams recorded rows into a Pathway table, paced by their recorded timestamps"""
+
+    deletions_enabled = False
+
+    def __init__(self, rows: pd.DataFrame, speed: float = 0.0, stats: Optional[ReplayStats] = None,
+                 rebase: bool = False):
+        super().__init__()
+        self.rows = rows
+        self.speed = speed
+        self.stats = stats
+        self.rebase = rebase
+
+    def run(self):
+        columns = [c for c in self.rows.columns if c != "t"]
+        offsets = self.rows["t"].to_numpy()
+        start = time.monotonic()
+        base = datetime.now(timezone.utc)
+
+        # tolist() yields plain Python scalars, which next_json can serialize
+        records = zip(*(self.rows[c].tolist() for c in columns))
+
+        batch_offset = None
+        for offset, values in zip(offsets, records):
+            if offset != batch_offset:
+                if batch_offset is not None:
+                    self.commit()           # the previous recorded batch is complete
+                batch_offset = offset
+                if self.speed > 0:
+                    delay = start + offset / self.speed - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+            row = {k: (None if isinstance(v, float) and v != v else v) for k, v in zip(columns, values)}
+            if self.rebase:
+                # recorded spacing, but anchored at replay start
+                row["timestamp"] = (base + pd.Timedelta(seconds=float(offset))).isoformat()
+            if "volume" in row:
+                row["volume"] = int(row["volume"] or 0)
+            if self.stats:
+                self.stats.on_emit((row["ticker"], row["timestamp"]))
+            self.next_json(row)
+        self.commit()
+
+        if self.stats:
+            self.stats.finished_emitting = time.perf_counter()
+            print(f"⏹ {self.stats.name}: replay source exhausted after {len(offsets):,} rows")
+
+
+def measure(table: pw.Table, stats: ReplayStats) -> None:
+    """Attach the latency sink to a replayed table"""
+    def on_change(key, row, time, is_addition):
+        if is_addition:
+            stats.on_receive((row["ticker"], row["timestamp"]))
+
+    pw.io.subscribe(table, on_change=on_change, on_end=stats.report)
+
+
+# ──────────────────────────────
+# SCRIPT
+# ──────────────────────────────
+def main():
+    parser = argparse.ArgumentParser(description="replay recorded ticks through a Pathway graph")
+    parser.add_argument("--source", choices=["data", "bundled"], default="data")
+    parser.add_argument("--tickers", nargs="+", default=None, help="default: every ticker found")
+    parser.add_argument("--speed", type=float, default=0.0, help="speed-up factor; 0 = as fast as possible")
+    parser.add_argument("--synthetic", type=int, default=0, help="synthetic clones per ticker")
+    parser.add_argument("--rebase", action="store_true", help="re-stamp rows relative to now")
+    parser.add_argument("--indicators", action="store_true", help="also replay indicators_*.csv (data source)")
+    args = parser.parse_args()
+
+    if args.source == "data":
+        prices = load_persisted(DATA_DIR, args.tickers, "prices")
+    else:
+        prices = load_bundled(BUNDLED_DIR, args.tickers)
+    prices = to_replay_order(add_synthetic(prices, args.synthetic))
+    print(f"Replaying {len(prices):,} price rows for {prices['ticker'].nunique():,} tickers "
+          f"at {'max speed' if args.speed <= 0 else f'{args.speed:g}× real time'}")
+
+    price_stats = ReplayStats("prices")
+    prices_tbl = pw.io.python.read(ReplaySubject(prices, args.speed, price_stats, args.rebase), schema=PriceSchema)
+    measure(prices_tbl, price_stats)
+
+    if args.indicators and args.source == "data":
+        indicators = to_replay_order(add_synthetic(load_persisted(DATA_DIR, args.tickers, "indicators"), args.synthetic))
+        ind_stats = ReplayStats("indicators")
+        ind_tbl = pw.io.python.read(ReplaySubject(indicators, args.speed, ind_stats, args.rebase), schema=IndicatorSchema)
+        measure(ind_tbl, ind_stats)
+
+    pw.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+# conftest.py – shared fixtures for the test suite
+# ------------------------------------------------------------------
+# Run from the repo root:  python -m pytest -q
+# Tests that import andy need its full dependency set (pathway,
+# yfinance, sentence-transformers, ...) and are skipped without it;
+# they use the offline stand-ins from benchmarks/offline.py, so no
+# network access or model download is needed.
+# ------------------------------------------------------------------
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+for path in (ROOT, ROOT / "src", ROOT / "benchmarks"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(0)
+
+
+@pytest.fixture
+def andy(monkeypatch):
+    """andy with the hashing embedder, fixture-backed yfinance, private in-memory stores and no live graph"""
+    andy = pytest.importorskip("andy")
+    offline = pytest.importorskip("offline")
+    andy.embedding_registry.register(offline.HashingEmbedder())
+    monkeypatch.setattr(andy, "yf", andy.yf)      # offline.install() swaps it; restored afterwards
+    offline.install()
+    monkeypatch.setattr(andy, "VECTOR_STORE_DIR", "")
+    monkeypatch.setattr(andy, "LIVE_INDEX", False)
+    return andy
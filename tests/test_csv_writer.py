@@ -0,0 +1,24 @@
+from csv_writer import BufferedCSVWriter
+
+
+class FlakyWriter(BufferedCSVWriter):
+    """Raises a non-I/O error for one ticker's batches"""
+
+    def _write_batch(self, key, header, rows):
+        if key[0] == "BAD":
+            raise TypeError("unsupported row")
+        super()._write_batch(key, header, rows)
+
+
+def test_failed_batch_is_logged_and_the_writer_keeps_running(tmp_path):
+    writer = FlakyWriter(tmp_path)
+    writer.write("BAD", "prices", ["price"], [1.0])
+    writer.write("AAPL", "prices", ["price"], [2.0])
+    writer.flush()
+    writer.write("AAPL", "prices", ["price"], [3.0])
+    writer.close()
+
+    assert writer.stats["rows"] == 2 and writer.stats["failed_rows"] == 1
+    [path] = (tmp_path / "AAPL").glob("prices_*.csv")
+    assert path.read_text().split() == ["price", "2.0", "3.0"]
+    assert not (tmp_path / "BAD").exists()
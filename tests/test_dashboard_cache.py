@@ -0,0 +1,165 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+
+class FakePipeline:
+    shares_store = False
+
+    def __init__(self, size):
+        self.size = size
+
+    def memory_bytes(self, ticker=None):
+        return self.size
+
+
+class FakeDashboard:
+    """Counts loads; a ticker starting with "BAD" fails to load like a broken ETL run"""
+
+    loads = []
+
+    def __init__(self, ticker, size=100, shared=False, delay=0.05):
+        self.loaded_tickers = set()
+        self.etl = FakePipeline(size)
+        self.etl.shares_store = shared
+        self.delay = delay
+
+    def load_ticker(self, ticker):
+        self.loads.append(ticker)
+        time.sleep(self.delay)
+        if not ticker.startswith("BAD"):
+            self.loaded_tickers.add(ticker)
+
+    async def load_ticker_async(self, ticker):
+        self.loads.append(ticker)
+        await asyncio.sleep(self.delay)
+        if not ticker.startswith("BAD"):
+            self.loaded_tickers.add(ticker)
+
+
+@pytest.fixture(autouse=True)
+def reset_loads():
+    FakeDashboard.loads = []
+
+
+def test_concurrent_misses_share_one_load(andy):
+    cache = andy.DashboardCache(factory=FakeDashboard)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("aapl"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert FakeDashboard.loads == ["AAPL"]
+    assert len({id(dashboard) for dashboard in results}) == 1
+    assert cache.info()["coalesced"] == 7
+    assert cache.get("AAPL") is results[0]
+    assert cache.info()["hits"] == 1
+
+
+def test_async_misses_share_one_load(andy):
+    cache = andy.DashboardCache(factory=FakeDashboard)
+
+    async def many():
+        return await asyncio.gather(*[cache.get_async("msft") for _ in range(5)])
+
+    dashboards = asyncio.run(many())
+
+    assert FakeDashboard.loads == ["MSFT"]
+    assert len({id(dashboard) for dashboard in dashboards}) == 1
+
+
+def test_failed_load_is_not_cached(andy):
+    cache = andy.DashboardCache(factory=FakeDashboard)
+    cache.get("BADCO")
+    cache.get("BADCO")
+
+    assert FakeDashboard.loads == ["BADCO", "BADCO"]
+    assert cache.info()["tickers"] == {}
+
+
+def test_private_stores_are_evicted_by_size(andy):
+    cache = andy.DashboardCache(factory=lambda t: FakeDashboard(t, size=100, delay=0), max_bytes=250)
+    for ticker in ("A", "B", "C"):
+        cache.get(ticker)
+
+    assert list(cache.info()["tickers"]) == ["B", "C"]
+    assert cache.info()["evictions"] == 1
+
+
+def test_shared_store_dashboards_are_bounded_by_count_not_store_size(andy):
+    cache = andy.DashboardCache(factory=lambda t: FakeDashboard(t, size=10**9, shared=True, delay=0),
+                                max_bytes=250, max_entries=2)
+    for ticker in ("A", "B", "C"):
+        cache.get(ticker)
+
+    info = cache.info()
+    assert list(info["tickers"]) == ["B", "C"]
+    assert info["size_bytes"] == 0
+
+
+def test_stale_entry_is_served_and_refreshed_in_background(andy):
+    cache = andy.DashboardCache(factory=lambda t: FakeDashboard(t, delay=0), ttl=0.05, max_stale=10)
+    first = cache.get("AAPL")
+    time.sleep(0.1)
+
+    assert cache.get("AAPL") is first
+    deadline = time.monotonic() + 2
+    while cache.get("AAPL") is first and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert FakeDashboard.loads == ["AAPL", "AAPL"]
+    assert cache.info()["stale_hits"] >= 1
+
+
+def test_limiter_caps_concurrency_and_admits_in_fifo_order(andy):
+    limiter = andy.IngestionLimiter(2)
+    limiter.acquire()
+    limiter.acquire()
+    admitted = []
+
+    def waiter(name):
+        limiter.acquire()
+        admitted.append(name)
+
+    threads = []
+    for name in ("first", "second"):
+        thread = threading.Thread(target=waiter, args=(name,))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.05)
+    assert limiter.info() == {"limit": 2, "running": 2, "queued": 2}
+
+    limiter.release()
+    threads[0].join(1)
+    assert admitted == ["first"]
+    limiter.release()
+    threads[1].join(1)
+    assert admitted == ["first", "second"]
+    limiter.release()
+    limiter.release()
+    assert limiter.info()["running"] == 0
+
+
+def test_cancelled_waiter_does_not_cancel_the_shared_load(andy):
+    cache = andy.DashboardCache(factory=lambda t: FakeDashboard(t, delay=0.1))
+
+    async def scenario():
+        leader = asyncio.ensure_future(cache.get_async("aapl"))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.ensure_future(cache.get_async("aapl"))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return await leader
+
+    dashboard = asyncio.run(scenario())
+
+    assert "AAPL" in dashboard.loaded_tickers
+    assert cache.info()["loading"] == []
+    assert cache.get("AAPL") is dashboard
+    assert FakeDashboard.loads == ["AAPL"]
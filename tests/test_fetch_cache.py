@@ -0,0 +1,62 @@
+import threading
+import time
+
+
+def test_fresh_stale_and_shared_lookups(andy):
+    cache = andy.FetchCache(ttls={"fundamentals": 0.05}, stale_factor=4)
+    calls = []
+    release = threading.Event()
+
+    def fetch(value):
+        calls.append(value)
+        release.wait(1)
+        return value
+
+    first = cache.submit("fundamentals", "AAPL", fetch, 1)
+    shared = cache.submit("fundamentals", "AAPL", fetch, 1)
+    assert shared is first
+    release.set()
+    assert first.result(1) == 1
+    assert cache.submit("fundamentals", "AAPL", fetch, 2).result(1) == 1      # fresh hit
+
+    time.sleep(0.1)                                                          # past TTL, inside stale window
+    assert cache.submit("fundamentals", "AAPL", fetch, 3).result(1) == 1      # stale value, refresh started
+    deadline = time.monotonic() + 1
+    while cache.submit("fundamentals", "AAPL", fetch, 4).result(1) != 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    stats = cache.info()["stats"]["fundamentals"]
+    assert calls == [1, 3]
+    assert stats["shared"] == 1 and stats["stale_hits"] >= 1 and stats["refreshes"] == 1
+
+
+def test_hung_fetch_expires_instead_of_being_joined_forever(andy):
+    cache = andy.FetchCache(ttls={"fundamentals": 60}, timeout=0.05)
+    hang = threading.Event()
+    stuck = cache.submit("fundamentals", "AAPL", hang.wait)
+
+    time.sleep(0.1)
+    retried = cache.submit("fundamentals", "AAPL", lambda: "fresh")
+
+    assert retried is not stuck
+    assert retried.result(1) == "fresh"
+    assert cache.info()["stats"]["fundamentals"]["expired"] == 1
+
+    hang.set()                       # the late finisher must not drop the newer entry
+    stuck.result(1)
+    time.sleep(0.01)
+    assert cache.info()["in_flight"] == 0
+    assert cache.submit("fundamentals", "AAPL", lambda: "unused").result(1) == "fresh"
+
+
+def test_errors_are_not_cached(andy):
+    cache = andy.FetchCache(ttls={"fundamentals": 60})
+
+    def boom():
+        raise RuntimeError("down")
+
+    failed = cache.submit("fundamentals", "AAPL", boom)
+    assert isinstance(failed.exception(1), RuntimeError)
+    time.sleep(0.01)
+    assert cache.submit("fundamentals", "AAPL", lambda: "ok").result(1) == "ok"
+    assert cache.info()["stats"]["fundamentals"]["errors"] == 1
@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import IndicatorState, TRADING_DAYS, compute_indicators, returns, rsi, rsi_wilder
+
+
+@pytest.fixture
+def closes(rng):
+    return 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, 130)))
+
+
+@pytest.fixture
+def days():
+    return [str(d.date()) for d in pd.date_range("2024-01-01", periods=130)]
+
+
+def pandas_reference(closes):
+    s = pd.Series(closes)
+    return {
+        "sma50": s.tail(50).mean() if len(s) >= 50 else None,
+        "ema20": s.ewm(span=20, adjust=False).mean().iloc[-1],
+        "rsi14": rsi(s),
+    }
+
+
+def test_incremental_matches_pandas_recompute(closes, days, rng):
+    state = IndicatorState()
+    state.seed("X", zip(days[:100], closes[:100]))
+
+    for i in range(100, 130):
+        # intraday ticks, then the close as the day's last tick
+        for minute, price in enumerate(list(closes[i] + rng.normal(0, 0.5, 4)) + [closes[i]]):
+            out = state.update("X", f"{days[i]}T15:{minute:02d}:00+00:00", price)
+        expected = pandas_reference(closes[: i + 1])
+        for name, value in expected.items():
+            assert out[name] == pytest.approx(value, abs=1e-9)
+
+
+def test_late_tick_for_a_committed_day_is_ignored(closes, days):
+    state = IndicatorState()
+    state.seed("X", zip(days[:60], closes[:60]))
+    state.update("X", f"{days[60]}T15:00:00Z", closes[60])
+    before = state.update("X", f"{days[61]}T15:00:00Z", closes[61])
+
+    after = state.update("X", f"{days[60]}T16:00:00Z", closes[60] * 2)
+
+    assert after == before
+
+
+def test_short_history_reports_none_until_windows_fill(closes, days):
+    state = IndicatorState()
+    for i in range(16):
+        out = state.update("Y", f"{days[i]}T15:00:00Z", closes[i])
+
+    assert out["sma50"] is None
+    assert out["rsi14"] == pytest.approx(rsi(pd.Series(closes[:16])), abs=1e-9)
+
+
+# ── batch engine ─────────────────────────────────────────
+
+def random_matrix(rng, tickers=6, days=120):
+    return 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, size=(tickers, days)), axis=1))
+
+
+def test_batch_engine_matches_pandas(rng):
+    close = random_matrix(rng)
+    full = compute_indicators(close)
+
+    for i in range(close.shape[0]):
+        s = pd.Series(close[i])
+        returns = s.pct_change()
+        np.testing.assert_allclose(full["sma50"][i], s.rolling(50).mean(), equal_nan=True)
+        np.testing.assert_allclose(full["ema20"][i], s.ewm(span=20, adjust=False).mean())
+        np.testing.assert_allclose(full["return_1d"][i], returns, equal_nan=True)
+        np.testing.assert_allclose(full["volatility20"][i], returns.rolling(20).std() * np.sqrt(TRADING_DAYS),
+                                   rtol=1e-6, equal_nan=True)
+        assert full["rsi14_sma"][i, -1] == pytest.approx(rsi(s), abs=1e-9)
+
+
+def test_latest_only_equals_last_backfilled_column(rng):
+    close = random_matrix(rng)
+    full = compute_indicators(close)
+    latest = compute_indicators(close, latest=True)
+
+    for name, values in latest.items():
+        np.testing.assert_allclose(values, full[name][:, -1], rtol=1e-9)
+
+
+def test_wilder_rsi_matches_pandas_ewm(rng):
+    close = random_matrix(rng, tickers=3)
+    out = rsi_wilder(close)
+
+    for i in range(close.shape[0]):
+        delta = pd.Series(close[i]).diff()
+        gain, loss = delta.clip(lower=0), -delta.clip(upper=0)
+        # Wilder: seeded with the mean of the first 14 moves, then alpha = 1/14
+        avg_gain = pd.concat([pd.Series([gain[1:15].mean()]), gain[15:]]).ewm(alpha=1 / 14, adjust=False).mean()
+        avg_loss = pd.concat([pd.Series([loss[1:15].mean()]), loss[15:]]).ewm(alpha=1 / 14, adjust=False).mean()
+        expected = 100 - 100 / (1 + avg_gain.to_numpy() / avg_loss.to_numpy())
+        np.testing.assert_allclose(out[i, 14:], expected, rtol=1e-9)
+
+
+def test_too_little_history_is_nan(rng):
+    close = random_matrix(rng, tickers=2, days=10)
+    latest = compute_indicators(close, latest=True)
+
+    assert np.isnan(latest["sma50"]).all()
+    assert np.isnan(latest["rsi14"]).all()
+    assert np.isfinite(latest["ema20"]).all()
+
+
+def test_ragged_history_is_computed_from_each_rows_first_close(rng):
+    close = random_matrix(rng, tickers=4, days=120)
+    close[1, :60] = np.nan          # shorter history
+    close[2, :110] = np.nan         # too short for most windows
+    close[3] = np.nan               # no history at all
+    full = compute_indicators(close)
+    latest = compute_indicators(close, latest=True)
+
+    for name, values in full.items():
+        np.testing.assert_allclose(values[0], compute_indicators(close[:1])[name][0], equal_nan=True)
+        np.testing.assert_allclose(values[1, 60:], compute_indicators(close[1:2, 60:])[name][0], equal_nan=True)
+        assert np.isnan(values[1, :60]).all() and np.isnan(values[3]).all()
+        np.testing.assert_allclose(latest[name], values[:, -1], rtol=1e-9, equal_nan=True)
+    assert np.isfinite(latest["sma50"][:2]).all() and np.isfinite(latest["ema20"][:3]).all()
+
+
+def test_nan_inside_the_history_is_rejected(rng):
+    close = random_matrix(rng, tickers=2, days=30)
+    close[0, 10] = np.nan
+
+    with pytest.raises(ValueError, match="forward-fill"):
+        compute_indicators(close)
+
+
+def test_latest_return_needs_two_closes():
+    assert np.isnan(returns(np.array([[100.0], [50.0]]), latest=True)).all()
@@ -0,0 +1,87 @@
+import copy
+
+import numpy as np
+
+
+def news(ticker, n):
+    return [
+        {
+            "ticker": ticker,
+            "title": f"{ticker} headline {i}",
+            "summary": f"summary {i}",
+            "publisher": "Wire",
+            "link": f"https://example.com/{ticker}/{i}",
+            "timestamp": "2026-01-01T00:00:00",
+            "data_type": "news",
+        }
+        for i in range(n)
+    ]
+
+
+def test_reingest_skips_unchanged_and_upserts_changed_items(andy):
+    pipeline = andy.PathwayETLPipeline()
+    items = news("AAPL", 20)
+    assert pipeline.load_to_vector_store(items, "AAPL") == {"new": 20, "updated": 0, "skipped": 0}
+    assert pipeline.load_to_vector_store(items, "AAPL") == {"new": 0, "updated": 0, "skipped": 20}
+
+    changed = copy.deepcopy(items)
+    changed[0]["summary"] += " (revised)"
+    changed[1]["title"] = changed[1]["title"].upper() + "  "      # formatting only: same id and hash
+    changed.append(news("AAPL", 21)[-1])
+
+    assert pipeline.load_to_vector_store(changed, "AAPL") == {"new": 1, "updated": 1, "skipped": 19}
+    store = pipeline.embeddings_store
+    assert store.live_count() == 21
+    assert "(revised)" in store.get(andy.document_id(changed[0], "AAPL"))["text"]
+
+
+def test_duplicates_in_one_batch_collapse(andy):
+    pipeline = andy.PathwayETLPipeline()
+    untitled = {"summary": "same words", "publisher": "Wire", "data_type": "news", "title": "", "link": ""}
+
+    counts = pipeline.load_to_vector_store([dict(untitled), dict(untitled)], "AAPL")
+
+    assert counts == {"new": 1, "updated": 0, "skipped": 1}
+    assert pipeline.embeddings_store.live_count() == 1
+
+
+def test_embedding_cache_reuses_vectors_across_pipelines(andy):
+    andy.embedding_cache.clear()
+    items = news("RTX", 10)
+    andy.PathwayETLPipeline().load_to_vector_store(items, "RTX")
+    misses = andy.embedding_cache.info()["misses"]
+
+    andy.PathwayETLPipeline().load_to_vector_store(items, "RTX")
+
+    info = andy.embedding_cache.info()
+    assert info["misses"] == misses
+    assert info["hits"] >= 10
+
+
+def test_embedding_cache_holds_copies_not_batch_views(andy):
+    cache = andy.EmbeddingCache(max_entries=2)
+    batch = np.ones((50, 8), dtype=np.float32)
+    digests = [bytes([i]) for i in range(3)]
+
+    cache.store(digests, batch[:3])
+    batch[:] = 0
+
+    found = cache.lookup(digests)
+    assert found[0] is None                                  # LRU: oldest dropped
+    assert all(vector.base is None and vector.sum() == 8 for vector in found[1:])
+
+
+def test_store_eviction_invalidates_the_dashboard(andy, monkeypatch):
+    cache = andy.DashboardCache(factory=lambda t: type("D", (), {
+        "loaded_tickers": {t}, "etl": type("E", (), {"shares_store": True})(), "load_ticker": lambda self, t: None,
+    })())
+    monkeypatch.setattr(andy, "dashboard_cache", cache)
+    monkeypatch.setattr(andy, "VECTOR_STORE_MAX_BYTES", 40_000)
+    cache.get("AAPL")
+    pipeline = andy.PathwayETLPipeline()
+    pipeline.load_to_vector_store(news("AAPL", 20), "AAPL")
+
+    pipeline.load_to_vector_store(news("RTX", 200), "RTX")
+
+    assert not pipeline.embeddings_store.has_ticker("AAPL")
+    assert "AAPL" not in cache.info()["tickers"]
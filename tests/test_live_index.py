@@ -0,0 +1,123 @@
+import gc
+import queue
+import threading
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from vector_store import VectorStore
+
+
+@pytest.fixture
+def live(andy):
+    """LiveIndex whose Pathway graph is replaced by a thread forwarding each upsert to the sink"""
+    index = andy.LiveIndex()
+    stop = threading.Event()
+    index._graph_thread = threading.Thread(target=stop.wait, daemon=True)      # start() is then a no-op
+    index._graph_thread.start()
+    index._subject = SimpleNamespace(inbox=queue.Queue())
+
+    def graph():
+        while not stop.is_set():
+            for row in index._subject.inbox.get():
+                index._on_change(None, row, 0, True)
+
+    threading.Thread(target=graph, daemon=True).start()
+    threading.Thread(target=index._index_loop, daemon=True).start()
+    yield index
+    stop.set()
+    index._subject.inbox.put([])
+
+
+def broken_encoder(texts, batch_size=None):
+    raise RuntimeError("encoder down")
+
+
+def items(andy, ticker, n):
+    return [
+        andy.vector_item({"title": f"{ticker} {i}", "summary": "s", "publisher": "p", "data_type": "news"},
+                         ticker, "2026-01-01T00:00:00")
+        for i in range(n)
+    ]
+
+
+def test_upsert_is_searchable_once_wait_returns(andy, live):
+    store = VectorStore()
+
+    assert live.wait(live.upsert(store, items(andy, "AAPL", 5)), timeout=5)
+
+    assert store.live_count() == 5
+    info = live.info()
+    assert info["indexed"] == 5 and info["failed_rows"] == 0 and info["queued"] == 0
+
+
+def test_failed_batch_is_never_reported_as_indexed(andy, live, monkeypatch):
+    monkeypatch.setattr(andy, "embed_texts", broken_encoder)
+    store = VectorStore()
+
+    assert live.wait(live.upsert(store, items(andy, "AAPL", 3)), timeout=5) is False
+
+    assert len(store) == 0
+    info = live.info()
+    assert info["errors"] == 1 and info["failed_rows"] == 3 and info["indexed"] == 0
+
+
+def test_load_falls_back_and_surfaces_the_failure(andy, live, monkeypatch):
+    monkeypatch.setattr(andy, "live_index", live)
+    monkeypatch.setattr(andy, "LIVE_INDEX", True)
+    pipeline = andy.PathwayETLPipeline()
+    monkeypatch.setattr(andy, "embed_texts", broken_encoder)          # both the graph and the fallback
+
+    with pytest.raises(RuntimeError, match="encoder down"):
+        pipeline.load_to_vector_store([{"title": "t", "summary": "s", "publisher": "p", "data_type": "news"}], "AAPL")
+    assert len(pipeline.embeddings_store) == 0
+
+
+def test_stores_are_held_weakly(andy, live):
+    store = VectorStore()
+    assert live.wait(live.upsert(store, items(andy, "AAPL", 2)), timeout=5)
+    assert live.info()["stores"] == 1 and live.subscriptions()
+
+    del store
+    gc.collect()
+
+    assert live.info()["stores"] == 0
+    assert live.subscriptions() == []
+
+
+def test_price_ticks_are_emitted_once_per_new_tick(andy, live, tmp_path, monkeypatch):
+    from price_store import ColumnarWriter
+
+    monkeypatch.setattr(andy, "PRICE_DATA_DIR", str(tmp_path))
+    writer = ColumnarWriter(tmp_path)
+    header = ["timestamp", "price", "volume"]
+    store = VectorStore()
+    live.wait(live.upsert(store, items(andy, "AAPL", 1)), timeout=5)
+    ticks = andy.PriceTickSubject(live)
+
+    writer.write("AAPL", "prices", header, [datetime.now(timezone.utc).isoformat(), 123.45, 1000])
+    writer.flush()
+    rows = ticks.poll()
+    assert len(rows) == 1 and "123.45" in rows[0]["text"] and rows[0]["doc_id"] == "AAPL:price_tick"
+    assert ticks.poll() == []
+
+    writer.write("AAPL", "prices", header, [datetime.now(timezone.utc).isoformat(), 124.0, 10])
+    writer.flush()
+    assert len(ticks.poll()) == 1
+    writer.close()
+
+
+def test_price_ticks_do_not_make_etl_data_fresh(andy):
+    pipeline = andy.PathwayETLPipeline()
+    store = pipeline.embeddings_store
+    tick = {"ticker": "AAPL", "price": 1.0, "volume": 1, "timestamp": datetime.now(timezone.utc).isoformat(),
+            "data_type": "price_tick"}
+    store.add([andy.vector_item(tick, "AAPL", tick["timestamp"])], np.ones((1, 8)))
+    assert not pipeline.has_fresh_data("AAPL")
+
+    news = items(andy, "AAPL", 1)[0]
+    news["timestamp"] = datetime.now().isoformat()
+    store.add([news], np.ones((1, 8)))
+    assert pipeline.has_fresh_data("AAPL")
@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+fitz = pytest.importorskip("fitz")
+
+from pdf_text import PdfTextCache, extract_texts  # noqa: E402
+
+
+def write_pdf(path, pages):
+    doc = fitz.open()
+    for text in pages:
+        doc.new_page().insert_text((72, 72), text)
+    doc.save(path)
+    doc.close()
+    return path
+
+
+@pytest.fixture
+def pdf(tmp_path):
+    return write_pdf(tmp_path / "report.pdf", ["first page", "second page", "third page"])
+
+
+def test_pages_are_cached_in_memory_and_on_disk(tmp_path, pdf):
+    cache = PdfTextCache(cache_dir=tmp_path / "cache", workers=1)
+
+    (key, pages), = cache.get_pages([pdf])
+    assert [page.strip() for page in pages] == ["first page", "second page", "third page"]
+    assert cache.get_documents([pdf]) == [(key, "".join(pages))]
+    assert cache.stats["extractions"] == 1 and cache.stats["memory_hits"] == 1
+
+    fresh = PdfTextCache(cache_dir=tmp_path / "cache", workers=1)
+    assert fresh.get_pages([pdf]) == [(key, pages)]
+    assert fresh.stats == {"memory_hits": 0, "disk_hits": 1, "hash_hits": 0, "extractions": 0}
+
+
+def test_changed_file_is_re_extracted_with_a_new_key(tmp_path, pdf):
+    cache = PdfTextCache(cache_dir=None, workers=1)
+    (key, _), = cache.get_pages([pdf])
+
+    write_pdf(pdf, ["rewritten"])
+    os.utime(pdf, ns=(1, 1))
+    (new_key, pages), = cache.get_pages([pdf])
+
+    assert new_key != key
+    assert [page.strip() for page in pages] == ["rewritten"]
+    assert cache.stats["extractions"] == 2
+
+
+def test_touched_identical_file_is_a_hash_hit(tmp_path, pdf):
+    cache = PdfTextCache(cache_dir=tmp_path / "cache", verify_hash=True, workers=1)
+    cache.get_pages([pdf])
+    cache.clear()
+
+    os.utime(pdf, ns=(1, 1))
+    cache.get_pages([pdf])
+
+    assert cache.stats["hash_hits"] == 1 and cache.stats["extractions"] == 1
+
+
+def test_parallel_extraction_matches_inline(tmp_path):
+    paths = [write_pdf(tmp_path / f"doc{i}.pdf", [f"doc {i} page {p}" for p in range(9)]) for i in range(2)]
+    assert extract_texts(paths, workers=2) == extract_texts(paths, workers=1)
@@ -0,0 +1,68 @@
+import numpy as np
+
+from vector_store import PersistentVectorStore
+from test_vector_store import make_items, vectors
+
+
+def test_reopen_serves_the_same_rows(tmp_path, rng):
+    store = PersistentVectorStore(tmp_path)
+    items = make_items("AAPL", 20)
+    store.add(items, vectors(rng, 20))
+    query = vectors(rng, 1)[0]
+
+    reopened = PersistentVectorStore(tmp_path)
+
+    assert len(reopened) == 20
+    assert reopened.get("AAPL:doc7") == items[7]
+    assert reopened.content_hash("AAPL:doc7") == items[7]["content_hash"]
+    assert ([item["id"] for _, item in reopened.search(query, "AAPL", 5)]
+            == [item["id"] for _, item in store.search(query, "AAPL", 5)])
+
+
+def test_records_stay_on_disk(tmp_path, rng):
+    store = PersistentVectorStore(tmp_path)
+    store.add(make_items("AAPL", 10), vectors(rng, 10))
+
+    reopened = PersistentVectorStore(tmp_path)
+
+    assert reopened._row_text == [] and reopened._row_meta == []
+    assert isinstance(reopened.matrix, np.memmap)
+    assert [item["id"] for item in reopened] == [f"AAPL:doc{i}" for i in range(10)]
+
+
+def test_refresh_picks_up_rows_and_upserts_from_another_writer(tmp_path, rng):
+    writer = PersistentVectorStore(tmp_path)
+    reader = PersistentVectorStore(tmp_path)
+    writer.add(make_items("AAPL", 10), vectors(rng, 10))
+    reader.refresh()
+    assert len(reader) == 10
+
+    revised = make_items("AAPL", 1)
+    revised[0]["text"] = "AAPL revised"
+    writer.add(revised, vectors(rng, 1))
+    reader.refresh()
+
+    assert len(reader) == 11
+    assert reader.live_count() == 10
+    assert reader.get("AAPL:doc0")["text"] == "AAPL revised"
+
+
+def test_compaction_rewrites_files_and_other_workers_reload(tmp_path, rng):
+    writer = PersistentVectorStore(tmp_path)
+    writer.add(make_items("A", 50), vectors(rng, 50))
+    writer.max_bytes = int(3.5 * writer.nbytes())
+    reader = PersistentVectorStore(tmp_path)
+    lost = []
+    reader.on_evict(lost.append)
+    for ticker in ("B", "C", "D"):
+        writer.add(make_items(ticker, 50), vectors(rng, 50))
+    assert "A" not in writer.tickers()
+
+    reader.refresh()
+
+    assert sorted(reader.tickers()) == sorted(writer.tickers())
+    assert len(reader) == len(writer)
+    assert lost == [["A"]]
+    assert (tmp_path / "embeddings.f32").stat().st_size == len(writer) * 4 * writer.dim
+    survivor = writer.tickers()[0]
+    assert PersistentVectorStore(tmp_path).get(f"{survivor}:doc3")["ticker"] == survivor
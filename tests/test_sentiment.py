@@ -0,0 +1,47 @@
+import pytest
+
+from sentiment import SentimentEngine, expand_lexicon, stem, term_counts
+
+
+@pytest.mark.parametrize("word, expected", [
+    ("dropped", "drop"), ("drops", "drop"), ("dropping", "drop"),
+    ("rising", "rise"), ("rises", "rise"),
+    ("declined", "declin"), ("decline", "declin"), ("declining", "declin"),
+    ("losses", "loss"), ("gains", "gain"), ("tensions", "tension"),
+    ("focus", "focus"), ("bring", "bring"), ("war", "war"),
+])
+def test_stem(word, expected):
+    assert stem(word) == expected
+
+
+def test_whole_words_only():
+    counts = term_counts("Gains against the gain; regained")
+    assert counts[stem("gain")] == 2
+    assert "against" in counts
+
+
+def test_score_counts_inflections_once_per_token():
+    engine = SentimentEngine()
+    documents = [("a", "Shares dropped as war fears rose, but demand stayed strong and gains kept rising.")]
+
+    result = engine.score(documents, ["gain", "rising", "rise", "strong", "demand"], ["drop", "war", "fear"])
+
+    assert result == {"positive": 4, "negative": 3, "score": 1}
+    assert len(expand_lexicon(["rising", "rise"])) == 1
+
+
+def test_caches_are_bounded_lru():
+    engine = SentimentEngine(max_documents=2, max_scores=3)
+    for key in ("a", "b", "c"):
+        engine.score([(key, "strong growth, rising risk")])
+
+    assert list(engine._index) == ["b", "c"]
+    assert len(engine._scores) <= 3
+    assert all(doc_key != "a" for doc_key, _ in engine._scores)
+
+
+def test_cached_score_ignores_text_for_a_known_key():
+    engine = SentimentEngine()
+    first = engine.score([("doc", "strong strong")], ["strong"], ["weak"])
+    again = engine.score([("doc", "different text")], ["strong"], ["weak"])
+    assert first == again
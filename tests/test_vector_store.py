@@ -0,0 +1,180 @@
+import numpy as np
+import pytest
+
+from vector_store import VectorStore, top_k_indices
+
+
+def make_items(ticker, n, prefix="doc", timestamp="2026-01-01T00:00:00"):
+    return [
+        {
+            "id": f"{ticker}:{prefix}{i}",
+            "ticker": ticker,
+            "text": f"{ticker} text {i}",
+            "metadata": {"data_type": "news", "i": i},
+            "timestamp": timestamp,
+            "content_hash": f"{i:032x}",
+        }
+        for i in range(n)
+    ]
+
+
+def vectors(rng, n, dim=16):
+    return rng.normal(size=(n, dim)).astype(np.float32)
+
+
+def brute_force(store, query, ticker, k):
+    matrix = np.asarray(store.matrix, dtype=np.float32)
+    rows = [row for row, item in enumerate(store) if item["ticker"] == ticker and not store._dead[row]]
+    scores = matrix[rows] @ (query / np.linalg.norm(query))
+    return [store._item(rows[i])["id"] for i in np.argsort(-scores)[:k]]
+
+
+def test_top_k_indices_orders_best_first():
+    scores = np.array([0.1, 0.9, 0.5, 0.7])
+    assert top_k_indices(scores, 2).tolist() == [1, 3]
+    assert top_k_indices(scores, 10).tolist() == [1, 3, 2, 0]
+    assert top_k_indices(scores, 0).size == 0
+
+
+def test_search_matches_brute_force_per_ticker(rng):
+    store = VectorStore()
+    store.add(make_items("AAPL", 200), vectors(rng, 200))
+    store.add(make_items("RTX", 200), vectors(rng, 200))
+    query = vectors(rng, 1)[0]
+
+    hits = store.search(query, "AAPL", top_k=5)
+
+    assert [item["id"] for _, item in hits] == brute_force(store, query, "AAPL", 5)
+    assert all(item["ticker"] == "AAPL" for _, item in hits)
+    assert [score for score, _ in hits] == sorted((score for score, _ in hits), reverse=True)
+
+
+def test_search_batch_equals_single_searches(rng):
+    store = VectorStore()
+    store.add(make_items("AAPL", 100), vectors(rng, 100))
+    queries = vectors(rng, 4)
+
+    batch = store.search_batch(queries, "AAPL", top_k=3)
+
+    for query, hits in zip(queries, batch):
+        single = store.search(query, "AAPL", top_k=3)
+        assert [item["id"] for _, item in hits] == [item["id"] for _, item in single]
+
+
+def test_upsert_supersedes_previous_row(rng):
+    store = VectorStore()
+    store.add(make_items("AAPL", 10), vectors(rng, 10))
+    updated = make_items("AAPL", 1)
+    updated[0]["text"] = "AAPL revised text"
+    store.add(updated, vectors(rng, 1))
+
+    assert len(store) == 11
+    assert store.live_count() == 10
+    assert store.get("AAPL:doc0")["text"] == "AAPL revised text"
+    ids = [item["id"] for _, item in store.search(vectors(rng, 1)[0], "AAPL", top_k=20)]
+    assert sorted(ids) == sorted(f"AAPL:doc{i}" for i in range(10))
+
+
+def test_records_round_trip_through_columns(rng):
+    store = VectorStore()
+    items = make_items("AAPL", 3)
+    store.add(items, vectors(rng, 3))
+
+    assert list(store) == items
+    assert store.get("AAPL:doc2") == items[2]
+    assert store.get("missing") is None
+    assert store.content_hash("AAPL:doc1") == f"{1:032x}"
+    assert store.content_hash("missing") is None
+
+
+def test_last_updated_compares_instants_and_can_skip_data_types(rng):
+    store = VectorStore()
+    store.add(make_items("AAPL", 2, timestamp="2026-01-01T12:00:00"), vectors(rng, 2))
+    tick = make_items("AAPL", 1, prefix="tick", timestamp="2026-01-01T00:00:00+00:00")
+    tick[0]["metadata"]["data_type"] = "price_tick"
+    store.add(tick, vectors(rng, 1))
+    later = make_items("AAPL", 1, prefix="late", timestamp="2099-01-01T00:00:00+00:00")
+    later[0]["metadata"]["data_type"] = "price_tick"
+    store.add(later, vectors(rng, 1))
+
+    assert store.last_updated("aapl") == "2099-01-01T00:00:00+00:00"
+    assert store.last_updated("AAPL", exclude=("price_tick",)) == "2026-01-01T12:00:00"
+    assert store.last_updated("MSFT") is None
+
+
+def test_identical_texts_are_stored_once(rng):
+    store = VectorStore()
+    store.add(make_items("AAPL", 50), vectors(rng, 50))
+    store.add(make_items("AAPL", 50, prefix="copy"), vectors(rng, 50))
+
+    assert store.memory_report()["unique_texts"] == 50
+
+
+def test_float16_store_returns_the_same_neighbours(rng):
+    embeddings = vectors(rng, 300)
+    full = VectorStore(dtype="float32")
+    half = VectorStore(dtype="float16")
+    full.add(make_items("AAPL", 300), embeddings)
+    half.add(make_items("AAPL", 300), embeddings)
+    query = vectors(rng, 1)[0]
+
+    assert half.matrix.dtype == np.float16
+    assert half.nbytes() < full.nbytes()
+    assert [i["id"] for _, i in half.search(query, "AAPL", 5)] == [i["id"] for _, i in full.search(query, "AAPL", 5)]
+
+
+def test_unsupported_dtype_and_dim_mismatch_raise(rng):
+    with pytest.raises(ValueError):
+        VectorStore(dtype="int8")
+    store = VectorStore()
+    store.add(make_items("AAPL", 2), vectors(rng, 2))
+    with pytest.raises(ValueError):
+        store.add(make_items("AAPL", 1), vectors(rng, 1, dim=8))
+    with pytest.raises(ValueError):
+        store.add(make_items("AAPL", 2), vectors(rng, 1))
+
+
+def test_budget_evicts_least_recently_used_ticker_and_notifies(rng):
+    store = VectorStore()
+    evicted = []
+    store.on_evict(evicted.append)
+    store.add(make_items("A", 100), vectors(rng, 100))
+    store.max_bytes = int(3.5 * store.nbytes())           # room for three tickers
+    for ticker in ("B", "C"):
+        store.add(make_items(ticker, 100), vectors(rng, 100))
+    assert evicted == []
+    store.search(vectors(rng, 1)[0], "A", top_k=1)        # A becomes most recently used
+
+    store.add(make_items("D", 100), vectors(rng, 100))
+
+    assert evicted == [["B"]]
+    assert sorted(store.tickers()) == ["A", "C", "D"]
+    assert store.nbytes() <= store.max_bytes
+    assert store.memory_report()["evicted_tickers"] == 1
+
+
+def test_budget_smaller_than_one_ingest_drops_oldest_rows(rng):
+    store = VectorStore(max_bytes=10_000)
+    old = make_items("Z", 50, prefix="old", timestamp="2026-01-01T00:00:00")
+    new = make_items("Z", 50, prefix="new", timestamp="2026-02-01T00:00:00")
+
+    store.add(old + new, vectors(rng, 100))
+
+    kept = {item["id"] for item in store}
+    assert store.nbytes() <= store.max_bytes
+    assert {item["id"] for item in new} <= kept
+    assert len(kept) < 100
+
+
+def test_ivf_index_recall_against_exact_search(rng):
+    store = VectorStore(index="ivf", min_train_rows=512, nprobe=8)
+    store.add(make_items("AAPL", 3000), vectors(rng, 3000))
+    assert store.ann.trained
+
+    recall = []
+    for query in vectors(rng, 20):
+        approx = {item["id"] for _, item in store.search(query, "AAPL", top_k=10)}
+        exact = {item["id"] for _, item in store.search(query, "AAPL", top_k=10, exact=True)}
+        recall.append(len(approx & exact) / 10)
+
+    assert np.mean(recall) >= 0.5
@@ -0,0 +1,162 @@
+# ticker_registry.py – declarative ticker config + precompiled price columns
+# ------------------------------------------------------------------
+# tickers.json maps each ticker to its OHLCV CSV and news PDFs; it is
+# read once at startup (missing files are reported and skipped).
+# Each CSV is compiled once into typed NumPy columns (dates sorted,
+# thousands-separated volumes parsed, 7-day returns derived) and saved
+# as .npz next to the other caches; it is only recompiled when the CSV's
+# (mtime, size) changes.
+# ------------------------------------------------------------------
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+TICKER_REGISTRY_PATH = Path(os.getenv("TICKER_REGISTRY", "tickers.json"))
+PRICE_CACHE_DIR = Path(os.getenv("PRICE_CACHE_DIR", ".cache/prices"))
+RETURN_WINDOW = 7      # trading days behind the "7d_return" column
+
+
+class TickerConfig:
+    """Price file and document list for one ticker"""
+
+    __slots__ = ("ticker", "prices", "documents")
+
+    def __init__(self, ticker: str, prices: Path, documents: List[Path]):
+        self.ticker = ticker
+        self.prices = prices
+        self.documents = documents
+
+
+class TickerRegistry:
+    """Tickers served by /analyze, loaded from a JSON registry file"""
+
+    def __init__(self, configs: Dict[str, TickerConfig]):
+        self._configs = configs
+
+    @classmethod
+    def load(cls, path: Path = TICKER_REGISTRY_PATH) -> "TickerRegistry":
+        path = Path(path)
+        base = path.parent
+        configs = {}
+        for ticker, entry in json.loads(path.read_text()).items():
+            ticker = ticker.upper()
+            prices = base / entry["prices"]
+            if not prices.exists():
+                print(f"⚠️ {ticker}: price file {prices} not found, ticker disabled")
+                continue
+            documents = []
+            for name in entry.get("documents", []):
+                doc = base / name
+                if doc.exists():
+                    documents.append(doc)
+                else:
+                    print(f"⚠️ {ticker}: document {doc} not found, skipped")
+            configs[ticker] = TickerConfig(ticker, prices, documents)
+        return cls(configs)
+
+    def get(self, ticker: str) -> Optional[TickerConfig]:
+        return self._configs.get(ticker.upper())
+
+    def tickers(self) -> List[str]:
+        return list(self._configs)
+
+
+class PriceColumns:
+    """Typed, date-sorted price columns with derived returns"""
+
+    __slots__ = ("date", "close", "volume", "return_7d")
+
+    def __init__(self, date: np.ndarray, close: np.ndarray, volume: np.ndarray, return_7d: np.ndarray):
+        self.date = date
+        self.close = close
+        self.volume = volume
+        self.return_7d = return_7d
+
+    def latest(self) -> Dict:
+        return {
+            "date": self.date[-1],
+            "close": float(self.close[-1]),
+            "7d_return": float(self.return_7d[-1]),
+        }
+
+
+def compile_price_csv(csv_path) -> PriceColumns:
+    """Parse a Yahoo-style OHLCV CSV into sorted columns"""
+    df = pd.read_csv(csv_path, thousands=",")
+    df.columns = df.columns.str.strip().str.lower()
+    # Yahoo exports interleave event rows ("0.63 Dividend") with no prices
+    df = df.dropna(subset=["close"])
+    df["date"] = pd.to_datetime(df["date"], format="%b %d, %Y")
+    df = df.sort_values("date", kind="stable")
+
+    close = df["close"].to_numpy(dtype=np.float64)
+    shifted = np.full_like(close, np.nan)
+    shifted[RETURN_WINDOW:] = close[:-RETURN_WINDOW]
+    return PriceColumns(
+        date=df["date"].to_numpy(dtype="datetime64[D]"),
+        close=close,
+        volume=df["volume"].fillna(0).to_numpy(dtype=np.int64),
+        return_7d=(close - shifted) / shifted,
+    )
+
+
+class PriceCache:
+    """Memory + .npz cache of compiled price columns, keyed by CSV (mtime, size)"""
+
+    def __init__(self, cache_dir: Optional[Path] = PRICE_CACHE_DIR):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._memory: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def get(self, csv_path) -> PriceColumns:
+        key = str(Path(csv_path).resolve())
+        st = os.stat(key)
+        stamp = np.array([st.st_mtime_ns, st.st_size], dtype=np.int64)
+
+        with self._lock:
+            cached = self._memory.get(key)
+        if cached and np.array_equal(cached[0], stamp):
+            return cached[1]
+
+        columns = self._read_disk(key, stamp)
+        if columns is None:
+            columns = compile_price_csv(key)
+            self._write_disk(key, stamp, columns)
+        with self._lock:
+            self._memory[key] = (stamp, columns)
+        return columns
+
+    def _disk_path(self, key: str) -> Path:
+        return self.cache_dir / (Path(key).stem + ".npz")
+
+    def _read_disk(self, key: str, stamp: np.ndarray) -> Optional[PriceColumns]:
+        if not self.cache_dir:
+            return None
+        try:
+            with np.load(self._disk_path(key)) as npz:
+                if str(npz["source"]) != key or not np.array_equal(npz["stamp"], stamp):
+                    return None
+                return PriceColumns(npz["date"], npz["close"], npz["volume"], npz["return_7d"])
+        except (FileNotFoundError, KeyError, ValueError):
+            return None
+
+    def _write_disk(self, key: str, stamp: np.ndarray, columns: PriceColumns) -> None:
+        if not self.cache_dir:
+            return
+        target = self._disk_path(key)
+        tmp = target.with_name(f"{target.stem}.{os.getpid()}.tmp.npz")
+        np.savez(tmp, source=np.array(key), stamp=stamp, date=columns.date,
+                 close=columns.close, volume=columns.volume, return_7d=columns.return_7d)
+        os.replace(tmp, target)
+
+
+ticker_registry = TickerRegistry.load()
+price_cache = PriceCache()
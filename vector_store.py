@@ -0,0 +1,782 @@
+# vector_store.py – in-memory vector store for the financial RAG system
+# ------------------------------------------------------------------
+# Embeddings live in one contiguous, pre-normalized float32 matrix so a
+# query is a single matrix-vector product + argpartition top-k (and a
+# batch of queries one matrix-matrix product).
+# Rows are appended in per-ingest blocks, so every ticker owns a short
+# list of [start, stop) row ranges instead of a per-row filter.
+# With index="ivf" large stores are searched through an IVF index and
+# only the probed buckets are scored.
+# Items carrying an "id" are upserts: a newer row with the same id
+# supersedes the older one, which stays in the matrix but is masked out
+# of every search (the same rule applies when replaying rows from disk).
+# Item records are not kept as dicts: per-row columns (ticker, data
+# type, timestamp, bytes, content hash, id, interned text, compact JSON
+# metadata) sit next to the matrix and a result's dict is only built
+# when a search returns it. An optional max_bytes budget evicts
+# superseded rows, then least-recently-used tickers, then the oldest
+# rows (float16 matrices halve the vectors); on_evict() listeners hear
+# about every ticker that lost all its rows.
+# PersistentVectorStore keeps the same layout on disk: an append-only
+# raw float32 file plus a JSON-lines file of item records, both
+# memory-mapped read-only so every worker shares them through the page
+# cache; a worker only keeps each record's offset, never the record.
+# ------------------------------------------------------------------
+
+import fcntl
+import json
+import mmap
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows as float32 (zero rows stay zero)"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest scores, best first, without a full sort"""
+    n = scores.shape[0]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < n:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(n)
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+EVICT_TARGET = 0.9     # once over max_bytes, evict down to this fraction of it
+
+# per-row column arrays, grown together with the matrix
+_ROW_COLUMNS = {
+    "_row_tickers": np.int32,    # ticker code
+    "_row_types": np.int16,      # metadata data_type code
+    "_row_times": np.float64,    # item timestamp, epoch seconds (NaN if missing)
+    "_row_bytes": np.int64,      # approximate bytes the row holds
+    "_dead": bool,               # superseded rows
+    "_row_hashes": "S32",        # content_hash of the item ("" if it had none)
+}
+
+
+def _epoch(stamp) -> float:
+    """Epoch seconds of an ISO timestamp (NaN if missing or unparseable)"""
+    if not stamp:
+        return np.nan
+    try:
+        return datetime.fromisoformat(str(stamp)).timestamp()
+    except ValueError:
+        return np.nan
+
+
+class VectorStore:
+    """Contiguous embedding matrix + per-row columns + per-ticker row ranges
+
+    An item is stored as its id, ticker, text, metadata, timestamp and
+    content_hash (other keys are dropped) and comes back from get(),
+    search() and iteration as a freshly built dict. dtype="float16"
+    halves the matrix (scores are still computed in float32). Identical
+    texts are stored once. With max_bytes set, an add that pushes the
+    store over budget evicts superseded rows, then whole tickers in
+    least-recently-used order, then the oldest rows, until it is back
+    under EVICT_TARGET × max_bytes.
+    """
+
+    _columns = _ROW_COLUMNS
+
+    def __init__(self, dim: Optional[int] = None, initial_capacity: int = 256,
+                 index: str = "exact", dtype=np.float32, max_bytes: Optional[int] = None,
+                 **index_options):
+        if index not in ("exact", "ivf"):
+            raise ValueError(f"unknown index type {index!r} (expected 'exact' or 'ivf')")
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in (np.float32, np.float16):
+            raise ValueError(f"unsupported dtype {self.dtype} (expected float32 or float16)")
+        self.dim = dim
+        self.max_bytes = max_bytes or None
+        self.index_type = index
+        self._index_options = index_options
+        self._initial_capacity = initial_capacity
+        self._ticker_codes: Dict[str, int] = {}
+        self._ticker_names: List[str] = []           # code -> ticker
+        self._type_codes: Dict[str, int] = {}
+        self._ticker_used: Dict[str, float] = {}      # last add/search, monotonic
+        self._lock = threading.Lock()
+        self.stats = {"compactions": 0, "evicted_rows": 0, "evicted_tickers": 0}
+        self._evict_listeners = []
+        self._reset()
+
+    def _reset(self) -> None:
+        """Drop every row (ticker/type codes and usage times survive)"""
+        self._ids: List[Optional[str]] = []
+        self._row_text: List[str] = []
+        self._row_meta: List[str] = []                # compact JSON
+        self._row_stamps: List[Optional[str]] = []
+        self._capacity = self._initial_capacity
+        self._matrix = np.empty((self._capacity, self.dim), dtype=self.dtype) if self.dim else None
+        for name, dtype in self._columns.items():
+            setattr(self, name, np.zeros(self._capacity, dtype=dtype))
+        self._row_ids: Dict[str, int] = {}
+        self._texts: Dict[str, str] = {}
+        self._stamps: Dict[str, str] = {}
+        self._dead_count = 0
+        self._size = 0
+        self._bytes = 0
+        self._ticker_ranges: Dict[str, List[List[int]]] = {}
+        self._ticker_updated: Dict[str, Dict[str, Tuple[float, str]]] = {}   # ticker -> data_type -> (epoch, stamp)
+        self.ann = IVFIndex(**self._index_options) if self.index_type == "ivf" else None
+        self._trained_size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        return (self._item(row) for row in range(self._size))
+
+    def _records(self) -> Tuple:
+        """The record columns as of now (a compaction swaps in new ones, so a reader can hold these)"""
+        return (self._ticker_names, self._row_tickers, self._row_text, self._row_meta,
+                self._ids, self._row_stamps, self._row_hashes)
+
+    def _build_item(self, records: Tuple, row: int) -> Dict:
+        names, tickers, texts, metas, ids, stamps, hashes = records
+        item = {"ticker": names[tickers[row]], "text": texts[row], "metadata": json.loads(metas[row])}
+        if ids[row] is not None:
+            item["id"] = ids[row]
+        if stamps[row] is not None:
+            item["timestamp"] = stamps[row]
+        if hashes[row]:
+            item["content_hash"] = hashes[row].decode()
+        return item
+
+    def _item(self, row: int) -> Dict:
+        """The item stored in row, rebuilt from the columns"""
+        return self._build_item(self._records(), row)
+
+    def on_evict(self, listener) -> None:
+        """Call listener(tickers) whenever tickers lose all their rows to eviction or a reload"""
+        self._evict_listeners.append(listener)
+
+    def _notify_evicted(self, tickers) -> None:
+        # called without the store lock held: listeners may call back into the store
+        if not tickers:
+            return
+        for listener in self._evict_listeners:
+            try:
+                listener(sorted(tickers))
+            except Exception as e:
+                print(f"⚠️ Eviction listener failed: {e}")
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """View of the filled rows"""
+        if self._matrix is None:
+            return np.empty((0, self.dim or 0), dtype=self.dtype)
+        return self._matrix[: self._size]
+
+    def tickers(self) -> List[str]:
+        return list(self._ticker_ranges)
+
+    def has_ticker(self, ticker: str) -> bool:
+        return ticker.upper() in self._ticker_ranges
+
+    def nbytes(self, ticker: Optional[str] = None) -> int:
+        """Approximate memory held by embeddings, text and metadata (optionally one ticker's)"""
+        with self._lock:
+            if not ticker:
+                return int(self._bytes)
+            return int(self._row_bytes[self.rows_for(ticker)].sum())
+
+    def memory_report(self) -> Dict:
+        """Rows and approximate bytes per ticker, plus the budget and eviction counters"""
+        with self._lock:
+            live = ~self._dead[: self._size]
+            now = time.monotonic()
+            tickers = {}
+            for ticker in self._ticker_ranges:
+                rows = self.rows_for(ticker)
+                tickers[ticker] = {
+                    "rows": int(live[rows].size),
+                    "live_rows": int(live[rows].sum()),
+                    "bytes": int(self._row_bytes[rows].sum()),
+                    "last_updated": self.last_updated(ticker),
+                    "idle_seconds": round(now - self._ticker_used[ticker], 1) if ticker in self._ticker_used else None,
+                }
+            return {
+                "dtype": self.dtype.name,
+                "rows": self._size,
+                "live_rows": self._size - self._dead_count,
+                "unique_texts": len(self._texts),
+                "bytes": int(self._bytes),
+                "max_bytes": self.max_bytes,
+                "tickers": tickers,
+                **self.stats,
+            }
+
+    # ── writes ──────────────────────────────────────────────
+    def add(self, items: List[Dict], embeddings: np.ndarray) -> None:
+        """Append items (each with a "ticker", optionally an "id" to upsert) and their embeddings"""
+        if not items:
+            return
+        vectors = normalize_rows(embeddings)
+        if len(items) != vectors.shape[0]:
+            raise ValueError(f"{len(items)} items but {vectors.shape[0]} embeddings")
+
+        with self._lock:
+            self._append_locked(items, vectors)
+            written = self._touch({item["ticker"].upper() for item in items})
+            evicted = self._enforce_budget_locked(written)
+        self._notify_evicted(evicted)
+
+    def _append_locked(self, items: List[Dict], vectors: np.ndarray) -> None:
+        self._reserve(vectors.shape[1], self._size + len(items))
+        start = self._size
+        self._matrix[start : start + len(items)] = vectors
+        self._size += len(items)
+        self._index_rows(items, start, vectors)
+
+    def refresh(self) -> None:
+        """Pick up rows written elsewhere (no-op for the in-memory store)"""
+
+    def last_updated(self, ticker: str, exclude=()) -> Optional[str]:
+        """ISO timestamp of the newest row stored for ticker, ignoring data types in exclude
+
+        Rows are compared by instant, so naive and UTC-offset timestamps mix safely.
+        """
+        newest = [entry for kind, entry in list(self._ticker_updated.get(ticker.upper(), {}).items())
+                  if kind not in exclude]
+        return max(newest)[1] if newest else None
+
+    def _touch(self, tickers) -> set:
+        now = time.monotonic()
+        for ticker in tickers:
+            self._ticker_used[ticker] = now
+        return set(tickers)
+
+    def _index_rows(self, items: List[Dict], start: int, vectors: np.ndarray) -> None:
+        self._grow_columns(start + len(items))
+        vector_bytes = (self.dim or 0) * self.dtype.itemsize
+        parsed_stamp, parsed_epoch = None, np.nan     # a batch usually shares one timestamp
+
+        for offset, item in enumerate(items):
+            row = start + offset
+            ticker = item["ticker"].upper()
+            code = self._ticker_codes.get(ticker)
+            if code is None:
+                code = self._ticker_codes[ticker] = len(self._ticker_names)
+                self._ticker_names.append(ticker)
+            self._row_tickers[row] = code
+            metadata = item.get("metadata")
+            kind = metadata.get("data_type", "") if isinstance(metadata, dict) else ""
+            self._row_types[row] = self._type_codes.setdefault(kind, len(self._type_codes))
+            self._extend_range(ticker, row)
+            item_id = item.get("id")
+            if item_id is not None:
+                old = self._row_ids.get(item_id)
+                if old is not None and not self._dead[old]:
+                    self._dead[old] = True
+                    self._dead_count += 1
+                self._row_ids[item_id] = row
+            stamp = item.get("timestamp")
+            if stamp != parsed_stamp:
+                parsed_stamp, parsed_epoch = stamp, _epoch(stamp)
+            self._row_times[row] = parsed_epoch
+            if not np.isnan(parsed_epoch):
+                updated = self._ticker_updated.setdefault(ticker, {})
+                if parsed_epoch > updated.get(kind, (-np.inf, ""))[0]:
+                    updated[kind] = (parsed_epoch, stamp)
+            self._row_hashes[row] = (item.get("content_hash") or "").encode()
+
+            row_bytes = vector_bytes + self._keep_record(row, item)
+            self._row_bytes[row] = row_bytes
+            self._bytes += row_bytes
+
+        if self.ann is not None:
+            self._update_ann(vectors, start)
+
+    def _keep_record(self, row: int, item: Dict) -> int:
+        """Store the rest of row's record in the columns; returns the bytes it added"""
+        item_id = item.get("id")
+        self._ids.append(item_id)
+        stamp = item.get("timestamp")
+        self._row_stamps.append(self._stamps.setdefault(stamp, stamp) if stamp is not None else None)
+
+        # a re-ingested text shares the string already stored
+        text = item.get("text", "")
+        stored = self._texts.get(text)
+        if stored is None:
+            self._texts[text] = stored = text
+            text_bytes = len(text)
+        else:
+            text_bytes = 0
+        self._row_text.append(stored)
+        meta = json.dumps(item.get("metadata"), separators=(",", ":"), default=str)
+        self._row_meta.append(meta)
+        return text_bytes + len(meta) + len(item_id or "")
+
+    def _grow_columns(self, needed: int) -> None:
+        current = self._row_tickers.shape[0]
+        if needed <= current:
+            return
+        grown_size = max(needed, 2 * current)
+        for name in self._columns:
+            column = getattr(self, name)
+            grown = np.zeros(grown_size, dtype=column.dtype)
+            grown[:current] = column
+            setattr(self, name, grown)
+
+    def _update_ann(self, vectors: np.ndarray, start: int) -> None:
+        # (re)train once the store is big enough, and again each time it
+        # quadruples so bucket sizes stay balanced; otherwise insert
+        if self._size >= self.ann.min_train_rows and self._size >= 4 * self._trained_size:
+            self.ann.train(self.matrix)
+            self._trained_size = self._size
+        else:
+            self.ann.add(vectors, start)
+
+    def _reserve(self, dim: int, needed: int) -> None:
+        if self._matrix is None:
+            self.dim = dim
+            self._capacity = max(self._capacity, needed)
+            self._matrix = np.empty((self._capacity, dim), dtype=self.dtype)
+            return
+        if dim != self.dim:
+            raise ValueError(f"embedding dim {dim} does not match store dim {self.dim}")
+        if needed <= self._capacity:
+            return
+        while self._capacity < needed:
+            self._capacity *= 2
+        grown = np.empty((self._capacity, self.dim), dtype=self.dtype)
+        grown[: self._size] = self._matrix[: self._size]
+        self._matrix = grown
+
+    def _extend_range(self, ticker: str, row: int) -> None:
+        ranges = self._ticker_ranges.setdefault(ticker, [])
+        if ranges and ranges[-1][1] == row:
+            ranges[-1][1] = row + 1
+        else:
+            ranges.append([row, row + 1])
+
+    # ── eviction ────────────────────────────────────────────
+    def _enforce_budget_locked(self, protected: set) -> set:
+        """Evict until under EVICT_TARGET × max_bytes; tickers in `protected` go last
+
+        Returns the tickers left without any rows, for _notify_evicted().
+        """
+        if not self.max_bytes or self._bytes <= self.max_bytes:
+            return set()
+        size = self._size
+        target = self.max_bytes * EVICT_TARGET
+        row_bytes = self._row_bytes[:size]
+        codes = self._row_tickers[:size]
+
+        # 1. rows superseded by an upsert
+        keep = ~self._dead[:size]
+        total = int(row_bytes[keep].sum())
+
+        # 2. whole tickers, least recently added to / searched first
+        evicted = []
+        for ticker in sorted(self._ticker_ranges, key=lambda t: self._ticker_used.get(t, 0.0)):
+            if total <= target:
+                break
+            if ticker in protected:
+                continue
+            mask = keep & (codes == self._ticker_codes[ticker])
+            total -= int(row_bytes[mask].sum())
+            keep &= ~mask
+            evicted.append(ticker)
+
+        # 3. still over (the budget is smaller than what was just written): oldest rows
+        if total > target:
+            rows = np.flatnonzero(keep)
+            oldest = rows[np.argsort(np.nan_to_num(self._row_times[rows], nan=-np.inf), kind="stable")]
+            freed = np.cumsum(row_bytes[oldest])
+            drop = oldest[: int(np.searchsorted(freed, total - target)) + 1]
+            keep[drop] = False
+            total -= int(row_bytes[drop].sum())
+
+        dropped = size - int(keep.sum())
+        before = set(self._ticker_ranges)
+        self._compact_locked(keep)
+        for ticker in evicted:
+            self._ticker_used.pop(ticker, None)
+        self.stats["compactions"] += 1
+        self.stats["evicted_rows"] += dropped
+        self.stats["evicted_tickers"] += len(evicted)
+        print(f"🧹 Vector store over budget: dropped {dropped} rows"
+              + (f", evicted {', '.join(evicted)}" if evicted else ""))
+        return before - set(self._ticker_ranges)
+
+    def _compact_locked(self, keep: np.ndarray) -> None:
+        """Rebuild the store from the rows flagged in `keep` (row order preserved)"""
+        rows = np.flatnonzero(keep)
+        vectors = np.asarray(self._matrix[rows], dtype=np.float32)
+        items = [self._item(i) for i in rows]
+        self._reset()
+        if items:
+            self._append_locked(items, vectors)
+
+    # ── reads ───────────────────────────────────────────────
+    def rows_for(self, ticker: Optional[str]):
+        """Slice (one range) or index array of the rows owned by ticker"""
+        if not ticker:
+            return slice(0, self._size)
+        ranges = self._ticker_ranges.get(ticker.upper(), [])
+        if not ranges:
+            return np.empty(0, dtype=np.int64)
+        if len(ranges) == 1:
+            return slice(*ranges[0])
+        return np.concatenate([np.arange(start, stop) for start, stop in ranges])
+
+    def get(self, item_id: str) -> Optional[Dict]:
+        """The live item stored under item_id, if any"""
+        with self._lock:
+            row = self._row_ids.get(item_id)
+            return self._item(row) if row is not None else None
+
+    def content_hash(self, item_id: str) -> Optional[str]:
+        """content_hash of the live item stored under item_id ("" if it had none, None if absent)"""
+        with self._lock:
+            row = self._row_ids.get(item_id)
+            return self._row_hashes[row].decode() if row is not None else None
+
+    def live_count(self) -> int:
+        """Rows not superseded by a later upsert"""
+        return self._size - self._dead_count
+
+    def _dead_mask(self) -> Optional[np.ndarray]:
+        return self._dead[: self._size] if self._dead_count else None
+
+    def ticker_row_count(self, ticker: Optional[str]) -> int:
+        if not ticker:
+            return self._size
+        return sum(stop - start for start, stop in self._ticker_ranges.get(ticker.upper(), []))
+
+    def search(self, query: np.ndarray, ticker: Optional[str] = None,
+               top_k: int = 5, exact: bool = False) -> List[Tuple[float, Dict]]:
+        """Cosine top-k over the (optionally ticker-filtered) store"""
+        return self.search_batch(query, ticker, top_k, exact)[0]
+
+    def search_batch(self, queries: np.ndarray, ticker: Optional[str] = None,
+                     top_k: int = 5, exact: bool = False) -> List[List[Tuple[float, Dict]]]:
+        """search() for a (q, dim) block of queries: one matrix product, top-k per query"""
+        queries = normalize_rows(queries)
+        if ticker and ticker.upper() in self._ticker_ranges:
+            self._ticker_used[ticker.upper()] = time.monotonic()     # LRU order for eviction
+        use_ann = (
+            not exact
+            and self.ann is not None
+            and self.ann.trained
+            # a ticker with few rows is cheaper to scan exactly than to probe
+            and self.ticker_row_count(ticker) > self.ann.min_train_rows
+        )
+        if use_ann:
+            # each query probes its own buckets
+            return [self._search_ann(query, ticker, top_k) for query in queries]
+
+        with self._lock:
+            rows = self.rows_for(ticker)
+            matrix = self.matrix
+            records = self._records()
+            dead = self._dead_mask()
+
+        candidates = matrix[rows]
+        if candidates.shape[0] == 0:
+            return [[] for _ in queries]
+        scores = queries @ candidates.T          # (queries, rows), float32 even for a float16 matrix
+        if dead is not None:
+            scores[:, dead[rows]] = -np.inf
+
+        results = []
+        for row_scores in scores:
+            best = [i for i in top_k_indices(row_scores, top_k) if row_scores[i] > -np.inf]
+            # only the returned rows are turned back into dicts
+            if isinstance(rows, slice):
+                results.append([(float(row_scores[i]), self._build_item(records, rows.start + i)) for i in best])
+            else:
+                results.append([(float(row_scores[i]), self._build_item(records, rows[i])) for i in best])
+        return results
+
+    def _search_ann(self, query: np.ndarray, ticker: Optional[str],
+                    top_k: int) -> List[Tuple[float, Dict]]:
+        query = normalize_rows(query)[0]
+        with self._lock:
+            rows = self.ann.candidates(query)
+            matrix = self.matrix
+            records = self._records()
+            if ticker:
+                code = self._ticker_codes.get(ticker.upper())
+                rows = rows[self._row_tickers[rows] == code]
+            if self._dead_count:
+                rows = rows[~self._dead[rows]]
+
+        if rows.shape[0] == 0:
+            return []
+        scores = matrix[rows] @ query
+        best = top_k_indices(scores, top_k)
+        return [(float(scores[i]), self._build_item(records, rows[i])) for i in best]
+
+
+# ──────────────────────────────
+# APPROXIMATE NEAREST NEIGHBOUR INDEX (IVF, pure NumPy)
+# ──────────────────────────────
+IVF_MIN_TRAIN_ROWS = 2048      # below this the exact scan is already fast
+IVF_DEFAULT_NPROBE = 8
+
+
+def spherical_kmeans(vectors: np.ndarray, n_lists: int, iters: int = 10,
+                     seed: int = 0) -> np.ndarray:
+    """Unit-norm centroids for normalized vectors (cosine k-means)"""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(vectors.shape[0], n_lists, replace=False)].copy()
+    for _ in range(iters):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, vectors)
+        empty = ~sums.any(axis=1)
+        if empty.any():
+            # re-seed dead lists with random points
+            sums[empty] = vectors[rng.choice(vectors.shape[0], int(empty.sum()))]
+        centroids = normalize_rows(sums)
+    return centroids
+
+
+class IVFIndex:
+    """Inverted-file index: rows bucketed by nearest centroid, probed per query"""
+
+    def __init__(self, n_lists: Optional[int] = None, nprobe: int = IVF_DEFAULT_NPROBE,
+                 min_train_rows: int = IVF_MIN_TRAIN_ROWS):
+        self.n_lists = n_lists
+        self.nprobe = nprobe
+        self.min_train_rows = min_train_rows
+        self.centroids: Optional[np.ndarray] = None
+        self._lists: List[List[int]] = []
+        self._list_arrays: List[Optional[np.ndarray]] = []
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    def train(self, matrix: np.ndarray) -> None:
+        """Fit centroids on the current rows and bucket all of them"""
+        matrix = np.asarray(matrix, dtype=np.float32)     # float16 stores train in float32
+        n = matrix.shape[0]
+        n_lists = self.n_lists or max(16, int(np.sqrt(n)))
+        sample = matrix
+        if n > 64 * n_lists:
+            sample = matrix[np.random.default_rng(0).choice(n, 64 * n_lists, replace=False)]
+        self.centroids = spherical_kmeans(sample, n_lists)
+        self._lists = [[] for _ in range(n_lists)]
+        self._list_arrays = [None] * n_lists
+        self.add(matrix, 0)
+
+    def add(self, vectors: np.ndarray, first_row: int) -> None:
+        """Incrementally bucket new rows (centroids stay fixed)"""
+        if not self.trained or vectors.shape[0] == 0:
+            return
+        assign = np.argmax(vectors @ self.centroids.T, axis=1)
+        for offset, list_id in enumerate(assign):
+            self._lists[list_id].append(first_row + offset)
+            self._list_arrays[list_id] = None
+
+    def candidates(self, query: np.ndarray, nprobe: Optional[int] = None) -> np.ndarray:
+        """Row ids in the nprobe lists closest to the query"""
+        nprobe = min(nprobe or self.nprobe, self.centroids.shape[0])
+        probe = top_k_indices(self.centroids @ query, nprobe)
+        return np.concatenate([self._list_array(list_id) for list_id in probe])
+
+    def _list_array(self, list_id: int) -> np.ndarray:
+        cached = self._list_arrays[list_id]
+        if cached is None:
+            cached = np.asarray(self._lists[list_id], dtype=np.int64)
+            self._list_arrays[list_id] = cached
+        return cached
+
+
+# ──────────────────────────────
+# PERSISTENT (MEMORY-MAPPED) STORE
+# ──────────────────────────────
+class PersistentVectorStore(VectorStore):
+    """VectorStore backed by append-only files, mapped read-only for queries
+
+    Layout of ``path``:
+        embeddings.f32  raw row-major float32 vectors, one row per item
+        items.jsonl     one JSON record per row, same order
+        meta.json       {"dim": ...}
+        write.lock      flock()ed: exclusively by writers, shared by readers
+    Writers append vectors before records, so every complete record line
+    always has its vector on disk; readers only trust complete lines.
+    Eviction (max_bytes) rewrites both files with the kept rows and
+    swaps them in; other workers notice the new inode and reload.
+    Records are parsed once when their rows are indexed and afterwards
+    read back from the mapped items.jsonl only when a row is returned.
+    """
+
+    _columns = {
+        **_ROW_COLUMNS,
+        "_row_offsets": np.int64,    # start of the row's line in items.jsonl
+        "_row_lengths": np.int64,    # line length, newline included
+    }
+
+    def __init__(self, path, dim: Optional[int] = None, index: str = "exact",
+                 max_bytes: Optional[int] = None, **index_options):
+        super().__init__(dim=dim, initial_capacity=1, index=index, max_bytes=max_bytes, **index_options)
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._vectors_path = self.path / "embeddings.f32"
+        self._items_path = self.path / "items.jsonl"
+        self._meta_path = self.path / "meta.json"
+        self._lock_path = self.path / "write.lock"
+
+        if self._meta_path.exists():
+            self.dim = json.loads(self._meta_path.read_text())["dim"]
+        self.refresh()
+
+    def _reset(self) -> None:
+        super()._reset()
+        self._items_offset = 0
+        self._items_inode = None
+        self._records_map = None     # items.jsonl, mapped up to _items_offset
+
+    def _records(self) -> Tuple:
+        return self._records_map, self._row_offsets, self._row_lengths
+
+    def _build_item(self, records: Tuple, row: int) -> Dict:
+        records_map, offsets, lengths = records
+        start = int(offsets[row])
+        return json.loads(records_map[start : start + int(lengths[row])])
+
+    def _keep_record(self, row: int, item: Dict) -> int:
+        # the record stays on disk; budget it at its line length
+        return int(self._row_lengths[row])
+
+    @property
+    def matrix(self) -> np.ndarray:
+        if self._matrix is None:
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+        return self._matrix[: self._size]
+
+    def refresh(self) -> None:
+        """Map rows appended since the last call, by this or another process"""
+        try:
+            stat = self._items_path.stat()
+        except FileNotFoundError:
+            return
+        if stat.st_size != self._items_offset or stat.st_ino != self._items_inode:
+            with self._lock, self._file_lock(shared=True):
+                lost = self._sync_locked()
+            self._notify_evicted(lost)
+
+    def add(self, items: List[Dict], embeddings: np.ndarray) -> None:
+        if not items:
+            return
+        vectors = normalize_rows(embeddings)
+        if len(items) != vectors.shape[0]:
+            raise ValueError(f"{len(items)} items but {vectors.shape[0]} embeddings")
+        records = b"".join(json.dumps(item, default=str).encode() + b"\n" for item in items)
+
+        with self._lock, self._file_lock():
+            lost = self._sync_locked()
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                self._meta_path.write_text(json.dumps({"dim": self.dim}))
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"embedding dim {vectors.shape[1]} does not match store dim {self.dim}")
+
+            # drop vectors orphaned by a writer that died before its records
+            row_bytes = 4 * self.dim
+            if self._vectors_path.exists() and self._vectors_path.stat().st_size > self._size * row_bytes:
+                os.truncate(self._vectors_path, self._size * row_bytes)
+
+            with self._vectors_path.open("ab") as fp:
+                fp.write(vectors.tobytes())
+            with self._items_path.open("ab") as fp:
+                fp.write(records)
+            self._sync_locked()
+            lost |= self._enforce_budget_locked(self._touch({item["ticker"].upper() for item in items}))
+        self._notify_evicted(lost)
+
+    def _compact_locked(self, keep: np.ndarray) -> None:
+        """Rewrite both files with the kept rows (caller holds the exclusive file lock)"""
+        rows = np.flatnonzero(keep)
+        vectors_tmp = self._vectors_path.with_name(self._vectors_path.name + ".tmp")
+        items_tmp = self._items_path.with_name(self._items_path.name + ".tmp")
+        with vectors_tmp.open("wb") as fp:
+            fp.write(np.ascontiguousarray(self._matrix[rows], dtype=np.float32).tobytes())
+        with items_tmp.open("wb") as fp:
+            # kept lines are copied verbatim, never re-parsed
+            for i in rows:
+                start = int(self._row_offsets[i])
+                fp.write(self._records_map[start : start + int(self._row_lengths[i])])
+        # readers hold the shared lock while syncing, so they never see one file swapped without the other
+        os.replace(vectors_tmp, self._vectors_path)
+        os.replace(items_tmp, self._items_path)
+        self._reset()
+        self._sync_locked()
+
+    @contextmanager
+    def _file_lock(self, shared: bool = False):
+        with self._lock_path.open("a") as fp:
+            fcntl.flock(fp, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fp, fcntl.LOCK_UN)
+
+    def _sync_locked(self) -> set:
+        """Index rows appended to the files; returns tickers lost to another worker's eviction"""
+        if not self._items_path.exists():
+            return set()
+        inode = self._items_path.stat().st_ino
+        before = None
+        if self._items_inode is not None and inode != self._items_inode:
+            before = set(self._ticker_ranges)
+            self._reset()        # rewritten by another worker's eviction: reload from scratch
+        self._items_inode = inode
+        self._read_new_rows_locked()
+        return before - set(self._ticker_ranges) if before is not None else set()
+
+    def _read_new_rows_locked(self) -> None:
+        with self._items_path.open("rb") as fp:
+            fp.seek(self._items_offset)
+            chunk = fp.read()
+        complete = chunk.rfind(b"\n") + 1
+        if complete == 0:
+            return
+        new_items, spans = [], []
+        position = self._items_offset
+        for line in chunk[:complete].split(b"\n")[:-1]:
+            if line.strip():
+                new_items.append(json.loads(line))
+                spans.append((position, len(line) + 1))
+            position += len(line) + 1
+        self._items_offset += complete
+        if not new_items:
+            return
+        if self.dim is None:
+            self.dim = json.loads(self._meta_path.read_text())["dim"]
+
+        with self._items_path.open("rb") as fp:
+            self._records_map = mmap.mmap(fp.fileno(), self._items_offset, access=mmap.ACCESS_READ)
+        start = self._size
+        total = start + len(new_items)
+        self._grow_columns(total)
+        self._row_offsets[start:total], self._row_lengths[start:total] = np.array(spans, dtype=np.int64).T
+        self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(total, self.dim))
+        self._size = total
+        # the parsed records are only needed to index the rows, then dropped
+        self._index_rows(new_items, start, self._matrix[start:total])